@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# ═══════════════════════════════════════════════════════════════════════════════
+# 📡 API SERVER - Benchmark de l'encodage des flux deep search
+# ═══════════════════════════════════════════════════════════════════════════════
+"""
+Mesure le CPU consommé par requête pour encoder le flux SSE complet de
+/api/v6/deep-search (mêmes événements et mêmes formes que
+deep_search_generator_v9), sur des sources de synthèse:
+
+- json: ancien helper `sse()` (json.dumps + f-string, puis encodage UTF-8)
+- orjson: services/stream_encoding.sse (bytes directement)
+- orjson+fragments: enregistrements de sources pré-encodés une fois
+  (orjson.Fragment) et réinsérés dans evidence_by_theme / references
+
+Compare aussi la taille du flux selon le protocole des sources (brute et
+gzip): `inline` (sources complètes dans chaque événement) et `table`
+(?sources=table: événement "sources" unique, puis ids).
+
+    python scripts/bench_stream_encoding.py
+    python scripts/bench_stream_encoding.py --sources 100 --themes 6 --requests 500
+
+Aucun appel réseau: seul l'encodage est mesuré (temps CPU du processus).
+"""
+
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "brain-core" / "src" / "streaming"))
+
+from stream_encoding import orjson, sse  # noqa: E402
+
+WORDS = ("recherche étude résultats patients analyse modèle données clinique "
+         "essai méthode impact santé risque traitement évaluation revue").split()
+PROVIDERS = ["pubmed", "arxiv", "crossref", "openalex", "who", "europepmc",
+             "semantic_scholar", "wikipedia", "core", "doaj", "hal", "inserm"]
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_payload(n_sources: int, n_themes: int, seed: int = 7):
+    """Sources au format de l'orchestrateur et clusters qui se recoupent."""
+    rng = random.Random(seed)
+    sources = [
+        {
+            "id": f"src_{i}",
+            "title": text(rng, 12),
+            "snippet": text(rng, 70),
+            "url": f"https://example.org/{PROVIDERS[i % len(PROVIDERS)]}/{i}",
+            "provider": PROVIDERS[i % len(PROVIDERS)],
+            "source_type": rng.choice(["academic", "official", "preprint", "encyclopedia"]),
+            "timestamp": "2025-01-01T00:00:00",
+            "raw_confidence": round(rng.random(), 3),
+            "metadata": {
+                "authors": [text(rng, 2) for _ in range(rng.randint(1, 6))],
+                "year": rng.randint(2015, 2025),
+                "doi": f"10.1000/{i}",
+                "journal": text(rng, 4),
+                "citations": rng.randint(0, 500),
+                "open_access": rng.random() > 0.5,
+            },
+        }
+        for i in range(n_sources)
+    ]
+    per_theme = max(1, n_sources * 2 // max(1, n_themes))
+    clusters = {f"Thème {t}": rng.sample(sources, min(per_theme, n_sources)) for t in range(n_themes)}
+    return sources, clusters, rng
+
+
+def deep_search_events(sources, clusters, rng: random.Random):
+    """(type, data) des événements de deep_search_generator_v9, dans l'ordre."""
+    yield "init", {"request_id": "bench", "query": "effets du jeûne intermittent", "lang": "fr",
+                   "domain": "health", "version": "v10-strict",
+                   "categories_available": {p: {"count": 3, "enabled": True} for p in PROVIDERS}}
+    yield "stage", {"message": "🚀 Interrogation de toutes les APIs..."}
+    yield "orchestration_done", {"total_sources": len(sources), "providers_count": len(PROVIDERS),
+                                 "providers_list": PROVIDERS, "elapsed_ms": 2300}
+    yield "clusters", {"themes": list(clusters), "counts": {k: len(v) for k, v in clusters.items()}}
+    yield "thematic_reports", {"reports": [
+        {"theme": theme, "content": text(rng, 250), "sources_count": len(items)}
+        for theme, items in list(clusters.items())[:3]
+    ]}
+    yield "confidence", {"score": 78, "requires_human_review": False,
+                         "sub_scores": {"diversity": 80, "peer_review": 70, "recency": 85}}
+    yield "synthesis", {"text": text(rng, 1500)}
+    yield "academic_table", {"markdown": "\n".join(f"| {s['title'][:40]} | {s['provider']} |" for s in sources)}
+    yield "faq", {"text": text(rng, 300)}
+
+
+def evidence_record(s):
+    return {"id": s["id"], "title": s["title"], "snippet": s["snippet"], "provider": s["provider"],
+            "source_type": s["source_type"], "url": s["url"], "raw_confidence": s.get("raw_confidence", 0)}
+
+
+def reference_record(s, i):
+    return {"id": s["id"], "index": i + 1, "title": s["title"], "url": s["url"], "provider": s["provider"],
+            "source_type": s["source_type"], "timestamp": s.get("timestamp", ""),
+            "snippet": s["snippet"][:200], "metadata": s.get("metadata", {})}
+
+
+def source_events(sources, clusters, fragments: bool):
+    """evidence_by_theme et references (enregistrements éventuellement pré-encodés)."""
+    if fragments:
+        cache = {}
+
+        def evidence(s):
+            if s["id"] not in cache:
+                cache[s["id"]] = orjson.Fragment(orjson.dumps(evidence_record(s)))
+            return cache[s["id"]]
+    else:
+        evidence = evidence_record
+    yield "evidence_by_theme", {"markdown": "", "clusters": {
+        theme: [evidence(s) for s in items] for theme, items in clusters.items()
+    }}
+    yield "references", {"sources": [reference_record(s, i) for i, s in enumerate(sources)], "total": len(sources)}
+    yield "complete", {"request_id": "bench", "elapsed_ms": 9000, "sources_count": len(sources)}
+
+
+def table_source_events(sources, clusters):
+    """?sources=table: table envoyée une fois, ids ensuite."""
+    yield "sources", {"sources": [
+        {**reference_record(s, i), "snippet": s["snippet"], "raw_confidence": s.get("raw_confidence", 0)}
+        for i, s in enumerate(sources)
+    ], "total": len(sources)}
+    yield "evidence_by_theme", {"markdown": "", "clusters": {
+        theme: [s["id"] for s in items] for theme, items in clusters.items()
+    }}
+    yield "references", {"ids": [s["id"] for s in sources], "total": len(sources)}
+    yield "complete", {"request_id": "bench", "elapsed_ms": 9000, "sources_count": len(sources)}
+
+
+def stream_bytes(payload, table: bool) -> bytes:
+    sources, clusters, head = payload
+    events = table_source_events(sources, clusters) if table else source_events(sources, clusters, False)
+    return b"".join(sse(event_type, data) for event_type, data in [*head, *events])
+
+
+def legacy_sse(event_type, data) -> bytes:
+    return f"data: {json.dumps({'type': event_type, 'data': data}, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def encode_stream(payload, frame, fragments=False) -> int:
+    sources, clusters, head = payload
+    size = 0
+    for event_type, data in head:
+        size += len(frame(event_type, data))
+    for event_type, data in source_events(sources, clusters, fragments):
+        size += len(frame(event_type, data))
+    return size
+
+
+def run(label, payload, frame, fragments, requests):
+    start = time.process_time()
+    for _ in range(requests):
+        size = encode_stream(payload, frame, fragments)
+    cpu_ms = (time.process_time() - start) * 1000 / requests
+    print(f"{label:<18} {cpu_ms:>9.2f} ms {size / 1024:>10.1f} KB")
+    return cpu_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU per deep-search stream: json vs orjson")
+    parser.add_argument("--sources", type=int, default=60)
+    parser.add_argument("--themes", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    if orjson is None:
+        sys.exit("orjson non installé: pip install orjson")
+
+    sources, clusters, rng = make_payload(args.sources, args.themes)
+    payload = sources, clusters, list(deep_search_events(sources, clusters, rng))
+
+    print(f"\n📡 Flux deep search: {args.sources} sources, {args.themes} thèmes, "
+          f"{args.requests} requêtes (orjson {orjson.__version__})\n")
+    print(f"{'encodeur':<18} {'CPU/requête':>12} {'taille':>13}")
+    baseline = run("json", payload, legacy_sse, False, args.requests)
+    fast = run("orjson", payload, sse, False, args.requests)
+    if hasattr(orjson, "Fragment"):
+        run("orjson+fragments", payload, sse, True, args.requests)
+    print(f"\norjson: {baseline / fast:.1f}x moins de CPU par requête")
+
+    print(f"\n{'sources':<18} {'flux':>12} {'gzip':>13}")
+    sizes = {}
+    for label, table in (("inline", False), ("table", True)):
+        body = stream_bytes(payload, table)
+        sizes[label] = len(body)
+        print(f"{label:<18} {len(body) / 1024:>9.1f} KB {len(gzip.compress(body)) / 1024:>10.1f} KB")
+    print(f"\n?sources=table: flux {sizes['inline'] / sizes['table']:.1f}x plus petit")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,12 @@ WikiAsk Backend - Hybrid AI Classification
 Precise results in ALL domains with domain-specific processing
 """
 import os
+import time
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from dotenv import load_dotenv
 
@@ -16,6 +17,8 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_BOOT_STARTED = time.perf_counter()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -26,17 +29,35 @@ async def lifespan(app: FastAPI):
     from services.smart_search_v7 import smart_search_v7
     logger.info("🚀 V7 Engine initialized")
     
+    # Disponibilité des providers (Ollama...) vérifiée en tâche de fond
+    from services.ai_router import ai_router
+    ai_router.start_probes()
+    
+    # Articles trending rafraîchis en tâche de fond (jamais sur le chemin des requêtes)
+    from services.trending_feed import trending_feed
+    trending_feed.start()
+    
+    logger.info(f"⏱️ Startup in {(time.perf_counter() - _BOOT_STARTED) * 1000:.0f}ms (profile: scripts/profile_imports.py)")
+    
     yield
     
     logger.info("🛑 Shutting down...")
+    await trending_feed.stop()
     from services.http_client import cleanup_http_client
     await cleanup_http_client()
 
 
+# Réponses JSON encodées par orjson (services/stream_encoding.py)
+from services.stream_encoding import FastJSONResponse, ndjson
+from services.http_caching import (
+    CACHE_REVALIDATE, CACHE_STATIC, CompressionMiddleware, cached_response, http_cache
+)
+
 app = FastAPI(
     title="WikiAsk - Global Search Engine",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Include chat router
@@ -106,10 +127,11 @@ async def get_weather_widget(city: str = Query(..., min_length=2), lang: str = Q
 # MEGA BRAIN STATS ENDPOINT
 # ============================================
 @app.get("/api/brain/stats")
-async def get_brain_stats():
-    """Statistiques du MegaBrain (50+ APIs)."""
+async def get_brain_stats(request: Request):
+    """Statistiques du MegaBrain (50+ APIs), recalculées au plus toutes les 5s."""
     from services.mega_api_brain import mega_brain
-    return mega_brain.get_stats()
+    payload = await http_cache.get("brain_stats", mega_brain.get_stats, ttl=5)
+    return cached_response(request, payload, CACHE_REVALIDATE)
 
 
 @app.get("/api/brain/query")
@@ -117,7 +139,8 @@ async def query_brain(q: str = Query(..., min_length=2), lang: str = Query("fr")
     """Interroge le MegaBrain directement."""
     from services.mega_api_brain import mega_brain
     results = await mega_brain.query_brain(q, lang=lang, max_apis=10)
-    return results
+    # Renvoyée telle quelle: pas de jsonable_encoder sur les réponses brutes des APIs
+    return FastJSONResponse(results)
 
 
 # ============================================
@@ -127,10 +150,13 @@ async def query_brain(q: str = Query(..., min_length=2), lang: str = Query("fr")
 async def get_cache_stats():
     """Statistiques du cache pour monitoring."""
     from services.ultra_cache import search_cache, api_cache, ai_cache
+    from services.trending_feed import trending_feed
     return {
         "search_cache": search_cache.get_stats(),
         "api_cache": api_cache.get_stats(),
-        "ai_cache": ai_cache.get_stats()
+        "ai_cache": ai_cache.get_stats(),
+        "http_cache": http_cache.get_stats(),
+        "trending_feed": trending_feed.get_stats()
     }
 
 
@@ -192,6 +218,9 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from services.rate_limiter import rate_limit_middleware
 app.add_middleware(BaseHTTPMiddleware, dispatch=rate_limit_middleware)
 
+# Compression gzip/brotli (ajoutée en dernier = middleware le plus externe)
+app.add_middleware(CompressionMiddleware)
+
 
 # ============================================
 # MODELS
@@ -208,6 +237,14 @@ class AskRequest(BaseModel):
     use_cache: bool = True
 
 
+class BatchQueryRequest(BaseModel):
+    """Request for answering many queries in one call"""
+    queries: list[str] = Field(..., min_length=1, max_length=50)
+    lang: str = "fr"
+    max_apis: int = Field(8, ge=1, le=10)
+    synthesize: bool = True  # False = raw MegaBrain results only
+
+
 class SocialMediaRequest(BaseModel):
     """Request for social media content generation and posting"""
     topic: str
@@ -863,10 +900,148 @@ async def ultimate_search(q: str = Query(...), lang: str = Query("fr")):
     return await synthesize_with_ai(q.strip(), api_results, lang)
 
 
+# ============================================
+# BATCH MODE
+# ============================================
+
+# Shared cap on concurrent LLM syntheses across all batch requests
+BATCH_SYNTHESIS_CONCURRENCY = int(os.getenv("BATCH_SYNTHESIS_CONCURRENCY", 4))
+_batch_synthesis_semaphore = None
+
+
+def _get_batch_semaphore():
+    global _batch_synthesis_semaphore
+    if _batch_synthesis_semaphore is None:
+        import asyncio
+        _batch_synthesis_semaphore = asyncio.Semaphore(BATCH_SYNTHESIS_CONCURRENCY)
+    return _batch_synthesis_semaphore
+
+
+async def batch_stream_generator(request: BatchQueryRequest):
+    """
+    Generate NDJSON stream for a batch of queries.
+
+    Yields one JSON object per line:
+        {"type": "batch", "count": 3, "groups": {"crypto": [0, 2], ...}}
+        {"type": "result", "index": 2, "query": "...", "domain": "crypto", ...}
+        {"type": "done", "total_time_ms": 2140}
+    """
+    import asyncio
+    from datetime import datetime
+    from services.mega_api_brain import mega_brain
+
+    start = datetime.now()
+    queries = [q.strip() for q in request.queries]
+
+    # Group by detected domain (one detection pass per query)
+    domains = [mega_brain.detect_domain(mega_brain.detect_relevant_apis(q)[:request.max_apis]) for q in queries]
+    groups = {}
+    for i, domain in enumerate(domains):
+        groups.setdefault(domain, []).append(i)
+    yield ndjson({"type": "batch", "count": len(queries), "groups": groups})
+
+    # Identical queries share the same synthesis
+    synthesis_tasks = {}
+
+    async def synthesize(index: int, brain_results: dict) -> dict:
+        api_results = {
+            "detected_categories": [domains[index]],
+            "results": [{"source": r.get("api_id", "unknown"), "data": r.get("data", {})} for r in brain_results["results"]],
+            "sources": [r.get("api_name") for r in brain_results["results"]],
+            "apis_successful": brain_results["apis_successful"],
+            "execution_time_ms": brain_results["elapsed_ms"],
+        }
+        async with _get_batch_semaphore():
+            return await synthesize_with_ai(queries[index], api_results, request.lang)
+
+    async def finish(index: int, brain_results: dict) -> dict:
+        try:
+            if not request.synthesize:
+                result = {"success": True, **brain_results}
+            else:
+                key = queries[index].lower()
+                if key not in synthesis_tasks:
+                    synthesis_tasks[key] = asyncio.ensure_future(synthesize(index, brain_results))
+                result = dict(await synthesis_tasks[key])
+        except Exception as e:
+            logger.error(f"Batch item {index} failed: {e}")
+            result = {"success": False, "error": str(e)}
+        result.update({"type": "result", "index": index, "query": queries[index], "domain": domains[index]})
+        return result
+
+    # Results are pushed as they finish, so a slow synthesis never holds back the others
+    ready = asyncio.Queue()
+    tasks = []
+
+    async def produce():
+        try:
+            async for index, brain_results in mega_brain.query_brain_batch(queries, lang=request.lang, max_apis=request.max_apis):
+                task = asyncio.ensure_future(finish(index, brain_results))
+                task.add_done_callback(ready.put_nowait)
+                tasks.append(task)
+        except Exception as e:
+            logger.error(f"Batch brain query failed: {e}")
+            ready.put_nowait(None)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        for _ in range(len(queries)):
+            task = await ready.get()
+            if task is None:
+                break
+            yield ndjson(task.result())
+    finally:
+        producer.cancel()
+        for task in tasks:
+            task.cancel()
+
+    elapsed = (datetime.now() - start).total_seconds() * 1000
+    yield ndjson({"type": "done", "total_time_ms": round(elapsed)})
+
+
+@app.post("/api/brain/batch")
+async def query_brain_batch(request: BatchQueryRequest):
+    """
+    📦 BATCH MODE
+    Answer many queries in one request, streamed back as NDJSON.
+    - Queries grouped by detected domain
+    - Identical upstream API calls made once for the whole batch; list-capable
+      APIs (registry "batch" spec) get one multi-value call per provider
+    - LLM synthesis runs concurrently under a shared cap
+    - Each result is sent as soon as it is ready (order not guaranteed, use "index")
+    """
+    from fastapi.responses import StreamingResponse
+
+    if any(len(q.strip()) < 2 for q in request.queries):
+        raise HTTPException(status_code=400, detail="Query too short")
+
+    return StreamingResponse(
+        batch_stream_generator(request),
+        media_type="application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 # ============================================
 # SPEED + DEEP MODES
 # ============================================
 
+FAST_SYSTEM_PROMPT = """CRITICAL: You are a multilingual assistant. You MUST detect the language of the user's question and respond ONLY in that SAME language. If the question is in Spanish, respond in Spanish. If in Hebrew, respond in Hebrew. If in French, respond in French. This is your #1 priority. Your responses are concise (200 words max), accurate, and always based on provided data.
+
+CRITICAL LANGUAGE RULE: Your response language is determined by the QUESTION LANGUAGE, NOT by the topic.
+
+RULES:
+1. Respond in the SAME language as the question.
+2. Use the "Specialized API Data" as your primary source if available.
+3. Be concise (150-200 words).
+4. Use bullet points.
+5. If asking for price/score/weather, give the EXACT numbers from data.
+"""
+
+
 @app.get("/api/fast")
 async def fast_search(
     q: str = Query(..., description="Your question"),
@@ -884,6 +1059,7 @@ async def fast_search(
     from services.ai_router import ai_router
     from services.smart_search_v7 import smart_search_v7
     from services.cache import cache_service
+    from services.langid import detect_language
     
     start = datetime.now()
     query = q.strip()
@@ -894,26 +1070,9 @@ async def fast_search(
     # ══════════════════════════════════════════════════════════════
     # 1. LANGUAGE DETECTION (For Response & Cache)
     # ══════════════════════════════════════════════════════════════
-    query_lower = query.lower()
-    
-    # Detect language from query words
-    if any(w in query_lower for w in ['what', 'how', 'where', 'when', 'who', 'why', 'the', 'is', 'are', 'do', 'does', 'can', 'will', 'best', 'top']):
-        detected_lang = "en-US"
-    elif any(w in query_lower for w in ['que', 'quoi', 'comment', 'où', 'quand', 'qui', 'pourquoi', 'le', 'la', 'les', 'est', 'sont', 'faire', 'meilleur']):
-        detected_lang = "fr-FR"
-    elif any(w in query_lower for w in ['qué', 'cómo', 'dónde', 'cuándo', 'quién', 'por qué', 'el', 'la', 'los', 'es', 'son', 'hacer']):
-        detected_lang = "es"
-    elif any(w in query_lower for w in ['was', 'wie', 'wo', 'wann', 'wer', 'warum', 'der', 'die', 'das', 'ist', 'sind', 'machen']):
-        detected_lang = "de"
-    elif any(ord(c) >= 0x0590 and ord(c) <= 0x05FF for c in query):  # Hebrew
-        detected_lang = "he"
-    elif any(ord(c) >= 0x0600 and ord(c) <= 0x06FF for c in query):  # Arabic
-        detected_lang = "ar"
-    elif any(ord(c) >= 0x4E00 and ord(c) <= 0x9FFF for c in query):  # Chinese
-        detected_lang = "zh"
-    else:
-        detected_lang = "en-US"  # Default
-        
+    detected_lang = detect_language(query, default="en")
+    detected_lang = {"en": "en-US", "fr": "fr-FR"}.get(detected_lang, detected_lang)
+    
     # ══════════════════════════════════════════════════════════════
     # 2. CACHE CHECK
     # ══════════════════════════════════════════════════════════════
@@ -925,7 +1084,7 @@ async def fast_search(
         cached_result["total_time_ms"] = round(elapsed_cache)
         cached_result["ai_time_ms"] = 0
         cached_result["ai_provider"] = f"{cached_result.get('ai_provider', 'cache')} (cached)"
-        return cached_result
+        return FastJSONResponse(cached_result)
 
     # ══════════════════════════════════════════════════════════════
     # 3. SMART SPEED SEARCH (The optimization)
@@ -983,9 +1142,9 @@ async def fast_search(
     # ══════════════════════════════════════════════════════════════
     # 5. AI SYNTHESIS
     # ══════════════════════════════════════════════════════════════
-    speed_prompt = f"""CRITICAL LANGUAGE RULE: Your response language is determined by the QUESTION LANGUAGE, NOT by the topic.
-    
-Question: "{query}" (Language: {detected_lang})
+    # Données variables uniquement: les règles fixes sont dans FAST_SYSTEM_PROMPT
+    # (préfixe stable, mis en cache par les providers)
+    speed_prompt = f"""Question: "{query}" (Language: {detected_lang})
 Category: {category}
 
 Web Context:
@@ -993,13 +1152,6 @@ Web Context:
 
 Specialized API Data (PRIORITY):
 {domain_data}
-
-RULES:
-1. Respond in the SAME language as the question.
-2. Use the "Specialized API Data" as your primary source if available.
-3. Be concise (150-200 words).
-4. Use bullet points.
-5. If asking for price/score/weather, give the EXACT numbers from data.
 """
 
     try:
@@ -1008,7 +1160,7 @@ RULES:
         
         ai_result = await ai_router.route(
             prompt=speed_prompt,
-            system_prompt="CRITICAL: You are a multilingual assistant. You MUST detect the language of the user's question and respond ONLY in that SAME language. If the question is in Spanish, respond in Spanish. If in Hebrew, respond in Hebrew. If in French, respond in French. This is your #1 priority. Your responses are concise (200 words max), accurate, and always based on provided data.",
+            system_prompt=FAST_SYSTEM_PROMPT,
             preferred_provider=preferred_ai,
             max_tokens=400
         )
@@ -1054,7 +1206,7 @@ RULES:
     # SAVE TO CACHE (1 hour TTL)
     cache_service.set("speed", cache_key_data, result, ttl=3600)
     
-    return result
+    return FastJSONResponse(result)
 
 
 @app.get("/api/deep")
@@ -1170,16 +1322,18 @@ async def thinking_v6_redirect(
     return await ai_analysis_v6(q=q, lang=lang)
 
 
+V6_DOMAINS = {
+    "domains": ["general", "tech", "health", "finance", "news", "entertainment", "food", "tourism"],
+    "version": "7.0",
+    "architecture": "unified"
+}
+
+
 @app.get("/api/v6/domains")
-async def list_domains_v6():
+async def list_domains_v6(request: Request):
     """Liste tous les domaines disponibles."""
-    from services.smart_search_v7 import smart_search_v7
-    
-    return {
-        "domains": ["general", "tech", "health", "finance", "news", "entertainment", "food", "tourism"],
-        "version": "7.0",
-        "architecture": "unified"
-    }
+    payload = await http_cache.get("v6_domains", lambda: V6_DOMAINS)
+    return cached_response(request, payload, CACHE_STATIC)
 
 
 @app.get("/api/v6/detect")
@@ -1440,6 +1594,7 @@ async def api_status():
         },
         "cache": "memory" if cache_service.using_memory else "redis",
         "ai_providers": ai_router.get_status(),
+        "prompt_cache": ai_router.get_cache_stats(),
         "endpoints": [
             "/api/v6/speed",
             "/api/v6/thinking", 
@@ -6,7 +6,6 @@ Uses the Smart Chat Agent for multi-step reasoning.
 """
 
 import asyncio
-import json
 import logging
 from fastapi import APIRouter, Query
 from fastapi.responses import StreamingResponse
@@ -15,6 +14,7 @@ import uuid
 
 from services.smart_chat_agent import smart_agent
 from services.chat_memory import chat_memory
+from services.stream_encoding import sse_event
 
 logger = logging.getLogger(__name__)
 
@@ -45,10 +45,10 @@ async def chat_stream_generator(
     """
     try:
         # Get conversation context
-        context = chat_memory.get_context_for_ai(conversation_id, max_messages=10)
+        context = await chat_memory.get_context_for_ai(conversation_id, max_messages=10)
         
         # Add user message to memory
-        chat_memory.add_message(conversation_id, "user", message)
+        await chat_memory.add_message(conversation_id, "user", message)
         
         # Track full response for memory
         full_response = ""
@@ -64,7 +64,7 @@ async def chat_stream_generator(
             lang=lang
         ):
             # Forward event to client
-            yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+            yield sse_event(event)
             
             # Track response
             if event["type"] == "chunk":
@@ -75,7 +75,7 @@ async def chat_stream_generator(
                 detected_sources = event["value"]
         
         # Add AI response to memory
-        chat_memory.add_message(
+        await chat_memory.add_message(
             conversation_id,
             "assistant",
             full_response,
@@ -88,14 +88,14 @@ async def chat_stream_generator(
         # Generate suggestions based on conversation
         suggestions = generate_suggestions(message, full_response)
         if suggestions:
-            yield f"data: {json.dumps({'type': 'suggestions', 'value': suggestions}, ensure_ascii=False)}\n\n"
+            yield sse_event({"type": "suggestions", "value": suggestions})
         
     except Exception as e:
         import traceback
         logger.error(f"Chat stream error: {e}")
         logger.error(traceback.format_exc())
         error_msg = "Désolé, une erreur s'est produite 😅 Peux-tu reformuler ta question ?"
-        yield f"data: {json.dumps({'type': 'error', 'value': error_msg})}\n\n"
+        yield sse_event({"type": "error", "value": error_msg})
 
 
 def generate_suggestions(query: str, response: str) -> list:
@@ -190,10 +190,10 @@ async def chat_post_endpoint(
         conversation_id = str(uuid.uuid4())
     
     # Get context
-    context = chat_memory.get_context_for_ai(conversation_id, max_messages=10)
+    context = await chat_memory.get_context_for_ai(conversation_id, max_messages=10)
     
     # Add user message
-    chat_memory.add_message(conversation_id, "user", message)
+    await chat_memory.add_message(conversation_id, "user", message)
     
     # Get response
     result = await smart_agent.chat_sync(
@@ -203,7 +203,7 @@ async def chat_post_endpoint(
     )
     
     # Save to memory
-    chat_memory.add_message(
+    await chat_memory.add_message(
         conversation_id,
         "assistant",
         result["response"],
@@ -222,11 +222,12 @@ async def chat_post_endpoint(
 
 @router.get("/api/v6/chat/history")
 async def get_chat_history(
-    conversation_id: str = Query(..., description="Conversation ID")
+    conversation_id: str = Query(..., description="Conversation ID"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Most recent messages only")
 ):
-    """Get conversation history."""
-    messages = chat_memory.get_messages(conversation_id)
-    stats = chat_memory.get_stats(conversation_id)
+    """Get conversation history (read through the persistent chat memory)."""
+    messages = await chat_memory.get_messages(conversation_id, limit=limit)
+    stats = await chat_memory.get_stats(conversation_id)
     
     return {
         "success": True,
@@ -241,7 +242,7 @@ async def clear_chat(
     conversation_id: str = Query(..., description="Conversation ID")
 ):
     """Clear conversation history."""
-    chat_memory.clear_conversation(conversation_id)
+    await chat_memory.clear_conversation(conversation_id)
     
     return {
         "success": True,
@@ -255,7 +256,7 @@ async def export_chat(
     format: str = Query("json", description="Export format (json or text)")
 ):
     """Export conversation."""
-    export_data = chat_memory.export_conversation(conversation_id, format)
+    export_data = await chat_memory.export_conversation(conversation_id, format)
     
     return {
         "success": True,
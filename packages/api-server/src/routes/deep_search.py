@@ -18,7 +18,6 @@ Critères d'acceptation:
 """
 
 import asyncio
-import json
 import logging
 import time
 import uuid
@@ -38,6 +37,8 @@ from services.multi_api_orchestrator import (
 from services.api_registry import Category, get_categories_summary
 from services.ai_router import ai_router
 from services.content_filter import filter_search_results
+from services.stream_encoding import sse
+from services import langid
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -75,31 +76,7 @@ HUMAN_REVIEW_THRESHOLDS = {
 
 def detect_language(query: str) -> str:
     """Détecte la langue de la requête."""
-    q_lower = query.lower()
-    
-    # Français
-    french_markers = ["qu'est-ce", "comment", "pourquoi", "où", "quand", "quel", "est-ce", 
-                      "le", "la", "les", "un", "une", "des", "du", "de", "à", "en"]
-    french_score = sum(1 for m in french_markers if m in q_lower)
-    
-    # Anglais
-    english_markers = ["what", "how", "why", "where", "when", "which", "the", "is", "are", "of"]
-    english_score = sum(1 for m in english_markers if m in q_lower)
-    
-    if french_score > english_score:
-        return "fr"
-    elif english_score > french_score:
-        return "en"
-    
-    # Hébreu
-    if any('\u0590' <= c <= '\u05FF' for c in query):
-        return "he"
-    
-    # Arabe
-    if any('\u0600' <= c <= '\u06FF' for c in query):
-        return "ar"
-    
-    return "fr"  # Défaut
+    return langid.detect_language(query, default="fr")
 
 
 def detect_domain(query: str) -> str:
@@ -309,6 +286,43 @@ FORMAT:
 
 ⚠️ ÉVITE: "selon les chercheurs", "la littérature montre", termes académiques."""
 
+# TABLE DES SOURCES (?sources=table)
+# ══════════════════════════════════════════════════════════════════════════════
+
+SOURCES_MODE_DOC = (
+    "inline: sources complètes dans evidence_by_theme et references; "
+    "table: sources envoyées une fois (événement sources), puis citées par id"
+)
+
+
+def source_record(source: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """Source complète de l'événement "sources" (envoyée une seule fois)."""
+    return {
+        "id": source["id"],
+        "index": index + 1,
+        "title": source["title"],
+        "url": source["url"],
+        "provider": source["provider"],
+        "source_type": source["source_type"],
+        "timestamp": source.get("timestamp", ""),
+        "snippet": source["snippet"],
+        "raw_confidence": source.get("raw_confidence", 0),
+        "metadata": source.get("metadata", {})
+    }
+
+
+async def metered_stream(stream: AsyncGenerator[bytes, None], source_table: bool) -> AsyncGenerator[bytes, None]:
+    """Relaie le flux SSE en comptant les octets envoyés (comparaison inline / table)."""
+    sent = 0
+    try:
+        async for frame in stream:
+            sent += len(frame)
+            yield frame
+    finally:
+        logger.info(f"[DEEP_SEARCH] stream_bytes={sent} sources={'table' if source_table else 'inline'}")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
 # ENDPOINT PRINCIPAL
 # ══════════════════════════════════════════════════════════════════════════════
 
@@ -316,14 +330,16 @@ FORMAT:
 async def deep_search(
     q: str = Query(..., min_length=2, description="La requête de recherche"),
     lang: str = Query("fr", description="Langue de la réponse (fr/en/auto)"),
-    mode: str = Query("balanced", description="Mode: speed/balanced/deep")
+    mode: str = Query("balanced", description="Mode: speed/balanced/deep"),
+    sources: str = Query("inline", pattern="^(inline|table)$", description=SOURCES_MODE_DOC)
 ):
     """
     Endpoint principal de Deep Search V9 (SSE Streaming).
     Orchestre la recherche multi-API, le clustering et la synthèse.
     """
+    source_table = sources == "table"
     return StreamingResponse(
-        deep_search_generator_v9(q, lang, mode),
+        metered_stream(deep_search_generator_v9(q, lang, mode, source_table), source_table),
         media_type="text/event-stream"
     )
 
@@ -332,10 +348,19 @@ async def health_check():
     return {"status": "healthy", "service": "deep-search-v9"}
 
 
-async def deep_search_generator_v9(query: str, lang: str = "fr", mode: str = "balanced") -> AsyncGenerator[str, None]:
+async def deep_search_generator_v9(
+    query: str, lang: str = "fr", mode: str = "balanced", source_table: bool = False
+) -> AsyncGenerator[bytes, None]:
     """
     Générateur SSE pour la Deep Search Académique v9.
     
+    `source_table=True` (?sources=table): chaque source est envoyée une seule
+    fois dans l'événement "sources" juste après l'orchestration
+    ({sources: [{id, index, title, url, provider, source_type, timestamp,
+    snippet, raw_confidence, metadata}], total}); evidence_by_theme porte
+    alors {thème: [id, ...]} et references {ids: [...], total}. Sans le
+    flag, format historique (sources complètes dans chaque événement).
+    
     Ordre strict:
     1. Init
     2. Orchestration multi-API
@@ -360,9 +385,6 @@ async def deep_search_generator_v9(query: str, lang: str = "fr", mode: str = "ba
     domain = detect_domain(query)
     quotas = CATEGORY_QUOTAS.get(domain, CATEGORY_QUOTAS["general"])
     
-    def sse(event_type: str, data: Any) -> str:
-        return f"data: {json.dumps({'type': event_type, 'data': data}, ensure_ascii=False)}\n\n"
-    
     try:
         # ═══════════════════════════════════════════════════════════════════
         # ÉTAPE 1: INIT
@@ -422,6 +444,13 @@ async def deep_search_generator_v9(query: str, lang: str = "fr", mode: str = "ba
             "elapsed_ms": stats.get("total_time_ms", 0)
         })
         
+        if source_table:
+            # Table des sources: les événements suivants ne portent que des ids
+            yield sse("sources", {
+                "sources": [source_record(s, i) for i, s in enumerate(sources)],
+                "total": len(sources)
+            })
+        
         # ═══════════════════════════════════════════════════════════════════
         # ÉVÉNEMENT PIPELINE DEBUG - Transparence chaîne de traitement
         # ═══════════════════════════════════════════════════════════════════
@@ -589,45 +618,60 @@ Cite tes sources avec [X]. Sois précis et factuel."""
         # ═══════════════════════════════════════════════════════════════════
         evidence_markdown = generate_evidence_by_theme(clusters)
         
-        yield sse("evidence_by_theme", {
-            "markdown": evidence_markdown,
-            "clusters": {
-                theme: [
+        if source_table:
+            yield sse("evidence_by_theme", {
+                "markdown": evidence_markdown,
+                "clusters": {
+                    theme: [s["id"] for s in sources_list]
+                    for theme, sources_list in clusters.items()
+                }
+            })
+        else:
+            yield sse("evidence_by_theme", {
+                "markdown": evidence_markdown,
+                "clusters": {
+                    theme: [
+                        {
+                            "id": s["id"],
+                            "title": s["title"],
+                            "snippet": s["snippet"],
+                            "provider": s["provider"],
+                            "source_type": s["source_type"],
+                            "url": s["url"],
+                            "raw_confidence": s.get("raw_confidence", 0)
+                        }
+                        for s in sources_list
+                    ]
+                    for theme, sources_list in clusters.items()
+                }
+            })
+        
+        # ═══════════════════════════════════════════════════════════════════
+        # ÉTAPE 9: RÉFÉRENCES COMPLÈTES
+        # ═══════════════════════════════════════════════════════════════════
+        if source_table:
+            yield sse("references", {
+                "ids": [s["id"] for s in sources],
+                "total": len(sources)
+            })
+        else:
+            yield sse("references", {
+                "sources": [
                     {
                         "id": s["id"],
+                        "index": i + 1,
                         "title": s["title"],
-                        "snippet": s["snippet"],
+                        "url": s["url"],
                         "provider": s["provider"],
                         "source_type": s["source_type"],
-                        "url": s["url"],
-                        "raw_confidence": s.get("raw_confidence", 0)
+                        "timestamp": s.get("timestamp", ""),
+                        "snippet": s["snippet"][:200],
+                        "metadata": s.get("metadata", {})
                     }
-                    for s in sources_list
-                ]
-                for theme, sources_list in clusters.items()
-            }
-        })
-        
-        # ═══════════════════════════════════════════════════════════════════
-        # ÉTAPE 9: RÉFÉRENCES COMPLÈTES
-        # ═══════════════════════════════════════════════════════════════════
-        yield sse("references", {
-            "sources": [
-                {
-                    "id": s["id"],
-                    "index": i + 1,
-                    "title": s["title"],
-                    "url": s["url"],
-                    "provider": s["provider"],
-                    "source_type": s["source_type"],
-                    "timestamp": s.get("timestamp", ""),
-                    "snippet": s["snippet"][:200],
-                    "metadata": s.get("metadata", {})
-                }
-                for i, s in enumerate(sources)
-            ],
-            "total": len(sources)
-        })
+                    for i, s in enumerate(sources)
+                ],
+                "total": len(sources)
+            })
         
         # ═══════════════════════════════════════════════════════════════════
         # ÉTAPE 10: FIN
@@ -662,11 +706,13 @@ Cite tes sources avec [X]. Sois précis et factuel."""
 @router.get("/deep")
 async def deep_search_endpoint(
     q: str = Query(..., min_length=2, max_length=500, description="Requête de recherche"),
-    lang: str = Query("auto", description="Langue (fr, en, auto)")
+    lang: str = Query("auto", description="Langue (fr, en, auto)"),
+    sources: str = Query("inline", pattern="^(inline|table)$", description=SOURCES_MODE_DOC)
 ):
     """Endpoint Deep Search V9."""
+    source_table = sources == "table"
     return StreamingResponse(
-        deep_search_generator_v9(q, lang),
+        metered_stream(deep_search_generator_v9(q, lang, source_table=source_table), source_table),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -680,10 +726,11 @@ async def deep_search_endpoint(
 @router.get("/api/v6/deep-search")
 async def deep_search_v6_endpoint(
     q: str = Query(..., min_length=2, max_length=500),
-    lang: str = Query("auto")
+    lang: str = Query("auto"),
+    sources: str = Query("inline", pattern="^(inline|table)$", description=SOURCES_MODE_DOC)
 ):
     """Endpoint V6 compatible avec le frontend."""
-    return await deep_search_endpoint(q, lang)
+    return await deep_search_endpoint(q, lang, sources)
 
 
 # Legacy endpoint for backward compatibility
@@ -693,7 +740,7 @@ async def legacy_deep_search(
     lang: str = Query("auto")
 ):
     """Legacy endpoint - redirects to v9."""
-    return await deep_search_endpoint(q, lang)
+    return await deep_search_endpoint(q, lang, "inline")
 
 
 # ══════════════════════════════════════════════════════════════════════════════
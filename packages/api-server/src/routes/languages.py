@@ -5,29 +5,24 @@
 Endpoints pour la gestion des langues et traductions.
 """
 
-from fastapi import APIRouter, Query
-from typing import Optional
+from fastapi import APIRouter, Query, Request
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 from services.translation_service import (
     translation_service,
-    detect_language,
     get_supported_languages,
     get_ui_text,
     is_rtl,
     UI_TRANSLATIONS
 )
+from services.langid import identify
+from services.http_caching import CACHE_STATIC, EncodedPayload, cached_response, http_cache
 
 router = APIRouter()
 
 
-@router.get("/api/languages")
-async def list_languages():
-    """
-    Liste toutes les langues supportées.
-    
-    Returns:
-        Liste des langues avec code, nom, flag et support RTL
-    """
+def _languages_payload() -> dict:
     languages = get_supported_languages()
     
     return {
@@ -46,6 +41,18 @@ async def list_languages():
     }
 
 
+@router.get("/api/languages")
+async def list_languages(request: Request):
+    """
+    Liste toutes les langues supportées.
+    
+    Returns:
+        Liste des langues avec code, nom, flag et support RTL
+    """
+    payload = await http_cache.get("languages", _languages_payload)
+    return cached_response(request, payload, CACHE_STATIC)
+
+
 @router.get("/api/languages/detect")
 async def detect_text_language(text: str = Query(..., min_length=2)):
     """
@@ -57,7 +64,8 @@ async def detect_text_language(text: str = Query(..., min_length=2)):
     Returns:
         Code langue détecté avec confiance
     """
-    detected = detect_language(text)
+    detected, confidence = identify(text)
+    detected = detected or "fr"
     lang_info = get_supported_languages().get(detected, {})
     
     return {
@@ -67,7 +75,8 @@ async def detect_text_language(text: str = Query(..., min_length=2)):
             "code": detected,
             "name": lang_info.get("name", detected),
             "flag": lang_info.get("flag", "🌐"),
-            "rtl": lang_info.get("rtl", False)
+            "rtl": lang_info.get("rtl", False),
+            "confidence": confidence
         }
     }
 
@@ -89,12 +98,9 @@ async def translate_text(
     Returns:
         Texte traduit avec métadonnées
     """
-    # Détecter la langue source si auto
-    if source == "auto":
-        source = detect_language(text)
-    
-    # Traduire
-    translated = await translation_service.translate(text, target, source)
+    # Traduire (source "auto": détectée par le service, renvoyée avec la traduction)
+    translated, detected = (await translation_service.translate_batch_detailed([text], target, source))[0]
+    source = detected or source
     
     return {
         "success": True,
@@ -109,8 +115,24 @@ async def translate_text(
     }
 
 
+def _ui_translations_payload(lang: str) -> dict:
+    translations = UI_TRANSLATIONS.get(lang, UI_TRANSLATIONS.get("en", {}))
+    lang_info = get_supported_languages().get(lang, {})
+    
+    return {
+        "success": True,
+        "language": {
+            "code": lang,
+            "name": lang_info.get("name", lang),
+            "rtl": lang_info.get("rtl", False)
+        },
+        "translations": translations
+    }
+
+
 @router.get("/api/ui-translations")
 async def get_ui_translations(
+    request: Request,
     lang: str = Query("fr", description="Language code for UI translations")
 ):
     """
@@ -122,17 +144,34 @@ async def get_ui_translations(
     Returns:
         Dictionnaire des traductions UI
     """
-    translations = UI_TRANSLATIONS.get(lang, UI_TRANSLATIONS.get("en", {}))
-    lang_info = get_supported_languages().get(lang, {})
+    if lang in UI_TRANSLATIONS or lang in get_supported_languages():
+        payload = await http_cache.get(f"ui_translations:{lang}", lambda: _ui_translations_payload(lang))
+    else:
+        # Code inconnu: encodé à la volée, pas d'entrée de cache par valeur arbitraire
+        payload = EncodedPayload(_ui_translations_payload(lang))
+    return cached_response(request, payload, CACHE_STATIC)
+
+
+class TranslateBatchRequest(BaseModel):
+    """Request for translating many strings in one call"""
+    texts: List[str] = Field(..., min_length=1, max_length=500)
+    target: str = Field(..., min_length=2, max_length=5)
+    source: str = "auto"
+
+
+async def _translate_many(texts: List[str], target: str, source: str) -> dict:
+    # "auto" transmis tel quel: langue détectée texte par texte par le service
+    translated = await translation_service.translate_batch_detailed(texts, target, source)
     
     return {
         "success": True,
-        "language": {
-            "code": lang,
-            "name": lang_info.get("name", lang),
-            "rtl": lang_info.get("rtl", False)
-        },
-        "translations": translations
+        "source_language": source,
+        "target_language": target,
+        "count": len(texts),
+        "translations": [
+            {"original": original, "translated": result, "source_language": detected}
+            for original, (result, detected) in zip(texts, translated)
+        ]
     }
 
 
@@ -153,23 +192,23 @@ async def translate_batch(
     Returns:
         Liste des traductions
     """
-    texts = text.split("|")[:10]  # Max 10 textes
-    
-    if source == "auto" and texts:
-        source = detect_language(texts[0])
-    
-    results = []
-    for t in texts:
-        translated = await translation_service.translate(t.strip(), target, source)
-        results.append({
-            "original": t.strip(),
-            "translated": translated
-        })
-    
+    texts = [t.strip() for t in text.split("|")[:10]]  # Max 10 textes (utiliser POST pour plus)
+    return await _translate_many(texts, target, source)
+
+
+@router.post("/api/translate/batch")
+async def translate_batch_post(request: TranslateBatchRequest):
+    """
+    Traduit jusqu'à 500 textes (body JSON), dédoublonnés, servis par la
+    mémoire de traduction puis traduits en parallèle par paquets.
+    """
+    return await _translate_many(request.texts, request.target, request.source)
+
+
+@router.get("/api/translate/stats")
+async def translation_stats():
+    """Statistiques de la mémoire de traduction."""
     return {
         "success": True,
-        "source_language": source,
-        "target_language": target,
-        "count": len(results),
-        "translations": results
+        "stats": translation_service.get_stats()
     }
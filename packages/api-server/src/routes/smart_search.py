@@ -21,9 +21,9 @@ from fastapi.responses import StreamingResponse
 from services.smart_pipeline import (
     smart_pipeline_generator,
     classify_intent,
-    fallback_intent_classification,
-    sse
+    fallback_intent_classification
 )
+from services.stream_encoding import sse
 
 logger = logging.getLogger(__name__)
 
@@ -7,7 +7,7 @@ Endpoints pour la synthèse vocale et transcription.
 
 import base64
 from fastapi import APIRouter, Query, UploadFile, File, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from typing import Optional
 
 from services.voice_service import (
@@ -30,43 +30,67 @@ async def text_to_speech(
     """
     🔊 Convertit du texte en audio.
     
+    Le MP3 est streamé phrase par phrase: la lecture commence dès que la
+    première phrase est synthétisée. Les phrases déjà lues sont servies
+    depuis le cache audio (X-Cache: HIT).
+    
     Args:
         text: Texte à lire (max 5000 caractères)
         lang: Code langue
         voice: Voix spécifique ou auto
-        format: "mp3" pour audio brut, "base64" pour encodé
+        format: "mp3" pour audio brut (streamé), "base64" pour encodé
         
     Returns:
-        Audio MP3 ou base64 selon le format demandé
+        Audio MP3, ou base64 avec durée et timings mot à mot
+        ({text, start, end}) pour surligner ou sous-titrer la lecture
     """
-    audio_data = await tts_service.synthesize(text, lang, voice)
-    
-    if not audio_data:
-        raise HTTPException(
-            status_code=500, 
-            detail="TTS synthesis failed. Make sure edge-tts is installed."
-        )
-    
     if format == "base64":
+        result = await tts_service.synthesize_timed(text, lang, voice)
+        if not result:
+            raise HTTPException(
+                status_code=500, 
+                detail="TTS synthesis failed. Make sure edge-tts is installed."
+            )
         return {
             "success": True,
-            "audio_base64": base64.b64encode(audio_data).decode('utf-8'),
+            "audio_base64": base64.b64encode(result.audio).decode('ascii'),
             "format": "mp3",
-            "length_bytes": len(audio_data),
+            "length_bytes": len(result.audio),
+            "duration": result.duration,
+            "words": result.words,
             "text_length": len(text),
             "language": lang
         }
-    else:
-        # Retourner l'audio MP3 directement
-        return Response(
-            content=audio_data,
-            media_type="audio/mpeg",
-            headers={
-                "Content-Disposition": f'attachment; filename="speech.mp3"',
-                "X-Text-Length": str(len(text)),
-                "X-Language": lang
-            }
+    
+    cached = tts_service.is_cached(text, lang, voice)
+    chunks = tts_service.stream(text, lang, voice)
+    
+    # Premier morceau attendu avant d'envoyer les headers: une erreur de
+    # synthèse donne encore une vraie 500 plutôt qu'un flux vide
+    try:
+        first_chunk = await chunks.__anext__()
+    except Exception:
+        await chunks.aclose()
+        raise HTTPException(
+            status_code=500, 
+            detail="TTS synthesis failed. Make sure edge-tts is installed."
         )
+    
+    async def audio_stream():
+        yield first_chunk
+        async for chunk in chunks:
+            yield chunk
+    
+    return StreamingResponse(
+        audio_stream(),
+        media_type="audio/mpeg",
+        headers={
+            "Content-Disposition": f'attachment; filename="speech.mp3"',
+            "X-Text-Length": str(len(text)),
+            "X-Language": lang,
+            "X-Cache": "HIT" if cached else "MISS"
+        }
+    )
 
 
 @router.post("/api/voice/transcribe")
@@ -132,6 +156,15 @@ async def list_voices(
     }
 
 
+@router.get("/api/voice/stats")
+async def voice_stats():
+    """📊 État du cache audio TTS."""
+    return {
+        "success": True,
+        "tts": tts_service.get_stats()
+    }
+
+
 @router.get("/api/voice/test")
 async def test_voice(
     text: str = Query("Bonjour, je suis WikiAsk, votre assistant de recherche intelligent.", 
@@ -4,11 +4,13 @@ Routes requests to best available AI provider based on quotas and availability
 """
 import os
 import time
-from typing import Optional, Dict, Any
+import asyncio
+from typing import Optional, Dict, Any, List
 from groq import Groq
 import httpx
 from dotenv import load_dotenv
 from services.cache import cache_service
+from services.langid import detect_language
 from services.circuit_breaker import circuit_breaker
 try:
     from services.retry_handler import with_retry
@@ -24,6 +26,34 @@ def enhance_for_provider(prompt: str, provider: str) -> str:
 
 load_dotenv()
 
+# Historique de conversation: [{"role": "user"|"assistant"|"system", "content": str}]
+History = Optional[List[Dict[str, str]]]
+
+# Préfixe minimal mis en cache par Anthropic: 2048 tokens pour Haiku (1024
+# pour Sonnet / Opus). En dessous, cache_control est ignoré sans surcoût.
+# Estimation basse ~3 caractères/token: mieux vaut un point de cache de trop
+# (ignoré) qu'un préfixe cachable raté.
+CLAUDE_MIN_CACHE_TOKENS = 2048
+CHARS_PER_TOKEN = 3
+_EPHEMERAL = {"type": "ephemeral"}
+
+
+def build_messages(prompt: str, system_prompt: Optional[str] = None, history: History = None) -> List[Dict[str, str]]:
+    """
+    Messages au format OpenAI dans l'ordre préfixe stable → suffixe variable:
+    prompt système, historique (inchangé d'un tour à l'autre), puis la
+    requête courante. Les providers qui cachent les préfixes (DeepSeek,
+    OpenAI-compatibles) réutilisent ainsi tout sauf le dernier message.
+    """
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    for message in history or []:
+        if message.get("content"):
+            messages.append({"role": message.get("role", "user"), "content": message["content"]})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
 
 class AIProvider:
     """Base AI provider class"""
@@ -34,6 +64,8 @@ class AIProvider:
         self.daily_quota = daily_quota  # 0 = unlimited
         self.available = False
         self.last_error = None
+        # Tokens facturés / servis depuis le cache de prompt du provider
+        self.usage = {"requests": 0, "input_tokens": 0, "cached_tokens": 0, "cache_write_tokens": 0, "output_tokens": 0}
     
     @property
     def requests_today(self) -> int:
@@ -48,7 +80,32 @@ class AIProvider:
         """Check if provider can handle another request"""
         return cache_service.check_quota_available(self.name, self.daily_quota)
     
-    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 2048) -> str:
+    async def probe(self) -> bool:
+        """Check availability without blocking startup - override for network checks"""
+        return self.available
+    
+    def record_usage(self, input_tokens: int = 0, cached_tokens: int = 0, cache_write_tokens: int = 0, output_tokens: int = 0):
+        """Accumulate token usage reported by the provider (input_tokens includes cached ones)"""
+        self.usage["requests"] += 1
+        self.usage["input_tokens"] += input_tokens or 0
+        self.usage["cached_tokens"] += cached_tokens or 0
+        self.usage["cache_write_tokens"] += cache_write_tokens or 0
+        self.usage["output_tokens"] += output_tokens or 0
+    
+    def record_openai_usage(self, usage: Optional[Dict[str, Any]]):
+        """Usage block of OpenAI-compatible APIs (OpenRouter, DeepSeek, Mistral, Groq)"""
+        if not usage:
+            return
+        details = usage.get("prompt_tokens_details") or {}
+        cached = details.get("cached_tokens") or usage.get("prompt_cache_hit_tokens") or 0
+        self.record_usage(usage.get("prompt_tokens", 0), cached, 0, usage.get("completion_tokens", 0))
+    
+    def usage_stats(self) -> Dict[str, Any]:
+        stats = dict(self.usage)
+        stats["cache_hit_ratio"] = round(stats["cached_tokens"] / stats["input_tokens"], 3) if stats["input_tokens"] else 0.0
+        return stats
+    
+    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 2048, history: History = None) -> str:
         """Call AI provider - to be implemented by subclasses"""
         raise NotImplementedError
 
@@ -74,15 +131,10 @@ class GroqProvider(AIProvider):
     
     @circuit_breaker(name="groq")
     @with_retry()
-    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 8000) -> str:
+    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 8000, history: History = None) -> str:
         """Call Groq API - supports up to 8000 tokens for DEEP mode"""
         try:
-            messages = []
-            
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            
-            messages.append({"role": "user", "content": prompt})
+            messages = build_messages(prompt, system_prompt, history)
             
             completion = self.client.chat.completions.create(
                 messages=messages,
@@ -92,6 +144,9 @@ class GroqProvider(AIProvider):
             )
             
             self.increment_usage()
+            usage = getattr(completion, "usage", None)
+            if usage is not None:
+                self.record_openai_usage(usage.model_dump() if hasattr(usage, "model_dump") else dict(usage))
             return completion.choices[0].message.content
         
         except Exception as e:
@@ -120,14 +175,11 @@ class MistralProvider(AIProvider):
     
     @circuit_breaker(name="mistral")
     @with_retry()
-    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 4000) -> str:
+    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 4000, history: History = None) -> str:
         """Call Mistral API"""
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
-                messages = []
-                if system_prompt:
-                    messages.append({"role": "system", "content": system_prompt})
-                messages.append({"role": "user", "content": prompt})
+                messages = build_messages(prompt, system_prompt, history)
                 
                 response = await client.post(
                     "https://api.mistral.ai/v1/chat/completions",
@@ -142,7 +194,9 @@ class MistralProvider(AIProvider):
                 
                 if response.status_code == 200:
                     self.increment_usage()
-                    return response.json()["choices"][0]["message"]["content"]
+                    data = response.json()
+                    self.record_openai_usage(data.get("usage"))
+                    return data["choices"][0]["message"]["content"]
                 else:
                     raise Exception(f"Mistral returned status {response.status_code}")
         
@@ -170,23 +224,72 @@ class ClaudeProvider(AIProvider):
             print("[WARN] Anthropic API key not configured")
             self.available = False
     
+    @staticmethod
+    def build_payload(prompt: str, system_prompt: Optional[str] = None, history: History = None) -> Dict[str, Any]:
+        """
+        system + messages, avec des points de cache Anthropic (cache_control)
+        sur le préfixe stable quand il atteint la taille minimale cachable
+        (CLAUDE_MIN_CACHE_TOKENS, estimée en caractères):
+        1. fin du prompt système - partagé par tous les appels qui l'utilisent
+        2. fin de l'historique (résumé + messages) - préfixe du tour suivant
+           tant que la fenêtre de conversation ne glisse pas
+        Les messages "system" de l'historique (résumé) vont dans des blocs
+        système après le prompt système.
+        """
+        min_chars = CLAUDE_MIN_CACHE_TOKENS * CHARS_PER_TOKEN
+        system_blocks = []
+        if system_prompt:
+            block = {"type": "text", "text": system_prompt}
+            if len(system_prompt) >= min_chars:
+                block["cache_control"] = _EPHEMERAL
+            system_blocks.append(block)
+        
+        messages: List[Dict[str, Any]] = []
+        prefix_chars = len(system_prompt or "")
+        for message in history or []:
+            if not message.get("content"):
+                continue
+            prefix_chars += len(message["content"])
+            if message.get("role") == "system":
+                system_blocks.append({"type": "text", "text": message["content"]})
+                continue
+            role = "assistant" if message.get("role") == "assistant" else "user"
+            # Anthropic impose l'alternance user/assistant: fusion des messages consécutifs
+            if messages and messages[-1]["role"] == role:
+                messages[-1]["content"].append({"type": "text", "text": message["content"]})
+            else:
+                messages.append({"role": role, "content": [{"type": "text", "text": message["content"]}]})
+        # Le premier message doit venir de l'utilisateur
+        if messages and messages[0]["role"] == "assistant":
+            messages.pop(0)
+        
+        # Dernier bloc du préfixe stable (avant la requête courante)
+        last = messages[-1]["content"][-1] if messages else system_blocks[-1] if system_blocks else None
+        if last is not None and prefix_chars >= min_chars:
+            last["cache_control"] = _EPHEMERAL
+        
+        if messages and messages[-1]["role"] == "user":
+            messages[-1]["content"].append({"type": "text", "text": prompt})
+        else:
+            messages.append({"role": "user", "content": [{"type": "text", "text": prompt}]})
+        
+        payload: Dict[str, Any] = {"messages": messages}
+        if system_blocks:
+            payload["system"] = system_blocks
+        return payload
+    
     @circuit_breaker(name="claude")
     @with_retry()
-    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 4096) -> str:
-        """Call Claude API - Haiku model"""
+    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 4096, history: History = None) -> str:
+        """Call Claude API - Haiku model, with prompt caching on the stable prefix"""
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
-                messages = [{"role": "user", "content": prompt}]
-                
                 payload = {
                     "model": "claude-3-5-haiku-20241022",
                     "max_tokens": max_tokens,
-                    "messages": messages
+                    **self.build_payload(prompt, system_prompt, history)
                 }
                 
-                if system_prompt:
-                    payload["system"] = system_prompt
-                
                 response = await client.post(
                     "https://api.anthropic.com/v1/messages",
                     headers={
@@ -199,7 +302,12 @@ class ClaudeProvider(AIProvider):
                 
                 if response.status_code == 200:
                     self.increment_usage()
-                    return response.json()["content"][0]["text"]
+                    data = response.json()
+                    usage = data.get("usage") or {}
+                    cached = usage.get("cache_read_input_tokens", 0) or 0
+                    written = usage.get("cache_creation_input_tokens", 0) or 0
+                    self.record_usage(usage.get("input_tokens", 0) + cached + written, cached, written, usage.get("output_tokens", 0))
+                    return data["content"][0]["text"]
                 else:
                     error_detail = response.text[:200]
                     raise Exception(f"Claude returned status {response.status_code}: {error_detail}")
@@ -230,26 +338,43 @@ class GeminiProvider(AIProvider):
     
     @circuit_breaker(name="gemini")
     @with_retry()
-    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 8000) -> str:
-        """Call Gemini API"""
+    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 8000, history: History = None) -> str:
+        """Call Gemini API (systemInstruction + history first: implicit prefix caching)"""
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
-                full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+                system_parts = [{"text": system_prompt}] if system_prompt else []
+                contents = []
+                for message in history or []:
+                    if not message.get("content"):
+                        continue
+                    if message.get("role") == "system":
+                        system_parts.append({"text": message["content"]})
+                    else:
+                        role = "model" if message.get("role") == "assistant" else "user"
+                        contents.append({"role": role, "parts": [{"text": message["content"]}]})
+                contents.append({"role": "user", "parts": [{"text": prompt}]})
+                
+                payload = {
+                    "contents": contents,
+                    "generationConfig": {
+                        "temperature": 0.8,  # Augmenté pour plus de diversité
+                        "maxOutputTokens": max_tokens  # Dynamic
+                    }
+                }
+                if system_parts:
+                    payload["systemInstruction"] = {"parts": system_parts}
                 
                 response = await client.post(
                     f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={self.api_key}",
-                    json={
-                        "contents": [{"parts": [{"text": full_prompt}]}],
-                        "generationConfig": {
-                            "temperature": 0.8,  # Augmenté pour plus de diversité
-                            "maxOutputTokens": max_tokens  # Dynamic
-                        }
-                    }
+                    json=payload
                 )
                 
                 if response.status_code == 200:
                     self.increment_usage()
-                    return response.json()["candidates"][0]["content"]["parts"][0]["text"]
+                    data = response.json()
+                    usage = data.get("usageMetadata") or {}
+                    self.record_usage(usage.get("promptTokenCount", 0), usage.get("cachedContentTokenCount", 0), 0, usage.get("candidatesTokenCount", 0))
+                    return data["candidates"][0]["content"]["parts"][0]["text"]
                 else:
                     raise Exception(f"Gemini returned status {response.status_code}")
         
@@ -279,14 +404,11 @@ class OpenRouterProvider(AIProvider):
     
     @circuit_breaker(name="openrouter")
     @with_retry()
-    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 4096) -> str:
-        """Call DeepSeek-V3 via OpenRouter"""
+    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 4096, history: History = None) -> str:
+        """Call DeepSeek-V3 via OpenRouter (DeepSeek caches identical prefixes automatically)"""
         try:
             async with httpx.AsyncClient(timeout=45.0) as client:
-                messages = []
-                if system_prompt:
-                    messages.append({"role": "system", "content": system_prompt})
-                messages.append({"role": "user", "content": prompt})
+                messages = build_messages(prompt, system_prompt, history)
                 
                 response = await client.post(
                     "https://openrouter.ai/api/v1/chat/completions",
@@ -300,13 +422,16 @@ class OpenRouterProvider(AIProvider):
                         "model": "deepseek/deepseek-chat", # V3 par défaut maintenant
                         "messages": messages,
                         "temperature": 0.7,
-                        "max_tokens": max_tokens
+                        "max_tokens": max_tokens,
+                        "usage": {"include": True}  # Renvoie les cached_tokens
                     }
                 )
                 
                 if response.status_code == 200:
                     self.increment_usage()
-                    return response.json()["choices"][0]["message"]["content"]
+                    data = response.json()
+                    self.record_openai_usage(data.get("usage"))
+                    return data["choices"][0]["message"]["content"]
                 else:
                     raise Exception(f"OpenRouter returned status {response.status_code}: {response.text[:200]}")
         
@@ -321,41 +446,47 @@ class OllamaProvider(AIProvider):
     def __init__(self):
         super().__init__("ollama", priority=5, daily_quota=0)  # Unlimited
         self.base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-        
+        # Availability is checked by probe() in the background, not at import
+    
+    async def probe(self) -> bool:
+        """Ping the local Ollama server"""
+        was_available = self.available
         try:
-            response = httpx.get(f"{self.base_url}/api/tags", timeout=2)
-            if response.status_code == 200:
-                self.available = True
+            async with httpx.AsyncClient(timeout=2.0) as client:
+                response = await client.get(f"{self.base_url}/api/tags")
+            self.available = response.status_code == 200
+            if self.available and not was_available:
                 print("[OK] Ollama provider initialized (unlimited local)")
-            else:
-                self.available = False
+            elif not self.available and was_available:
                 print("[WARN] Ollama not responding")
         except Exception as e:
+            if was_available:
+                print(f"[WARN] Ollama not available: {e}")
             self.available = False
-            print(f"[WARN] Ollama not available: {e}")
+        return self.available
     
     @circuit_breaker(name="ollama")
-    async def call(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Call Ollama API"""
+    async def call(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 2048, history: History = None) -> str:
+        """Call Ollama chat API (the server reuses its KV cache for a shared prefix)"""
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
                 payload = {
                     "model": "llama3.1",
-                    "prompt": prompt,
-                    "stream": False
+                    "messages": build_messages(prompt, system_prompt, history),
+                    "stream": False,
+                    "options": {"num_predict": max_tokens}
                 }
                 
-                if system_prompt:
-                    payload["system"] = system_prompt
-                
                 response = await client.post(
-                    f"{self.base_url}/api/generate",
+                    f"{self.base_url}/api/chat",
                     json=payload
                 )
                 
                 if response.status_code == 200:
                     self.increment_usage()
-                    return response.json()["response"]
+                    data = response.json()
+                    self.record_usage(data.get("prompt_eval_count", 0), 0, 0, data.get("eval_count", 0))
+                    return data["message"]["content"]
                 else:
                     raise Exception(f"Ollama returned status {response.status_code}")
         
@@ -381,24 +512,57 @@ class AIRouter:
             OllamaProvider(),        # Priority 5: Unlimited local
         ]
         
-        # Filter only available providers
-        self.available_providers = [p for p in self.providers if p.available]
-        
+        self._probe_task: Optional[asyncio.Task] = None
+        self._report()
+    
+    @property
+    def available_providers(self):
+        """Providers currently available (network-probed ones update in the background)"""
+        return [p for p in self.providers if p.available]
+    
+    def _report(self):
         if not self.available_providers:
             print("[ERROR] No AI providers available!")
         else:
             print(f"[OK] AI Router ready with {len(self.available_providers)} provider(s)")
             print(f"   Total daily quota: {sum(p.daily_quota for p in self.available_providers if p.daily_quota > 0)} + unlimited")
     
+    async def probe_providers(self):
+        """Run every provider's availability check concurrently"""
+        await asyncio.gather(*(p.probe() for p in self.providers), return_exceptions=True)
+    
+    def start_probes(self, interval: float = 300):
+        """Probe providers now, then every `interval` seconds, without blocking the caller"""
+        async def _loop():
+            await self.probe_providers()
+            self._report()
+            while True:
+                await asyncio.sleep(interval)
+                await self.probe_providers()
+        
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(_loop())
+        return self._probe_task
+    
     async def route(
         self, 
         prompt: str, 
         system_prompt: Optional[str] = None,
         preferred_provider: Optional[str] = None,
-        max_tokens: int = 2048
+        max_tokens: int = 2048,
+        history: History = None,
+        grounded: bool = False
     ) -> Dict[str, Any]:
         """
         Route request to best available provider based on quotas
+        
+        Le prompt est envoyé comme préfixe stable (system_prompt + guardrails,
+        puis `history` si l'appelant en fournit un) + suffixe variable
+        (`prompt`): les données propres à la requête vont dans `prompt`,
+        jamais dans `system_prompt`.
+        `grounded=True`: ajoute les règles anti-hallucination au system_prompt
+        (quelques centaines de tokens d'entrée en plus par requête, d'où le
+        défaut à False).
         Returns: {response: str, source: str, processing_time_ms: float, quota_remaining: int}
         """
         if not self.available_providers:
@@ -407,14 +571,15 @@ class AIRouter:
 
         start_time = time.time()
         
-        # ANTI-HALLUCINATION: Enhance system prompt automatically
-        try:
-            from services.anti_hallucination import enhance_system_prompt_anti_hallucination
-            # Detect language from prompt
-            lang = "fr" if any(w in prompt.lower() for w in ["bonjour", "comment", "quoi", "pourquoi", "quel"]) else "en"
-            system_prompt = enhance_system_prompt_anti_hallucination(system_prompt or "", lang)
-        except ImportError:
-            pass  # Fallback if module not available
+        # ANTI-HALLUCINATION: guardrails pour les réponses sourcées uniquement
+        if grounded:
+            try:
+                from services.anti_hallucination import enhance_system_prompt_anti_hallucination
+                # Detect language from prompt (memoized n-gram model)
+                lang = detect_language(prompt, default="en")
+                system_prompt = enhance_system_prompt_anti_hallucination(system_prompt or "", lang)
+            except ImportError:
+                pass  # Fallback if module not available
         
         # Try preferred provider first if specified
         if preferred_provider:
@@ -428,9 +593,9 @@ class AIRouter:
                     local_system_prompt = enhance_for_provider(system_prompt or "", provider.name)
 
                     if provider.name == "groq":
-                        response = await provider.call(prompt, local_system_prompt, max_tokens)
+                        response = await provider.call(prompt, local_system_prompt, max_tokens, history=history)
                     else:
-                        response = await provider.call(prompt, local_system_prompt, max_tokens)
+                        response = await provider.call(prompt, local_system_prompt, max_tokens, history=history)
                         
                     processing_time = (time.time() - start_time) * 1000
                     return {
@@ -453,9 +618,9 @@ class AIRouter:
                 local_system_prompt = enhance_for_provider(system_prompt or "", provider.name)
 
                 if provider.name == "groq":
-                    response = await provider.call(prompt, local_system_prompt, max_tokens)
+                    response = await provider.call(prompt, local_system_prompt, max_tokens, history=history)
                 else:
-                    response = await provider.call(prompt, local_system_prompt, max_tokens)
+                    response = await provider.call(prompt, local_system_prompt, max_tokens, history=history)
                     
                 processing_time = (time.time() - start_time) * 1000
                 
@@ -483,10 +648,21 @@ class AIRouter:
                 "daily_quota": provider.daily_quota,
                 "requests_today": provider.requests_today,
                 "quota_remaining": provider.daily_quota - provider.requests_today if provider.daily_quota > 0 else -1,
-                "last_error": provider.last_error
+                "last_error": provider.last_error,
+                "prompt_cache": provider.usage_stats()
             }
             for provider in self.providers
         }
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Prompt-cache token totals across providers"""
+        totals = {"input_tokens": 0, "cached_tokens": 0, "cache_write_tokens": 0}
+        for provider in self.providers:
+            for key in totals:
+                totals[key] += provider.usage[key]
+        totals["cache_hit_ratio"] = round(totals["cached_tokens"] / totals["input_tokens"], 3) if totals["input_tokens"] else 0.0
+        totals["providers"] = {p.name: p.usage_stats() for p in self.providers if p.usage["requests"]}
+        return totals
 
 
 # Singleton instance
@@ -499,12 +499,3 @@ async def smart_pipeline_generator(
             "phases_completed": ["intent", "fast", "medium", "slow", "rerank", "synthesis"]
         }
     }
-
-
-# ══════════════════════════════════════════════════════════════════════════════
-# HELPER: SSE FORMATTER
-# ══════════════════════════════════════════════════════════════════════════════
-
-def sse(event_type: str, data: Any) -> str:
-    """Formate un événement SSE."""
-    return f"data: {json.dumps({'type': event_type, 'data': data}, ensure_ascii=False)}\n\n"
@@ -17,6 +17,8 @@ from typing import Dict, List, Any
 from urllib.parse import quote
 import httpx
 
+from services.upstream_limiter import upstream_limiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,7 +40,8 @@ MEGA_APIS = {
     "semantic_scholar": {
         "url": "https://api.semanticscholar.org/graph/v1/paper/search?query={query}&limit=5&fields=title,abstract,url",
         "domains": ["tech", "knowledge", "health", "finance"],
-        "timeout": 3.0
+        "timeout": 3.0,
+        "rate_limit": "100/5min"
     },
     "pubmed": {
         "url": "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=pubmed&term={query}&retmode=json&retmax=5",
@@ -354,12 +357,14 @@ MEGA_APIS = {
     "newsapi": {
         "url": "https://newsapi.org/v2/everything?q={query}&pageSize=5&apiKey=demo",
         "domains": ["knowledge", "entertainment", "sports", "finance"],
-        "timeout": 2.0
+        "timeout": 2.0,
+        "rate_limit": "100/day"
     },
     "gnews": {
         "url": "https://gnews.io/api/v4/search?q={query}&max=5&token=demo",
         "domains": ["knowledge"],
-        "timeout": 2.0
+        "timeout": 2.0,
+        "rate_limit": "100/day"
     },
     "mediastack": {
         "url": "http://api.mediastack.com/v1/news?access_key=demo&keywords={query}&limit=5",
@@ -504,6 +509,7 @@ class MegaAPIFetcher:
     
     def __init__(self):
         self._client = None
+        upstream_limiter.register_registry(MEGA_APIS)
     
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None:
@@ -517,7 +523,13 @@ class MegaAPIFetcher:
             url = config["url"].format(query=quote(query))
             timeout = config.get("timeout", 2.0)
             
+            # 🚦 Budget upstream (pas d'attente: le mode Expert est fail-fast)
+            if not await upstream_limiter.acquire(api_name, url, max_wait=0):
+                return {"source": api_name, "success": False, "skipped": True}
+            
             resp = await client.get(url, timeout=timeout)
+            if resp.status_code == 429:
+                upstream_limiter.penalize(api_name, url, resp.headers.get("Retry-After"))
             if resp.status_code == 200:
                 return {
                     "source": api_name,
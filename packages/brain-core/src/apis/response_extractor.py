@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+✂️ RESPONSE EXTRACTOR - Parsing borné des réponses APIs
+========================================================
+Les réponses du MegaBrain peuvent peser plusieurs Mo alors que l'IA
+n'en voit que quelques lignes. Chaque entrée du registre peut déclarer
+ce qu'elle garde:
+
+    "extract": {
+        "path": "articles",                       # chemin pointé vers la liste ("" = racine)
+        "fields": ["title", "url", "source.name"],  # champs gardés (pointés = imbriqués)
+        "max_items": 5
+    }
+
+Le parsing s'arrête dès que max_items éléments sont décodés, sans
+attendre ni décoder le reste du payload. Sans spec, la réponse est
+bornée en taille et compactée génériquement.
+"""
+
+import json
+import re
+from itertools import islice
+from typing import Dict, Any, List, Optional, Iterator
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+MAX_RESPONSE_BYTES = 512 * 1024   # Au-delà on arrête de lire le flux
+DEFAULT_MAX_ITEMS = 5
+MAX_FIELD_CHARS = 500
+MAX_DICT_KEYS = 12
+MAX_DEPTH = 3
+
+# Conteneurs usuels essayés quand une réponse tronquée n'a pas de spec
+AUTO_ITEM_PATHS = ["results", "articles", "items", "data", "hits", "docs", "works", "meals", "drinks", "teams"]
+
+_decoder = json.JSONDecoder()
+_WS = re.compile(r"[ \t\n\r]*")
+
+
+def _skip_ws(text: str, i: int) -> int:
+    return _WS.match(text, i).end()
+
+
+def _split_path(path: Optional[str]) -> List[str]:
+    return [p for p in (path or "").split(".") if p]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PARSING BORNÉ
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _find_key(text: str, i: int, key: str) -> Optional[int]:
+    """Depuis un objet en text[i], retourne l'index de la valeur de `key`."""
+    i = _skip_ws(text, i)
+    if text[i:i + 1] != "{":
+        return None
+    i = _skip_ws(text, i + 1)
+    while i < len(text) and text[i] != "}":
+        name, i = _decoder.raw_decode(text, i)
+        i = _skip_ws(text, i)
+        i = _skip_ws(text, i + 1)  # ':'
+        if name == key:
+            return i
+        _, i = _decoder.raw_decode(text, i)  # Valeur sautée
+        i = _skip_ws(text, i)
+        if text[i:i + 1] == ",":
+            i = _skip_ws(text, i + 1)
+    return None
+
+
+def iter_items(text: str, path: Optional[str]) -> Iterator[Any]:
+    """
+    Itère les éléments de la liste située à `path` sans décoder le reste.
+    Fonctionne sur un JSON tronqué: s'arrête au premier élément incomplet.
+    """
+    try:
+        i = 0
+        for key in _split_path(path):
+            found = _find_key(text, i, key)
+            if found is None:
+                return
+            i = found
+        i = _skip_ws(text, i)
+        if text[i:i + 1] != "[":
+            value, _ = _decoder.raw_decode(text, i)
+            yield value
+            return
+        i = _skip_ws(text, i + 1)
+        while i < len(text) and text[i] != "]":
+            item, i = _decoder.raw_decode(text, i)
+            yield item
+            i = _skip_ws(text, i)
+            if text[i:i + 1] == ",":
+                i = _skip_ws(text, i + 1)
+    except (ValueError, IndexError):
+        return  # JSON tronqué ou inattendu
+
+
+def has_enough_items(text: str, spec: Optional[Dict[str, Any]]) -> bool:
+    """True si le buffer contient déjà max_items éléments complets."""
+    if not spec or "path" not in spec:
+        return False
+    max_items = spec.get("max_items", DEFAULT_MAX_ITEMS)
+    return len(list(islice(iter_items(text, spec["path"]), max_items))) >= max_items
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# COMPACTION
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _get_field(item: Any, field: str) -> Any:
+    for key in _split_path(field):
+        if isinstance(item, dict):
+            item = item.get(key)
+        elif isinstance(item, list) and key.isdigit() and int(key) < len(item):
+            item = item[int(key)]
+        else:
+            return None
+    return item
+
+
+def compact_value(value: Any, depth: int = MAX_DEPTH) -> Any:
+    """Copie bornée d'une valeur JSON (clés, éléments, longueur des chaînes)."""
+    if isinstance(value, str):
+        return value[:MAX_FIELD_CHARS]
+    if isinstance(value, dict):
+        if depth <= 0:
+            return None
+        out = {}
+        for key, item in islice(value.items(), MAX_DICT_KEYS):
+            compacted = compact_value(item, depth - 1)
+            if compacted is not None:
+                out[key] = compacted
+        return out
+    if isinstance(value, list):
+        if depth <= 0:
+            return None
+        return [compact_value(item, depth - 1) for item in value[:DEFAULT_MAX_ITEMS]]
+    return value
+
+
+def compact_item(item: Any, fields: Optional[List[str]]) -> Any:
+    """Garde uniquement les champs déclarés (à plat, clés pointées)."""
+    if not fields or not isinstance(item, dict):
+        return compact_value(item, depth=2)
+    out = {}
+    for field in fields:
+        value = _get_field(item, field)
+        if value is not None and value != "":
+            out[field] = compact_value(value, depth=1)
+    return out
+
+
+def extract_data(text: str, spec: Optional[Dict[str, Any]] = None, truncated: bool = False) -> Any:
+    """
+    Parse un payload (éventuellement tronqué) en données compactes.
+    Lève ValueError si le payload n'est pas du JSON exploitable.
+    """
+    if spec and "path" in spec:
+        max_items = spec.get("max_items", DEFAULT_MAX_ITEMS)
+        items = list(islice(iter_items(text, spec["path"]), max_items))
+        if not items and not truncated:
+            # Chemin absent: on retombe sur la compaction générique
+            return compact_value(json.loads(text))
+        return [compact_item(item, spec.get("fields")) for item in items]
+
+    if not truncated:
+        return compact_value(json.loads(text))
+
+    # Tronqué sans spec: on tente les conteneurs usuels
+    stripped = text.lstrip()
+    paths = [""] if stripped.startswith("[") else AUTO_ITEM_PATHS
+    for path in paths:
+        items = list(islice(iter_items(text, path), DEFAULT_MAX_ITEMS))
+        if items:
+            return {path: [compact_value(item, depth=2) for item in items]} if path else [
+                compact_value(item, depth=2) for item in items
+            ]
+    raise ValueError("Truncated payload without extractable items")
+
+
+def format_item(item: Any, max_chars: int = 250) -> str:
+    """Rend un élément extrait en une ligne lisible pour l'IA."""
+    if isinstance(item, dict):
+        line = " | ".join(f"{k}: {v}" for k, v in item.items() if not isinstance(v, (dict, list)))
+        return (line or str(item))[:max_chars]
+    return str(item)[:max_chars]
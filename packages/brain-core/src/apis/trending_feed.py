@@ -0,0 +1,495 @@
+# -*- coding: utf-8 -*-
+"""
+📰 TRENDING FEED - Articles tendance rafraîchis en tâche de fond
+================================================================
+Les routes /api/trending* ne contactent plus GNews / NewsAPI / PubMed:
+elles lisent un snapshot en mémoire.
+
+- Rafraîchissement de toutes les catégories toutes les
+  TRENDING_REFRESH_SECONDS (un client httpx partagé, catégories en
+  parallèle), quota GNews journalier suivi dans CacheService
+- Snapshot versionné ({"version", "updated_at", "categories"}) stocké
+  dans CacheService: les autres workers et le prochain démarrage le
+  reprennent au lieu de refaire les appels
+- Articles normalisés une fois: doublons entre sources retirés (URL
+  canonique ou titre), image par défaut de la catégorie déjà posée
+- Source en échec: la catégorie garde ses articles précédents, puis
+  les articles statiques de secours
+
+Usage:
+```python
+trending_feed.start()                       # lifespan de l'app
+snapshot = await trending_feed.current()    # requête: lecture mémoire
+articles = snapshot["categories"]["tech"][:6]
+```
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")
+GNEWS_API_KEY = os.getenv("GNEWS_API_KEY", "")
+
+REFRESH_INTERVAL = int(os.getenv("TRENDING_REFRESH_SECONDS", "3600"))  # 2 appels GNews par refresh
+FEED_SIZE = 12              # Articles gardés par catégorie (limite max servie)
+GNEWS_DAILY_QUOTA = 100     # Offre gratuite GNews
+FETCH_TIMEOUT = 10.0        # Par catégorie, pendant le refresh
+FIRST_LOAD_TIMEOUT = 8.0    # Attente max d'une requête avant le premier snapshot
+SNAPSHOT_NAME = "trending_feed"
+SNAPSHOT_TTL = 86400        # Snapshot périmé encore préférable aux articles statiques
+
+# Images par défaut par catégorie
+DEFAULT_IMAGES = {
+    "tech": "https://images.unsplash.com/photo-1518770660439-4636190af475?w=400&h=200&fit=crop",
+    "ai": "https://images.unsplash.com/photo-1677442136019-21780ecad995?w=400&h=200&fit=crop",
+    "science": "https://images.unsplash.com/photo-1507413245164-6160d8298b31?w=400&h=200&fit=crop",
+    "health": "https://images.unsplash.com/photo-1576091160550-2173dba999ef?w=400&h=200&fit=crop",
+    "cinema": "https://images.unsplash.com/photo-1536440136628-849c177e76a1?w=400&h=200&fit=crop",
+    "food": "https://images.unsplash.com/photo-1504674900247-0877df9cc836?w=400&h=200&fit=crop",
+    "lifestyle": "https://images.unsplash.com/photo-1511632765486-a01980e01a18?w=400&h=200&fit=crop",
+    "travel": "https://images.unsplash.com/photo-1469854523086-cc02fe5d8800?w=400&h=200&fit=crop",
+    "default": "https://images.unsplash.com/photo-1504711434969-e33886168f5c?w=400&h=200&fit=crop"
+}
+
+# Image de repli par catégorie du flux
+CATEGORY_IMAGES = {
+    "tech": DEFAULT_IMAGES["default"],
+    "science": DEFAULT_IMAGES["science"],
+    "lifestyle": DEFAULT_IMAGES["lifestyle"],
+}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ARTICLES STATIQUES DE SECOURS
+# ══════════════════════════════════════════════════════════════════════════════
+
+FALLBACK_ARTICLES: Dict[str, List[Dict[str, str]]] = {
+    "tech": [
+        {
+            "title": "L'actualité en France : ce qu'il faut retenir",
+            "description": "Retrouvez les derniers événements marquants de la journée en France et dans le monde.",
+            "image": "https://images.unsplash.com/photo-1504711434969-e33886168f5c?w=500&h=300&fit=crop",
+            "url": "https://www.lemonde.fr/",
+            "source": "WikiAsk",
+            "date": "À l'instant"
+        },
+        {
+            "title": "Les nouvelles frontières de la tech en 2024",
+            "description": "Quantum computing, IA, robotique - découvrez les technologies qui façonnent notre futur.",
+            "image": "https://images.unsplash.com/photo-1451187580459-43490279c0fa?w=500&h=300&fit=crop",
+            "url": "https://www.futura-sciences.com/tech/",
+            "source": "WikiAsk",
+            "date": "2025"
+        },
+        {
+            "title": "Le futur de la mobilité urbaine",
+            "description": "Entre véhicules autonomes et drones taxis, comment nous déplacerons-nous demain ?",
+            "image": "https://images.unsplash.com/photo-1555529733-0e670560f7e1?w=500&h=300&fit=crop",
+            "url": "#",
+            "source": "WikiAsk",
+            "date": "2025"
+        }
+    ],
+    "science": [
+        {
+            "title": "Dernières avancées en neurosciences",
+            "description": "Les chercheurs font des progrès significatifs dans la compréhension du cerveau humain.",
+            "image": "https://images.unsplash.com/photo-1559757175-9e351c95369d?w=500&h=300&fit=crop",
+            "url": "https://www.nature.com/subjects/neuroscience",
+            "source": "Nature",
+            "date": "2025",
+            "type": "science"
+        },
+        {
+            "title": "L'IA au service de la recherche médicale",
+            "description": "Comment l'intelligence artificielle accélère les découvertes en santé.",
+            "image": "https://images.unsplash.com/photo-1532187863486-abf9dbad1b69?w=500&h=300&fit=crop",
+            "url": "https://pubmed.ncbi.nlm.nih.gov/",
+            "source": "PubMed",
+            "date": "2025",
+            "type": "peer_reviewed"
+        },
+        {
+            "title": "Exploration spatiale : cap sur Mars",
+            "description": "Les nouvelles missions qui préparent l'arrivée de l'homme sur la planète rouge.",
+            "image": "https://images.unsplash.com/photo-1451187580459-43490279c0fa?w=500&h=300&fit=crop",
+            "url": "#",
+            "source": "ESA",
+            "date": "2025",
+            "type": "science"
+        }
+    ],
+    # En attendant une API lifestyle, on met des beaux contenus par défaut
+    "lifestyle": [
+        {
+            "title": "Les 10 films les plus attendus de 2025",
+            "description": "De la science-fiction épique aux drames intimistes, l'année cinéma promet d'être grandiose.",
+            "image": "https://images.unsplash.com/photo-1536440136628-849c177e76a1?w=500&h=300&fit=crop",
+            "url": "#",
+            "source": "Culture",
+            "date": "2025"
+        },
+        {
+            "title": "Gastronomie : le retour aux sources",
+            "description": "Les chefs étoilés redécouvrent les saveurs authentiques et locales.",
+            "image": "https://images.unsplash.com/photo-1504674900247-0877df9cc836?w=500&h=300&fit=crop",
+            "url": "#",
+            "source": "Food",
+            "date": "2025"
+        },
+        {
+            "title": "Voyage : les destinations cachées de 2025",
+            "description": "Oubliez les sentiers battus, découvrez ces perles rares pour votre prochaine aventure.",
+            "image": "https://images.unsplash.com/photo-1469854523086-cc02fe5d8800?w=500&h=300&fit=crop",
+            "url": "#",
+            "source": "Voyage",
+            "date": "2025"
+        }
+    ],
+}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SOURCES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _gnews_allowed() -> bool:
+    """Clé configurée et quota journalier (partagé entre workers) non épuisé."""
+    if not GNEWS_API_KEY or not cache_service.check_quota_available("gnews", GNEWS_DAILY_QUOTA):
+        return False
+    cache_service.increment_quota_usage("gnews")
+    return True
+
+
+async def _gnews(client: httpx.AsyncClient, query: str, limit: int, source: str, date_chars: int,
+                 extra: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    articles = []
+    try:
+        if _gnews_allowed():
+            url = f"https://gnews.io/api/v4/top-headlines?{query}&max={limit}&apikey={GNEWS_API_KEY}"
+            resp = await client.get(url)
+
+            if resp.status_code == 200:
+                for item in resp.json().get("articles", [])[:limit]:
+                    published = item.get("publishedAt") or ""
+                    articles.append({
+                        "title": item.get("title", ""),
+                        "description": item.get("description") or "",
+                        "image": item.get("image"),
+                        "url": item.get("url", ""),
+                        "source": item.get("source", {}).get("name", source),
+                        "date": published[:date_chars].replace("T", " "),
+                        **(extra or {})
+                    })
+    except Exception as e:
+        logger.warning(f"GNews API error ({query}): {e}")
+    return articles
+
+
+async def _newsapi(client: httpx.AsyncClient, limit: int) -> List[Dict[str, Any]]:
+    articles = []
+    if not NEWS_API_KEY:
+        return articles
+    try:
+        url = f"https://newsapi.org/v2/top-headlines?country=fr&pageSize={limit}&apiKey={NEWS_API_KEY}"
+        resp = await client.get(url)
+
+        if resp.status_code == 200:
+            for item in resp.json().get("articles", [])[:limit]:
+                published = item.get("publishedAt") or ""
+                articles.append({
+                    "title": item.get("title", ""),
+                    "description": item.get("description") or "",
+                    "image": item.get("urlToImage"),
+                    "url": item.get("url", ""),
+                    "source": item.get("source", {}).get("name", "NewsAPI"),
+                    "date": published[:16].replace("T", " ")
+                })
+    except Exception as e:
+        logger.warning(f"NewsAPI error: {e}")
+    return articles
+
+
+async def _pubmed(client: httpx.AsyncClient, limit: int) -> List[Dict[str, Any]]:
+    """Dernières publications PubMed en IA / machine learning."""
+    articles = []
+    try:
+        url = ("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=pubmed"
+               f"&term=artificial+intelligence+OR+machine+learning&retmax={limit}&retmode=json&sort=date")
+        resp = await client.get(url)
+        if resp.status_code != 200:
+            return articles
+        ids = resp.json().get("esearchresult", {}).get("idlist", [])[:limit]
+        if not ids:
+            return articles
+
+        summary_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=pubmed&id={','.join(ids)}&retmode=json"
+        summary_resp = await client.get(summary_url)
+        if summary_resp.status_code != 200:
+            return articles
+        result = summary_resp.json().get("result", {})
+        for pmid in ids:
+            item = result.get(pmid, {})
+            if item:
+                articles.append({
+                    "title": item.get("title", "")[:100],
+                    "description": f"Publication scientifique - {item.get('source', 'PubMed')}",
+                    "image": DEFAULT_IMAGES["science"],
+                    "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
+                    "source": "PubMed",
+                    "date": (item.get("pubdate") or "")[:10],
+                    "type": "peer_reviewed"
+                })
+    except Exception as e:
+        logger.warning(f"PubMed error: {e}")
+    return articles
+
+
+async def fetch_tech(client: httpx.AsyncClient, limit: int) -> List[Dict[str, Any]]:
+    """Actualités tech/IA: GNews puis NewsAPI (fusionnés, dédoublonnés ensuite)."""
+    gnews, newsapi = await asyncio.gather(
+        _gnews(client, "category=general&lang=fr&country=fr", limit, "GNews", 16),
+        _newsapi(client, limit),
+    )
+    return gnews + newsapi
+
+
+async def fetch_science(client: httpx.AsyncClient, limit: int) -> List[Dict[str, Any]]:
+    """Actualités scientifiques: GNews Science puis publications PubMed."""
+    gnews, pubmed = await asyncio.gather(
+        _gnews(client, "category=science&lang=fr", limit, "Science", 10, {"type": "science"}),
+        _pubmed(client, max(3, limit // 2)),
+    )
+    return gnews + pubmed
+
+
+async def fetch_lifestyle(client: httpx.AsyncClient, limit: int) -> List[Dict[str, Any]]:
+    """Pas encore d'API lifestyle: contenus par défaut."""
+    return FALLBACK_ARTICLES["lifestyle"][:limit]
+
+
+FETCHERS: Dict[str, Callable[[httpx.AsyncClient, int], Awaitable[List[Dict[str, Any]]]]] = {
+    "tech": fetch_tech,
+    "science": fetch_science,
+    "lifestyle": fetch_lifestyle,
+}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# NORMALISATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+_NON_WORD = re.compile(r"\W+")
+
+
+def _url_key(url: str) -> str:
+    """URL canonique: sans schéma, www, paramètres ni slash final."""
+    if not url or url == "#":
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}" if host else ""
+
+
+def _title_key(title: str) -> str:
+    return _NON_WORD.sub(" ", title.casefold()).strip()
+
+
+def normalize_articles(articles: List[Dict[str, Any]], category: str, limit: int = FEED_SIZE) -> List[Dict[str, Any]]:
+    """
+    Articles prêts à servir, dans l'ordre des sources: sans doublon (même
+    URL canonique ou même titre), sans article retiré, image de repli posée.
+    """
+    seen_urls, seen_titles = set(), set()
+    result = []
+    for article in articles:
+        title = (article.get("title") or "").strip()
+        title_key = _title_key(title)
+        # NewsAPI garde des entrées "[Removed]" pour les articles dépubliés
+        if not title_key or title == "[Removed]":
+            continue
+        url_key = _url_key(article.get("url", ""))
+        if title_key in seen_titles or (url_key and url_key in seen_urls):
+            continue
+        seen_titles.add(title_key)
+        if url_key:
+            seen_urls.add(url_key)
+
+        result.append({
+            **article,
+            "title": title,
+            "description": (article.get("description") or "")[:150],
+            "image": article.get("image") or CATEGORY_IMAGES.get(category, DEFAULT_IMAGES["default"]),
+        })
+        if len(result) >= limit:
+            break
+    return result
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FLUX
+# ══════════════════════════════════════════════════════════════════════════════
+
+class TrendingFeed:
+    """Snapshot versionné des articles trending, rafraîchi en tâche de fond."""
+
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL, size: int = FEED_SIZE):
+        self.refresh_interval = refresh_interval
+        self.size = size
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._first_load: Optional[asyncio.Task] = None
+
+        self.refreshes = 0
+        self.adopted = 0
+        self.source_failures = 0
+        self.last_refresh_ms: Optional[float] = None
+
+    @property
+    def version(self) -> int:
+        return self.snapshot["version"] if self.snapshot else 0
+
+    def _fresh(self, snapshot: Optional[Dict[str, Any]]) -> bool:
+        return bool(snapshot) and time.time() - snapshot.get("updated_at", 0) < self.refresh_interval
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # RAFRAÎCHISSEMENT
+    # ──────────────────────────────────────────────────────────────────────────
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Interroge toutes les sources, installe et partage un nouveau snapshot."""
+        t0 = time.perf_counter()
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            results = await asyncio.gather(
+                *(asyncio.wait_for(fetch(client, self.size), FETCH_TIMEOUT) for fetch in FETCHERS.values()),
+                return_exceptions=True,
+            )
+
+        previous = self.snapshot["categories"] if self.snapshot else {}
+        categories = {}
+        for category, result in zip(FETCHERS, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Trending {category} error: {result!r}")
+                result = []
+            articles = normalize_articles(result, category, self.size)
+            if not articles:
+                # Source muette: on garde les articles précédents, sinon les statiques
+                self.source_failures += 1
+                articles = previous.get(category) or normalize_articles(
+                    FALLBACK_ARTICLES.get(category, []), category, self.size
+                )
+            categories[category] = articles
+
+        shared = cache_service.get_snapshot(SNAPSHOT_NAME)
+        version = max(self.version, shared.get("version", 0) if shared else 0) + 1
+        snapshot = {"version": version, "updated_at": time.time(), "categories": categories}
+        self.snapshot = snapshot
+        cache_service.set_snapshot(SNAPSHOT_NAME, snapshot, SNAPSHOT_TTL)
+
+        self.refreshes += 1
+        self.last_refresh_ms = round((time.perf_counter() - t0) * 1000)
+        counts = {category: len(articles) for category, articles in categories.items()}
+        logger.info(f"📰 Trending v{version} rafraîchi en {self.last_refresh_ms}ms: {counts}")
+        return snapshot
+
+    async def load(self) -> Dict[str, Any]:
+        """Snapshot partagé s'il est récent (autre worker, redémarrage), sinon refresh."""
+        shared = cache_service.get_snapshot(SNAPSHOT_NAME)
+        if self._fresh(shared) and shared.get("version", 0) > self.version:
+            self.snapshot = shared
+            self.adopted += 1
+            logger.info(f"📰 Trending v{shared['version']} repris du cache partagé")
+            return shared
+        return await self.refresh()
+
+    def _ensure_first_load(self) -> asyncio.Task:
+        """Tâche du premier chargement, partagée par la boucle et les requêtes."""
+        if self._first_load is None or (self._first_load.done() and self.snapshot is None):
+            self._first_load = asyncio.get_running_loop().create_task(self.load())
+        return self._first_load
+
+    async def _loop(self):
+        first = self._ensure_first_load()
+        while True:
+            try:
+                # Premier tour: le chargement déjà lancé par start(), pas un second appel
+                pending, first = first, None
+                await (asyncio.shield(pending) if pending is not None else self.load())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Trending refresh error: {e}")
+            # Prochain passage quand le snapshot courant atteint son âge limite
+            age = time.time() - self.snapshot["updated_at"] if self.snapshot else self.refresh_interval
+            await asyncio.sleep(max(60.0, self.refresh_interval - age))
+
+    def start(self) -> asyncio.Task:
+        """Premier chargement puis rafraîchissement périodique, sans bloquer l'appelant."""
+        if self._task is None or self._task.done():
+            self._ensure_first_load()
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._first_load is not None and not self._first_load.done():
+            self._first_load.cancel()
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # LECTURE
+    # ──────────────────────────────────────────────────────────────────────────
+
+    async def current(self) -> Dict[str, Any]:
+        """
+        Snapshot courant (lecture mémoire). Seules les requêtes arrivant avant
+        le tout premier snapshot attendent son chargement (FIRST_LOAD_TIMEOUT),
+        la même tâche que celle lancée par start(): un seul appel aux sources.
+        """
+        if self.snapshot is not None:
+            return self.snapshot
+        try:
+            await asyncio.wait_for(asyncio.shield(self._ensure_first_load()), FIRST_LOAD_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Trending first load pending: {e!r}")
+        if self.snapshot is not None:
+            return self.snapshot
+        return {
+            "version": 0,
+            "updated_at": 0,
+            "categories": {
+                category: normalize_articles(articles, category, self.size)
+                for category, articles in FALLBACK_ARTICLES.items()
+            },
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self.snapshot or {}
+        return {
+            "version": self.version,
+            "age_s": round(time.time() - snapshot["updated_at"]) if snapshot else None,
+            "refresh_interval_s": self.refresh_interval,
+            "refreshes": self.refreshes,
+            "adopted": self.adopted,
+            "source_failures": self.source_failures,
+            "last_refresh_ms": self.last_refresh_ms,
+            "articles": {category: len(items) for category, items in snapshot.get("categories", {}).items()},
+            "gnews_quota_used": cache_service.get_quota_usage("gnews"),
+        }
+
+
+# Singleton
+trending_feed = TrendingFeed()
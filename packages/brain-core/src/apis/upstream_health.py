@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+🩺 UPSTREAM HEALTH - Santé des APIs du MegaBrain
+=================================================
+Fenêtre glissante par API (taux de succès, latences p50/p95).
+Les APIs mortes ou trop lentes sont rétrogradées: elles ne prennent
+plus de slot dans query_brain et sont sondées en tâche de fond
+jusqu'à ce qu'elles répondent à nouveau.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+WINDOW_SIZE = 50            # Derniers appels gardés par API
+MIN_SAMPLES = 5             # Pas de verdict avant N appels
+DEMOTE_SUCCESS_RATE = 0.3   # En dessous → rétrogradée
+DEMOTE_P95_MS = 4000        # Au-dessus (timeout à 5s) → rétrogradée
+DEGRADED_SUCCESS_RATE = 0.7
+PROBE_INTERVAL = 60         # Secondes entre deux sondes d'une API rétrogradée
+PROBE_SUCCESSES = 2         # Sondes OK consécutives pour réactiver
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class ApiHealth:
+    """Fenêtre glissante d'une API."""
+
+    def __init__(self):
+        self.calls: deque = deque(maxlen=WINDOW_SIZE)
+        self.demoted_at: Optional[float] = None
+        self.last_probe = 0.0
+        self.probe_streak = 0
+        self.last_url: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def success_rate(self) -> float:
+        if not self.calls:
+            return 1.0
+        return sum(1 for ok, _ in self.calls if ok) / len(self.calls)
+
+    def latency(self, pct: float) -> float:
+        return _percentile([ms for ok, ms in self.calls if ok], pct)
+
+    @property
+    def demoted(self) -> bool:
+        return self.demoted_at is not None
+
+    def score(self) -> float:
+        """Score de ranking: succès pondéré par la latence (1.0 = parfait)."""
+        if len(self.calls) < MIN_SAMPLES:
+            return 1.0  # Inconnue: on lui laisse sa chance
+        p50 = self.latency(50)
+        speed = 1.0 / (1.0 + p50 / 1000)
+        return self.success_rate * (0.5 + 0.5 * speed)
+
+
+class UpstreamHealth:
+    """
+    🩺 Tracker de santé par API avec rétrogradation automatique.
+    """
+
+    def __init__(self):
+        self.apis: Dict[str, ApiHealth] = {}
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def _get(self, api_id: str) -> ApiHealth:
+        if api_id not in self.apis:
+            self.apis[api_id] = ApiHealth()
+        return self.apis[api_id]
+
+    def record(self, api_id: str, success: bool, latency_ms: float, url: Optional[str] = None, error: Optional[str] = None):
+        """Enregistre le résultat d'un appel et met à jour l'état de l'API."""
+        health = self._get(api_id)
+        health.calls.append((success, latency_ms))
+        if url:
+            health.last_url = url
+        if error:
+            health.last_error = error
+
+        if health.demoted or len(health.calls) < MIN_SAMPLES:
+            return
+        if health.success_rate < DEMOTE_SUCCESS_RATE or health.latency(95) > DEMOTE_P95_MS:
+            health.demoted_at = time.time()
+            health.last_probe = health.demoted_at
+            health.probe_streak = 0
+            logger.warning(
+                f"🩺 {api_id} demoted (success {health.success_rate:.0%}, p95 {health.latency(95):.0f}ms)"
+            )
+
+    def is_demoted(self, api_id: str) -> bool:
+        health = self.apis.get(api_id)
+        return bool(health and health.demoted)
+
+    def score(self, api_id: str) -> float:
+        health = self.apis.get(api_id)
+        return health.score() if health else 1.0
+
+    def rank(self, api_ids: List[str]) -> List[str]:
+        """Retire les APIs rétrogradées et trie les autres par score (ordre stable)."""
+        active = [a for a in api_ids if not self.is_demoted(a)]
+        return sorted(active, key=self.score, reverse=True)
+
+    # ──────────────────────────────────────────────────────────────
+    # Sondes de fond
+    # ──────────────────────────────────────────────────────────────
+
+    def ensure_probing(self, probe: Callable[[str, str], Awaitable[Dict[str, Any]]]):
+        """Démarre la boucle de sondes si besoin (appelé depuis la boucle asyncio)."""
+        if self._probe_task is None or self._probe_task.done():
+            try:
+                self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop(probe))
+            except RuntimeError:
+                pass  # Pas de boucle en cours
+
+    async def _probe_loop(self, probe: Callable[[str, str], Awaitable[Dict[str, Any]]]):
+        while True:
+            await asyncio.sleep(PROBE_INTERVAL / 4)
+            now = time.time()
+            due = [
+                (api_id, h) for api_id, h in self.apis.items()
+                if h.demoted and h.last_url and now - h.last_probe >= PROBE_INTERVAL
+            ]
+            for api_id, health in due:
+                health.last_probe = now
+                start = time.perf_counter()
+                try:
+                    result = await probe(api_id, health.last_url)
+                    ok = bool(result.get("success"))
+                except Exception:
+                    ok = False
+                latency_ms = (time.perf_counter() - start) * 1000
+
+                if ok and latency_ms <= DEMOTE_P95_MS:
+                    health.probe_streak += 1
+                    if health.probe_streak >= PROBE_SUCCESSES:
+                        # Réactivée avec une fenêtre neuve
+                        health.calls.clear()
+                        health.calls.append((True, latency_ms))
+                        health.demoted_at = None
+                        logger.info(f"🩺 {api_id} re-enabled after probe")
+                else:
+                    health.probe_streak = 0
+
+    # ──────────────────────────────────────────────────────────────
+    # Stats
+    # ──────────────────────────────────────────────────────────────
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {}
+        for api_id, health in self.apis.items():
+            if health.demoted:
+                status = "demoted"
+            elif len(health.calls) >= MIN_SAMPLES and health.success_rate < DEGRADED_SUCCESS_RATE:
+                status = "degraded"
+            else:
+                status = "healthy"
+            stats[api_id] = {
+                "status": status,
+                "calls": len(health.calls),
+                "success_rate": round(health.success_rate, 3),
+                "p50_ms": round(health.latency(50)),
+                "p95_ms": round(health.latency(95)),
+                "score": round(health.score(), 3),
+                "last_error": health.last_error,
+            }
+        return stats
+
+
+# Singleton
+upstream_health = UpstreamHealth()
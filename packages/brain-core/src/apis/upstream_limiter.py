@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+🚦 UPSTREAM LIMITER - Rate limits des APIs gratuites
+=====================================================
+Token buckets par host upstream, déclarés dans les registres
+(MEGA_API_REGISTRY / MEGA_APIS) et partagés entre workers via Redis.
+
+Déclaration dans une entrée du registre:
+    "free_limit": "100/day"              # limite documentée (utilisée par défaut)
+    "rate_limit": ["5/min", "25/day"]    # limite(s) appliquée(s), prioritaire
+
+Les quotas longs (heure, jour, mois) sont lissés: le bucket ne laisse
+passer qu'une petite rafale et se recharge au fil de la fenêtre, pour que
+le quota ne soit pas brûlé dès le matin.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+WINDOW_SECONDS = {
+    "sec": 1, "s": 1,
+    "min": 60, "m": 60,
+    "hour": 3600, "h": 3600,
+    "day": 86400, "d": 86400,
+    "month": 86400 * 30,
+}
+
+# Attente max pour différer un appel plutôt que de le sauter
+DEFAULT_MAX_WAIT = 1.0
+
+# Cooldown par défaut après un 429 sans Retry-After
+DEFAULT_COOLDOWN = 60
+
+_LIMIT_RE = re.compile(r"^\s*([\d.]+)\s*([km]?)\s*/\s*(\d*)\s*([a-z]+)\s*$", re.IGNORECASE)
+
+# Token bucket atomique multi-clés: consomme dans TOUS les buckets ou aucun.
+# KEYS = buckets, ARGV = now, cost, puis (rate, capacity) par bucket.
+# Retourne {allowed, wait_seconds, tokens_1, tokens_2, ...}
+TOKEN_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[1 + i * 2])
+    local capacity = tonumber(ARGV[2 + i * 2])
+    local data = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        wait = math.max(wait, (cost - tokens) / rate)
+    end
+end
+local allowed = 0
+if wait == 0 then allowed = 1 end
+local out = {allowed, tostring(wait)}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[1 + i * 2])
+    local capacity = tonumber(ARGV[2 + i * 2])
+    if allowed == 1 then levels[i] = levels[i] - cost end
+    redis.call('HSET', key, 'tokens', tostring(levels[i]), 'ts', tostring(now))
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 60)
+    out[#out + 1] = tostring(levels[i])
+end
+return out
+"""
+
+
+def parse_limit(spec: str) -> Optional[Tuple[int, int]]:
+    """
+    Parse une limite du registre en (requêtes, fenêtre en secondes).
+    "30/min" → (30, 60), "100/5min" → (100, 300), "10K/day" → (10000, 86400).
+    "unlimited" / "limited" / inconnu → None.
+    """
+    match = _LIMIT_RE.match(spec or "")
+    if not match:
+        return None
+    amount, suffix, multiplier, unit = match.groups()
+    unit = unit.lower()
+    if unit.endswith("s") and unit not in WINDOW_SECONDS:
+        unit = unit[:-1]
+    if unit not in WINDOW_SECONDS:
+        return None
+    requests = float(amount) * {"": 1, "k": 1000, "m": 1000000}[suffix.lower()]
+    window = WINDOW_SECONDS[unit] * (int(multiplier) if multiplier else 1)
+    return max(1, int(requests)), window
+
+
+class TokenBucket:
+    """Bucket d'un host pour une fenêtre donnée."""
+
+    def __init__(self, requests: int, window: int):
+        self.requests = requests
+        self.window = window
+        self.rate = requests / window
+        # Fenêtres > 1h: rafale limitée à la part horaire du quota
+        if window > 3600:
+            self.capacity = max(1, math.ceil(requests * 3600 / window))
+        else:
+            self.capacity = requests
+        self.tokens = float(self.capacity)
+        self.updated = time.time()
+
+    def refill(self, now: float) -> float:
+        self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+    def wait_time(self, cost: float = 1) -> float:
+        return 0.0 if self.tokens >= cost else (cost - self.tokens) / self.rate
+
+    def label(self) -> str:
+        return f"{self.requests}/{self.window}s"
+
+
+class UpstreamLimiter:
+    """
+    🚦 Scheduler quota-aware pour les appels upstream.
+    Redis si disponible (partagé entre workers), sinon buckets en mémoire.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[str, List[TokenBucket]] = {}
+        self.api_hosts: Dict[str, str] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self._cooldowns: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._script = None
+
+    # ──────────────────────────────────────────────────────────────
+    # Déclaration
+    # ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return (urlsplit(url).hostname or url).lower()
+
+    def register_registry(self, registry: Dict[str, Dict[str, Any]]):
+        """Enregistre les limites déclarées d'un registre d'APIs."""
+        for api_id, config in registry.items():
+            url = config.get("url")
+            if not url:
+                continue
+            specs = config.get("rate_limit", config.get("free_limit"))
+            if isinstance(specs, str):
+                specs = [specs]
+            self.register(api_id, url, specs or [])
+
+    def register(self, api_id: str, url: str, specs: List[str]):
+        host = self.host_of(url)
+        self.api_hosts[api_id] = host
+        for spec in specs:
+            parsed = parse_limit(spec)
+            if not parsed:
+                continue
+            requests, window = parsed
+            buckets = self.buckets.setdefault(host, [])
+            existing = next((b for b in buckets if b.window == window), None)
+            # Plusieurs APIs sur le même host: on garde la limite la plus stricte
+            if existing is None:
+                buckets.append(TokenBucket(requests, window))
+            elif requests < existing.requests:
+                buckets[buckets.index(existing)] = TokenBucket(requests, window)
+
+    # ──────────────────────────────────────────────────────────────
+    # Buckets
+    # ──────────────────────────────────────────────────────────────
+
+    def _count(self, api_id: str, event: str):
+        with self._lock:
+            counters = self.counters.setdefault(api_id, {"allowed": 0, "deferred": 0, "skipped": 0, "throttled": 0})
+            counters[event] += 1
+
+    def _use_redis(self) -> bool:
+        return cache_service.available and not cache_service.using_memory
+
+    def _bucket_key(self, host: str, bucket: TokenBucket) -> str:
+        return f"upstream:bucket:{host}:{bucket.window}"
+
+    def _take_redis(self, host: str, buckets: List[TokenBucket], cost: float) -> Tuple[bool, float]:
+        if self._script is None:
+            self._script = cache_service.redis.register_script(TOKEN_BUCKET_LUA)
+        args = [time.time(), cost]
+        for bucket in buckets:
+            args += [bucket.rate, bucket.capacity]
+        result = self._script(keys=[self._bucket_key(host, b) for b in buckets], args=args)
+        for bucket, level in zip(buckets, result[2:]):
+            bucket.tokens = float(level)
+        return bool(int(result[0])), float(result[1])
+
+    def _take_local(self, buckets: List[TokenBucket], cost: float) -> Tuple[bool, float]:
+        with self._lock:
+            now = time.time()
+            for bucket in buckets:
+                bucket.refill(now)
+            wait = max(bucket.wait_time(cost) for bucket in buckets)
+            if wait == 0:
+                for bucket in buckets:
+                    bucket.tokens -= cost
+            return wait == 0, wait
+
+    def _take(self, host: str, cost: float = 1) -> Tuple[bool, float]:
+        """Tente de consommer un jeton dans tous les buckets du host."""
+        buckets = self.buckets.get(host)
+        if not buckets:
+            return True, 0.0
+        if self._use_redis():
+            try:
+                return self._take_redis(host, buckets, cost)
+            except Exception as e:
+                logger.debug(f"Upstream limiter Redis error, using local buckets: {e}")
+        return self._take_local(buckets, cost)
+
+    def _cooldown_remaining(self, host: str) -> float:
+        until = self._cooldowns.get(host, 0)
+        if self._use_redis():
+            try:
+                ttl = cache_service.redis.ttl(f"upstream:cooldown:{host}")
+                if ttl and ttl > 0:
+                    until = max(until, time.time() + ttl)
+            except Exception:
+                pass
+        return max(0.0, until - time.time())
+
+    def _reserve(self, api_id: str, host: str, check_cooldown: bool) -> Tuple[bool, float]:
+        """Cooldown, jeton et compteur journalier (appels Redis bloquants)."""
+        if check_cooldown and self._cooldown_remaining(host) > 0:
+            return False, math.inf
+        allowed, wait = self._take(host)
+        if allowed:
+            cache_service.increment_quota_usage(f"upstream:{api_id}")
+        return allowed, wait
+
+    async def _reserve_async(self, api_id: str, host: str, check_cooldown: bool) -> Tuple[bool, float]:
+        # Redis hors de la boucle: fetch_all_for_domain lance jusqu'à 50 appels à la fois
+        if self._use_redis():
+            return await asyncio.to_thread(self._reserve, api_id, host, check_cooldown)
+        return self._reserve(api_id, host, check_cooldown)
+
+    # ──────────────────────────────────────────────────────────────
+    # API publique
+    # ──────────────────────────────────────────────────────────────
+
+    async def acquire(self, api_id: str, url: str, max_wait: float = DEFAULT_MAX_WAIT) -> bool:
+        """
+        Réserve un appel vers l'upstream de api_id.
+        Diffère (sleep) si un jeton arrive dans max_wait secondes,
+        sinon retourne False et l'appel doit être sauté.
+
+        Un seul compteur par appel: allowed, deferred (passé après attente)
+        ou skipped.
+        """
+        host = self.api_hosts.get(api_id) or self.host_of(url)
+
+        allowed, wait = await self._reserve_async(api_id, host, check_cooldown=True)
+        if allowed:
+            self._count(api_id, "allowed")
+            return True
+
+        if wait <= max_wait:
+            await asyncio.sleep(wait)
+            allowed, _ = await self._reserve_async(api_id, host, check_cooldown=False)
+            if allowed:
+                self._count(api_id, "deferred")
+                return True
+
+        self._count(api_id, "skipped")
+        logger.debug(f"🚦 {api_id} skipped: {host} budget exhausted or cooling down (next token in {wait:.1f}s)")
+        return False
+
+    def penalize(self, api_id: str, url: str, retry_after: Optional[str] = None):
+        """Met le host en pause après un 429 (Retry-After respecté si présent)."""
+        host = self.api_hosts.get(api_id) or self.host_of(url)
+        try:
+            cooldown = int(float(retry_after)) if retry_after else DEFAULT_COOLDOWN
+        except ValueError:
+            cooldown = DEFAULT_COOLDOWN
+        cooldown = max(1, min(cooldown, 3600))
+        self._cooldowns[host] = time.time() + cooldown
+        self._count(api_id, "throttled")
+        if self._use_redis():
+            try:
+                cache_service.redis.setex(f"upstream:cooldown:{host}", cooldown, "1")
+            except Exception:
+                pass
+        logger.warning(f"🚦 {api_id} returned 429, pausing {host} for {cooldown}s")
+
+    def _shared_state(self, api_ids: List[str], hosts: List[str]) -> Tuple[Dict[str, int], Dict[str, float]]:
+        """Compteurs du jour et cooldowns Redis en un seul aller-retour (pipeline)."""
+        used, cooldowns = {}, {}
+        if not self._use_redis():
+            return {api_id: cache_service.get_quota_usage(f"upstream:{api_id}") for api_id in api_ids}, cooldowns
+        try:
+            pipe = cache_service.redis.pipeline(transaction=False)
+            for api_id in api_ids:
+                pipe.get(cache_service._get_quota_key(f"upstream:{api_id}"))
+            for host in hosts:
+                pipe.ttl(f"upstream:cooldown:{host}")
+            results = pipe.execute()
+        except Exception as e:
+            logger.debug(f"Upstream usage Redis error: {e}")
+            return used, cooldowns
+        now = time.time()
+        for api_id, value in zip(api_ids, results):
+            used[api_id] = int(value) if value else 0
+        for host, ttl in zip(hosts, results[len(api_ids):]):
+            if ttl and ttl > 0:
+                cooldowns[host] = now + ttl
+        return used, cooldowns
+
+    async def get_usage(self) -> Dict[str, Any]:
+        """Usage des budgets par API (pour /api/brain/stats)."""
+        api_ids = [
+            api_id for api_id, host in self.api_hosts.items()
+            if self.buckets.get(host) or self.counters.get(api_id)
+        ]
+        hosts = sorted({self.api_hosts[api_id] for api_id in api_ids})
+        if self._use_redis():
+            used, shared_cooldowns = await asyncio.to_thread(self._shared_state, api_ids, hosts)
+        else:
+            used, shared_cooldowns = self._shared_state(api_ids, hosts)
+        now = time.time()
+
+        usage = {}
+        for api_id in api_ids:
+            host = self.api_hosts[api_id]
+            buckets = self.buckets.get(host) or []
+            until = max(self._cooldowns.get(host, 0), shared_cooldowns.get(host, 0))
+            usage[api_id] = {
+                "host": host,
+                "limits": [b.label() for b in buckets],
+                "tokens_left": [round(b.tokens, 2) for b in buckets],
+                "used_today": used.get(api_id, 0),
+                "cooldown_s": round(max(0.0, until - now)),
+                **(self.counters.get(api_id) or {}),
+            }
+        return usage
+
+
+# Singleton
+upstream_limiter = UpstreamLimiter()
@@ -4,13 +4,9 @@
 Règles strictes pour éviter les inventions.
 """
 
+from functools import lru_cache
 
-def get_grounded_prompt(base_prompt: str, sources: list = None) -> str:
-    """
-    Ajoute des guardrails anti-hallucination au prompt.
-    Force l'IA à citer ses sources et ne pas inventer.
-    """
-    guardrails = """
+GUARDRAILS = """
 ⚠️ RÈGLES STRICTES - NE PAS ENFREINDRE:
 
 1. GROUNDING OBLIGATOIRE
@@ -31,7 +27,32 @@ def get_grounded_prompt(base_prompt: str, sources: list = None) -> str:
    - Ne pas créer de citations fictives
    - Ne pas attribuer des propos à des personnes sans source
 """
-    
+
+GUARDRAILS_EN = """
+⚠️ STRICT RULES - DO NOT BREAK:
+
+1. GROUNDING
+   - Every factual claim MUST come from the provided sources
+   - If something is not in the sources, say "from general knowledge"
+   - NEVER invent figures, dates or facts
+
+2. UNCERTAINTY
+   - If unsure, say so ("it seems", "according to the sources", "probably")
+   - If sources contradict each other, point it out
+
+3. CITATIONS
+   - Mention sources naturally ("According to [source], ...")
+   - No fictitious quotes, no statistics without a source
+"""
+
+
+def get_grounded_prompt(base_prompt: str, sources: list = None) -> str:
+    """
+    Ajoute des guardrails anti-hallucination au prompt.
+    Force l'IA à citer ses sources et ne pas inventer.
+    """
+    # Partie stable (guardrails + prompt de base) d'abord, sources variables
+    # à la fin: le préfixe reste identique d'un appel à l'autre (prompt caching)
     source_context = ""
     if sources:
         source_context = "\n📚 SOURCES DISPONIBLES:\n"
@@ -39,7 +60,17 @@ def get_grounded_prompt(base_prompt: str, sources: list = None) -> str:
             title = src.get("title", "Source")
             source_context += f"{i}. {title}\n"
     
-    return f"{guardrails}{source_context}\n\n{base_prompt}"
+    return f"{GUARDRAILS}\n\n{base_prompt}{source_context}"
+
+
+@lru_cache(maxsize=256)
+def enhance_system_prompt_anti_hallucination(system_prompt: str, lang: str = "fr") -> str:
+    """
+    Prompt système + guardrails. Déterministe (aucune donnée variable):
+    le résultat sert de préfixe stable mis en cache côté provider.
+    """
+    guardrails = GUARDRAILS if lang == "fr" else GUARDRAILS_EN
+    return f"{system_prompt.strip()}\n{guardrails}" if system_prompt.strip() else guardrails.strip()
 
 
 def validate_response(response: str, sources: list = None) -> dict:
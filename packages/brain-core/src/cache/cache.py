@@ -210,8 +210,32 @@ class CacheService:
         except:
             return False
 
+    # Snapshot Methods (données partagées entre workers, clé lisible)
+
+    def get_snapshot(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get a named snapshot ({"version": ..., ...})"""
+        if not self.available:
+            return None
+
+        try:
+            cached = self.redis.get(f"snapshot:{name}")
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            print(f"Snapshot get error: {e}")
+            return None
+
+    def set_snapshot(self, name: str, snapshot: Dict[str, Any], ttl: int = 86400):
+        """Store a named snapshot, replacing the previous version"""
+        if not self.available:
+            return
+
+        try:
+            self.redis.setex(f"snapshot:{name}", ttl, json.dumps(snapshot, ensure_ascii=False))
+        except Exception as e:
+            print(f"Snapshot set error: {e}")
+
     # Quota Management Methods
-    
+
     def _get_quota_key(self, provider: str) -> str:
         """Generate quota key for today"""
         from datetime import datetime
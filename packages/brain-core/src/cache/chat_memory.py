@@ -0,0 +1,524 @@
+# -*- coding: utf-8 -*-
+"""
+💬 CHAT MEMORY - Mémoire de conversation bornée et persistante
+===============================================================
+Deux niveaux:
+
+- Hot tier en mémoire (LRU, éviction des conversations inactives) qui
+  garde une fenêtre des derniers messages + un résumé cumulatif.
+- Store persistant partagé entre workers et redémarrages: Redis si
+  disponible, sinon SQLite (fichier local, mode WAL).
+
+Le contexte envoyé à l'IA est borné quelle que soit la longueur de la
+conversation: résumé (nombre de lignes plafonné) + N derniers messages
+(taille plafonnée). Le résumé est extractif et cumulatif: chaque message
+qui sort de la fenêtre y entre comme une ligne, puis les lignes voisines
+qui couvrent le moins de messages sont fusionnées (questions de
+l'utilisateur gardées en priorité, extraits raccourcis) pour rester sous
+SUMMARY_LINES. Le début de la conversation n'est jamais abandonné, il
+est seulement condensé. L'historique complet (jusqu'à `max_stored`
+messages) reste lisible pour /history et /export.
+
+Les accès au store (Redis / SQLite) sont bloquants: l'API publique est
+asynchrone et les exécute dans un thread (asyncio.to_thread).
+
+Configuration (env):
+    CHAT_MEMORY_BACKEND      auto | redis | sqlite | memory  (défaut: auto)
+    CHAT_MEMORY_DB           chemin SQLite (défaut: data/chat_memory.db)
+    CHAT_MEMORY_IDLE         secondes avant éviction du hot tier (défaut: 1800)
+    CHAT_MEMORY_RETENTION    jours de rétention dans le store (défaut: 30)
+    CHAT_MEMORY_MAX_HOT      conversations max en mémoire (défaut: 1000)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+BACKEND = os.getenv("CHAT_MEMORY_BACKEND", "auto").lower()
+DB_PATH = os.getenv("CHAT_MEMORY_DB", os.path.join("data", "chat_memory.db"))
+IDLE_SECONDS = int(os.getenv("CHAT_MEMORY_IDLE", 1800))
+RETENTION_SECONDS = int(float(os.getenv("CHAT_MEMORY_RETENTION", 30)) * 86400)
+MAX_HOT = int(os.getenv("CHAT_MEMORY_MAX_HOT", 1000))
+
+# Messages gardés tels quels dans le hot tier (au-delà: repliés dans le résumé)
+WINDOW = 20
+# Messages conservés par conversation dans le store (history / export)
+MAX_STORED = 500
+# Lignes de résumé (au-delà: lignes voisines fusionnées) et taille des extraits
+SUMMARY_LINES = 12
+SUMMARY_LINE_CHARS = 160
+MERGED_LINE_CHARS = 320     # Ligne issue de fusions (plusieurs extraits)
+MIN_PART_CHARS = 48         # Extrait le plus court gardé dans une ligne fusionnée
+MAX_MESSAGE_CHARS = 2000
+
+SWEEP_INTERVAL = 60
+PURGE_INTERVAL = 3600
+
+ROLE_LABELS = {"user": "Utilisateur", "assistant": "Assistant", "system": "Système"}
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+_SEPARATOR = " · "
+
+
+def _now_iso() -> str:
+    return datetime.now().isoformat()
+
+
+def _digest(message: Dict[str, Any]) -> str:
+    """Une ligne de résumé: première phrase du message, tronquée."""
+    text = " ".join(message.get("content", "").split())
+    text = _SENTENCE_END.split(text, 1)[0]
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+    return f"{ROLE_LABELS.get(message.get('role'), message.get('role'))}: {text}"
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def _merge(first: str, second: str) -> str:
+    """
+    Fusion extractive de deux lignes voisines: les questions de l'utilisateur
+    sont gardées de préférence (elles portent les sujets), échantillonnées
+    régulièrement si elles sont trop nombreuses, et raccourcies à parts égales.
+    """
+    parts = f"{first}{_SEPARATOR}{second}".split(_SEPARATOR)
+    questions = [p for p in parts if p.startswith(ROLE_LABELS["user"])]
+    parts = questions or parts
+    keep = MERGED_LINE_CHARS // MIN_PART_CHARS
+    if len(parts) > keep:
+        step = (len(parts) - 1) / (keep - 1)
+        parts = [parts[round(i * step)] for i in range(keep)]
+    budget = MERGED_LINE_CHARS // len(parts) - len(_SEPARATOR)
+    return _SEPARATOR.join(_clip(p, budget) for p in parts)
+
+
+def _fold(lines: List[str], weights: List[int]) -> Tuple[List[str], List[int]]:
+    """
+    Ramène le résumé à SUMMARY_LINES lignes en fusionnant la paire de lignes
+    voisines qui couvre le moins de messages (la plus ancienne à égalité).
+    Les lignes anciennes couvrent de plus en plus de messages: le début de
+    la conversation reste représenté, de plus en plus condensé.
+    """
+    lines, weights = list(lines), list(weights)
+    while len(lines) > SUMMARY_LINES:
+        i = min(range(len(lines) - 1), key=lambda k: (weights[k] + weights[k + 1], k))
+        lines[i:i + 2] = [_merge(lines[i], lines[i + 1])]
+        weights[i:i + 2] = [weights[i] + weights[i + 1]]
+    return lines, weights
+
+
+@dataclass
+class Conversation:
+    """État hot d'une conversation: fenêtre récente + résumé cumulatif."""
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    summary: List[str] = field(default_factory=list)
+    weights: List[int] = field(default_factory=list)   # Messages couverts par ligne de résumé
+    summarized: int = 0      # Messages repliés dans le résumé
+    count: int = 0           # Messages depuis le début (version pour le store)
+    created_at: str = field(default_factory=_now_iso)
+    updated_at: str = field(default_factory=_now_iso)
+    last_access: float = field(default_factory=time.time)
+
+    def append(self, message: Dict[str, Any]):
+        self.messages.append(message)
+        self.count += 1
+        self.updated_at = message["timestamp"]
+        while len(self.messages) > WINDOW:
+            self.summary.append(_digest(self.messages.pop(0)))
+            self.weights.append(1)
+            self.summarized += 1
+        if len(self.summary) > SUMMARY_LINES:
+            self.summary, self.weights = _fold(self.summary, self.weights)
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "summary": self.summary,
+            "weights": self.weights,
+            "summarized": self.summarized,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_store(cls, meta: Dict[str, Any], messages: List[Dict[str, Any]]) -> "Conversation":
+        summary = list(meta.get("summary") or [])
+        weights = list(meta.get("weights") or [])
+        conv = cls(
+            summary=summary,
+            weights=weights if len(weights) == len(summary) else [1] * len(summary),
+            summarized=int(meta.get("summarized", 0)),
+            count=int(meta.get("count", 0)),
+            created_at=meta.get("created_at") or _now_iso(),
+            updated_at=meta.get("updated_at") or _now_iso(),
+        )
+        # La fenêtre = les messages pas encore repliés dans le résumé
+        conv.messages = messages[-max(0, conv.count - conv.summarized):] if conv.count > conv.summarized else []
+        return conv
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# STORES PERSISTANTS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class RedisChatStore:
+    """chat:{id}:msgs (liste JSON bornée) + chat:{id}:meta (hash), avec TTL."""
+
+    name = "redis"
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    @staticmethod
+    def _keys(conv_id: str) -> Tuple[str, str]:
+        return f"chat:{conv_id}:msgs", f"chat:{conv_id}:meta"
+
+    def version(self, conv_id: str) -> int:
+        value = self.redis.hget(self._keys(conv_id)[1], "count")
+        return int(value) if value else 0
+
+    def load(self, conv_id: str, limit: int = MAX_STORED) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        msgs_key, meta_key = self._keys(conv_id)
+        pipe = self.redis.pipeline()
+        pipe.hget(meta_key, "data")
+        pipe.lrange(msgs_key, -limit, -1)
+        meta, raw = pipe.execute()
+        if not meta:
+            return None, []
+        return json.loads(meta), [json.loads(m) for m in raw]
+
+    def append(self, conv_id: str, message: Dict[str, Any], meta: Dict[str, Any]):
+        msgs_key, meta_key = self._keys(conv_id)
+        pipe = self.redis.pipeline()
+        pipe.rpush(msgs_key, json.dumps(message, ensure_ascii=False))
+        pipe.ltrim(msgs_key, -MAX_STORED, -1)
+        pipe.hset(meta_key, mapping={"count": meta["count"], "data": json.dumps(meta, ensure_ascii=False)})
+        pipe.expire(msgs_key, RETENTION_SECONDS)
+        pipe.expire(meta_key, RETENTION_SECONDS)
+        pipe.execute()
+
+    def delete(self, conv_id: str):
+        self.redis.delete(*self._keys(conv_id))
+
+    def purge(self, older_than: float) -> int:
+        return 0  # Rétention gérée par les TTL Redis
+
+
+class SQLiteChatStore:
+    """Tables conversations / messages dans un fichier SQLite (WAL, multi-process)."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                conv_id TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                meta TEXT NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                conv_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (conv_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS idx_conversations_updated ON conversations(updated);
+        """)
+        self.db.commit()
+
+    def version(self, conv_id: str) -> int:
+        with self._lock:
+            row = self.db.execute("SELECT count FROM conversations WHERE conv_id = ?", (conv_id,)).fetchone()
+        return row[0] if row else 0
+
+    def load(self, conv_id: str, limit: int = MAX_STORED) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        with self._lock:
+            row = self.db.execute("SELECT meta FROM conversations WHERE conv_id = ?", (conv_id,)).fetchone()
+            if not row:
+                return None, []
+            rows = self.db.execute(
+                "SELECT data FROM messages WHERE conv_id = ? ORDER BY seq DESC LIMIT ?", (conv_id, limit)
+            ).fetchall()
+        return json.loads(row[0]), [json.loads(r[0]) for r in reversed(rows)]
+
+    def append(self, conv_id: str, message: Dict[str, Any], meta: Dict[str, Any]):
+        seq = meta["count"]
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO messages (conv_id, seq, data) VALUES (?, ?, ?)",
+                (conv_id, seq, json.dumps(message, ensure_ascii=False)),
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO conversations (conv_id, count, meta, updated) VALUES (?, ?, ?, ?)",
+                (conv_id, seq, json.dumps(meta, ensure_ascii=False), time.time()),
+            )
+            if seq > MAX_STORED:
+                self.db.execute("DELETE FROM messages WHERE conv_id = ? AND seq <= ?", (conv_id, seq - MAX_STORED))
+
+    def delete(self, conv_id: str):
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM messages WHERE conv_id = ?", (conv_id,))
+            self.db.execute("DELETE FROM conversations WHERE conv_id = ?", (conv_id,))
+
+    def purge(self, older_than: float) -> int:
+        """Supprime les conversations inactives depuis `older_than` (timestamp)."""
+        with self._lock, self.db:
+            stale = [r[0] for r in self.db.execute(
+                "SELECT conv_id FROM conversations WHERE updated < ?", (older_than,)
+            ).fetchall()]
+            for conv_id in stale:
+                self.db.execute("DELETE FROM messages WHERE conv_id = ?", (conv_id,))
+                self.db.execute("DELETE FROM conversations WHERE conv_id = ?", (conv_id,))
+        return len(stale)
+
+
+def _create_store():
+    if BACKEND == "memory":
+        return None
+    if BACKEND in ("auto", "redis") and cache_service.available and not cache_service.using_memory:
+        return RedisChatStore(cache_service.redis)
+    try:
+        return SQLiteChatStore(DB_PATH)
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Chat memory store unavailable ({e}), memory only")
+        return None
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CHAT MEMORY
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ChatMemory:
+    """Hot tier LRU + store persistant (write-through)."""
+
+    def __init__(self, store=None, max_hot: int = MAX_HOT, idle_seconds: int = IDLE_SECONDS):
+        self.store = store
+        self.max_hot = max_hot
+        self.idle_seconds = idle_seconds
+        self._hot: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_sweep = time.time()
+        self._last_purge = 0.0
+        self.stats = {"hot_hits": 0, "store_loads": 0, "evicted": 0, "store_errors": 0}
+
+    # ──────────────────────────────────────────────────────────────
+    # Hot tier
+    # ──────────────────────────────────────────────────────────────
+
+    def _sweep(self):
+        """Évince les conversations inactives (et purge le store de temps en temps)."""
+        now = time.time()
+        if now - self._last_sweep < SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        idle = [cid for cid, conv in self._hot.items() if now - conv.last_access > self.idle_seconds]
+        for cid in idle:
+            del self._hot[cid]
+        self.stats["evicted"] += len(idle)
+
+        if self.store and now - self._last_purge > PURGE_INTERVAL:
+            self._last_purge = now
+            try:
+                purged = self.store.purge(now - RETENTION_SECONDS)
+                if purged:
+                    logger.info(f"🧹 Chat memory: {purged} expired conversations purged")
+            except Exception as e:
+                logger.warning(f"⚠️ Chat memory purge failed: {e}")
+
+    def _get(self, conv_id: str, create: bool = False) -> Optional[Conversation]:
+        """Conversation depuis le hot tier, rechargée du store si un autre worker l'a modifiée."""
+        self._sweep()
+        conv = self._hot.get(conv_id)
+        if self.store:
+            try:
+                if conv is None or self.store.version(conv_id) != conv.count:
+                    meta, messages = self.store.load(conv_id, limit=WINDOW)
+                    conv = Conversation.from_store(meta, messages) if meta else None
+                    self.stats["store_loads"] += 1
+                else:
+                    self.stats["hot_hits"] += 1
+            except Exception as e:
+                self.stats["store_errors"] += 1
+                logger.warning(f"⚠️ Chat memory store read failed: {e}")
+        elif conv is not None:
+            self.stats["hot_hits"] += 1
+
+        if conv is None:
+            if not create:
+                return None
+            conv = Conversation()
+        conv.last_access = time.time()
+        self._hot[conv_id] = conv
+        self._hot.move_to_end(conv_id)
+        while len(self._hot) > self.max_hot:
+            self._hot.popitem(last=False)
+            self.stats["evicted"] += 1
+        return conv
+
+    # ──────────────────────────────────────────────────────────────
+    # API (utilisée par routes/chat.py)
+    # ──────────────────────────────────────────────────────────────
+
+    async def _run(self, fn, *args):
+        # Store Redis / SQLite: I/O bloquante hors de la boucle d'événements
+        if self.store is None:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def add_message(self, conversation_id: str, role: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+        """Ajoute un message (hot tier + store)."""
+        return await self._run(self._add_message, conversation_id, role, content, metadata)
+
+    async def get_context_for_ai(self, conversation_id: str, max_messages: int = 10) -> List[Dict[str, str]]:
+        """
+        Contexte borné pour le LLM: un message système avec le résumé des
+        échanges anciens, puis les `max_messages` derniers messages.
+        """
+        return await self._run(self._get_context_for_ai, conversation_id, max_messages)
+
+    async def get_messages(self, conversation_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Historique conservé (jusqu'à MAX_STORED messages) depuis le store."""
+        return await self._run(self._get_messages, conversation_id, limit)
+
+    async def get_stats(self, conversation_id: str) -> Dict[str, Any]:
+        return await self._run(self._get_stats, conversation_id)
+
+    async def clear_conversation(self, conversation_id: str):
+        await self._run(self._clear_conversation, conversation_id)
+
+    async def export_conversation(self, conversation_id: str, format: str = "json"):
+        return await self._run(self._export_conversation, conversation_id, format)
+
+    # ──────────────────────────────────────────────────────────────
+    # Implémentations synchrones (exécutées dans un thread si store)
+    # ──────────────────────────────────────────────────────────────
+
+    def _add_message(self, conversation_id: str, role: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+        message = {"role": role, "content": content or "", "timestamp": _now_iso()}
+        if metadata:
+            message["metadata"] = metadata
+        with self._lock:
+            conv = self._get(conversation_id, create=True)
+            conv.append(message)
+            if self.store:
+                try:
+                    self.store.append(conversation_id, message, conv.meta())
+                except Exception as e:
+                    self.stats["store_errors"] += 1
+                    logger.warning(f"⚠️ Chat memory store write failed: {e}")
+        return message
+
+    def _get_context_for_ai(self, conversation_id: str, max_messages: int = 10) -> List[Dict[str, str]]:
+        with self._lock:
+            conv = self._get(conversation_id)
+            if conv is None:
+                return []
+            recent = conv.messages[-max_messages:] if max_messages > 0 else []
+            # Messages de la fenêtre non envoyés: résumés eux aussi
+            skipped = conv.messages[:len(conv.messages) - len(recent)]
+            summary = conv.summary + [_digest(m) for m in skipped]
+            weights = conv.weights + [1] * len(skipped)
+        summary, weights = _fold(summary, weights)
+
+        context = []
+        if summary:
+            header = f"Résumé de la conversation précédente ({sum(weights)} messages)"
+            context.append({"role": "system", "content": header + ":\n" + "\n".join(summary)})
+        for message in recent:
+            content = message["content"]
+            if len(content) > MAX_MESSAGE_CHARS:
+                content = content[:MAX_MESSAGE_CHARS] + "…"
+            context.append({"role": message["role"], "content": content})
+        return context
+
+    def _get_messages(self, conversation_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        limit = min(limit or MAX_STORED, MAX_STORED)
+        if self.store:
+            try:
+                return self.store.load(conversation_id, limit=limit)[1]
+            except Exception as e:
+                self.stats["store_errors"] += 1
+                logger.warning(f"⚠️ Chat memory store read failed: {e}")
+        with self._lock:
+            conv = self._hot.get(conversation_id)
+            return list(conv.messages[-limit:]) if conv else []
+
+    def _get_stats(self, conversation_id: str) -> Dict[str, Any]:
+        with self._lock:
+            conv = self._get(conversation_id)
+            if conv is None:
+                return {"total_messages": 0}
+            return {
+                "total_messages": conv.count,
+                "window_messages": len(conv.messages),
+                "summarized_messages": conv.summarized,
+                "summary_lines": len(conv.summary),
+                "created_at": conv.created_at,
+                "updated_at": conv.updated_at,
+            }
+
+    def _clear_conversation(self, conversation_id: str):
+        with self._lock:
+            self._hot.pop(conversation_id, None)
+            if self.store:
+                try:
+                    self.store.delete(conversation_id)
+                except Exception as e:
+                    self.stats["store_errors"] += 1
+                    logger.warning(f"⚠️ Chat memory store delete failed: {e}")
+
+    def _export_conversation(self, conversation_id: str, format: str = "json"):
+        messages = self._get_messages(conversation_id)
+        stats = self._get_stats(conversation_id)
+        if format == "text":
+            lines = [f"Conversation {conversation_id} ({stats['total_messages']} messages)"]
+            if stats["total_messages"] > len(messages):
+                lines.append(f"[{stats['total_messages'] - len(messages)} messages plus anciens non conservés]")
+            for message in messages:
+                label = ROLE_LABELS.get(message["role"], message["role"])
+                lines.append(f"\n[{message.get('timestamp', '')}] {label}:\n{message['content']}")
+            return "\n".join(lines)
+        return {"conversation_id": conversation_id, "stats": stats, "messages": messages}
+
+    def get_status(self) -> Dict[str, Any]:
+        """État global (backend, hot tier, compteurs)."""
+        with self._lock:
+            return {
+                "backend": self.store.name if self.store else "memory",
+                "hot_conversations": len(self._hot),
+                "max_hot": self.max_hot,
+                "idle_seconds": self.idle_seconds,
+                **self.stats,
+            }
+
+
+# Singleton instance
+chat_memory = ChatMemory(store=_create_store())
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+🔤 LANGID - Identification de langue locale et rapide
+======================================================
+Naive Bayes sur n-grammes de caractères (1 à 3, bornés aux mots) avec un
+modèle compact embarqué (langid_model.json, généré par
+scripts/build_langid_model.py). Les alphabets non latins (arabe, hébreu,
+cyrillique, CJK, devanagari) sont reconnus directement.
+
+    >>> identify("Quel temps fait-il à Paris ?")
+    ('fr', 0.99)
+    >>> detect_language("What's the bitcoin price?")
+    'en'
+
+Résultats mémoïsés par texte (requêtes courtes), budget < 100µs.
+detect_language renvoie `default` sous MIN_CONFIDENCE, ou sous
+SHORT_MIN_CONFIDENCE pour les textes de moins de SHORT_WORDS mots.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+MODEL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "langid_model.json")
+
+MAX_ORDER = 3
+# Au-delà, seul le début du texte est analysé (largement suffisant)
+MAX_CHARS = 256
+# Textes plus courts mémoïsés (requêtes, titres)
+MEMO_CHARS = 256
+# En dessous, detect_language renvoie `default`: sur 2-3 mots (noms propres,
+# marques: "real madrid", "netflix series") le modèle devine souvent au hasard
+MIN_CONFIDENCE = 0.5
+# Seuil relevé sous SHORT_WORDS mots (alphabet latin): sur 2 mots une seule
+# paire de noms propres suffit à tromper le modèle ("real madrid" → es 0.84)
+SHORT_WORDS = 3
+SHORT_MIN_CONFIDENCE = 0.85
+
+# (langue, début, fin) des alphabets propres à une langue
+SCRIPT_RANGES = [
+    ("ar", "؀", "ۿ"),
+    ("he", "֐", "׿"),
+    ("ru", "Ѐ", "ӿ"),
+    ("hi", "ऀ", "ॿ"),
+    ("ko", "가", "힯"),
+    ("ja", "぀", "ヿ"),   # Kana (prioritaire sur les idéogrammes)
+    ("zh", "一", "鿿"),
+]
+
+_NON_LETTERS = re.compile(r"[\W\d_]+")
+
+
+@lru_cache(maxsize=65536)
+def _word_ngrams(word: str, max_order: int) -> Tuple[str, ...]:
+    padded = f" {word} "
+    size = len(padded)
+    return tuple(
+        padded[i:i + n]
+        for n in range(1, max_order + 1)
+        for i in range(size - n + 1)
+        if n > 1 or padded[i] != " "
+    )
+
+
+def ngrams(text: str, max_order: int = MAX_ORDER) -> List[str]:
+    """N-grammes de caractères de chaque mot entouré d'espaces (" chat " → " c", "ch", ...)."""
+    grams: List[str] = []
+    for word in _NON_LETTERS.sub(" ", text.lower()).split():
+        grams.extend(_word_ngrams(word, max_order))
+    return grams
+
+
+def _script_language(text: str) -> Optional[Tuple[str, float]]:
+    """Langue déterminée par l'alphabet si la majorité des lettres est non latine."""
+    letters = 0
+    counts: Dict[str, int] = {}
+    for char in text:
+        if not char.isalpha():
+            continue
+        letters += 1
+        if char < "Ͱ":
+            continue
+        for lang, low, high in SCRIPT_RANGES:
+            if low <= char <= high:
+                counts[lang] = counts.get(lang, 0) + 1
+                break
+    if not counts:
+        return None
+    # Le japonais mélange kana et kanji: la présence de kana suffit
+    if counts.get("ja") and counts.get("zh"):
+        counts["ja"] += counts.pop("zh")
+    lang, count = max(counts.items(), key=lambda item: item[1])
+    if count * 2 < letters:
+        return None
+    return lang, round(count / letters, 3)
+
+
+class LanguageIdentifier:
+    """Modèle naive Bayes chargé à la première utilisation."""
+
+    def __init__(self, model_file: str = MODEL_FILE):
+        self.model_file = model_file
+        self.languages: List[str] = []
+        self.table: Dict[str, Tuple[float, ...]] = {}
+        self.max_order = MAX_ORDER
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            with open(self.model_file, encoding="utf-8") as f:
+                model = json.load(f)
+            self.languages = model["languages"]
+            self.max_order = model.get("max_order", MAX_ORDER)
+            self.table = {gram: tuple(row) for gram, row in model["table"].items()}
+            self._loaded = True
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Probabilités a posteriori par langue (langues latines du modèle)."""
+        if not self._loaded:
+            self._load()
+        table = self.table
+        rows = [table[g] for g in ngrams(text[:MAX_CHARS], self.max_order) if g in table]
+        if not rows:
+            return {}
+        # Somme des log-vraisemblances par langue (transposition en C via zip)
+        totals = [sum(column) for column in zip(*rows)]
+        # Naive Bayes est sur-confiant: log-vraisemblances tempérées par √n
+        scale = 1 / math.sqrt(len(rows))
+        best = max(totals)
+        weights = [math.exp((t - best) * scale) for t in totals]
+        norm = sum(weights)
+        return {lang: w / norm for lang, w in zip(self.languages, weights)}
+
+    def identify(self, text: str) -> Tuple[Optional[str], float]:
+        """(langue, confiance); (None, 0.0) si rien d'exploitable."""
+        script = _script_language(text[:MAX_CHARS])
+        if script:
+            return script
+        scores = self.scores(text)
+        if not scores:
+            return None, 0.0
+        lang = max(scores, key=scores.get)
+        return lang, round(scores[lang], 3)
+
+
+identifier = LanguageIdentifier()
+
+
+@lru_cache(maxsize=8192)
+def _identify_memo(text: str) -> Tuple[Optional[str], float]:
+    return identifier.identify(text)
+
+
+def identify(text: str) -> Tuple[Optional[str], float]:
+    """(code langue, confiance entre 0 et 1), mémoïsé pour les textes courts."""
+    if len(text) <= MEMO_CHARS:
+        return _identify_memo(text)
+    return identifier.identify(text)
+
+
+def detect_language(text: str, default: str = "fr", min_confidence: float = MIN_CONFIDENCE) -> str:
+    """Code langue du texte, `default` si indéterminé ou trop incertain."""
+    lang, confidence = identify(text)
+    if (
+        lang is not None
+        and min_confidence <= confidence < SHORT_MIN_CONFIDENCE
+        and len(_NON_LETTERS.sub(" ", text).split()) < SHORT_WORDS
+        and _script_language(text[:MAX_CHARS]) is None
+    ):
+        min_confidence = max(min_confidence, SHORT_MIN_CONFIDENCE)
+    if lang is None or confidence < min_confidence:
+        return default
+    return lang
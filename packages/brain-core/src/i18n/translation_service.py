@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+"""
+🌍 TRANSLATION SERVICE - Traduction par lots + mémoire de traduction
+=====================================================================
+- Mémoire de traduction persistante clé (source, cible, texte normalisé):
+  hot tier LRU en mémoire, puis Redis (partagé entre workers) ou SQLite.
+- Lots dédoublonnés, découpés en paquets envoyés en UN appel LLM chacun
+  (tableau JSON numéroté), paquets traduits en parallèle.
+- Single-flight: deux requêtes simultanées sur le même texte ne
+  déclenchent qu'une traduction.
+
+Configuration (env):
+    TRANSLATION_MEMORY_DB    chemin SQLite (défaut: data/translation_memory.db)
+    TRANSLATION_CONCURRENCY  appels LLM simultanés (défaut: 4)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from services import langid
+from services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# LANGUES
+# ══════════════════════════════════════════════════════════════════════════════
+
+SUPPORTED_LANGUAGES: Dict[str, Dict[str, Any]] = {
+    "fr": {"name": "Français", "flag": "🇫🇷"},
+    "en": {"name": "English", "flag": "🇬🇧"},
+    "es": {"name": "Español", "flag": "🇪🇸"},
+    "de": {"name": "Deutsch", "flag": "🇩🇪"},
+    "it": {"name": "Italiano", "flag": "🇮🇹"},
+    "pt": {"name": "Português", "flag": "🇵🇹"},
+    "nl": {"name": "Nederlands", "flag": "🇳🇱"},
+    "ru": {"name": "Русский", "flag": "🇷🇺"},
+    "ar": {"name": "العربية", "flag": "🇸🇦", "rtl": True},
+    "he": {"name": "עברית", "flag": "🇮🇱", "rtl": True},
+    "zh": {"name": "中文", "flag": "🇨🇳"},
+    "ja": {"name": "日本語", "flag": "🇯🇵"},
+    "ko": {"name": "한국어", "flag": "🇰🇷"},
+    "tr": {"name": "Türkçe", "flag": "🇹🇷"},
+    "pl": {"name": "Polski", "flag": "🇵🇱"},
+    "hi": {"name": "हिन्दी", "flag": "🇮🇳"},
+}
+
+UI_TRANSLATIONS: Dict[str, Dict[str, str]] = {
+    "fr": {"search": "Rechercher", "search_placeholder": "Pose ta question...", "loading": "Chargement...",
+           "sources": "Sources", "trending": "Tendances", "error": "Une erreur s'est produite", "copy": "Copier", "share": "Partager"},
+    "en": {"search": "Search", "search_placeholder": "Ask your question...", "loading": "Loading...",
+           "sources": "Sources", "trending": "Trending", "error": "Something went wrong", "copy": "Copy", "share": "Share"},
+    "es": {"search": "Buscar", "search_placeholder": "Haz tu pregunta...", "loading": "Cargando...",
+           "sources": "Fuentes", "trending": "Tendencias", "error": "Se produjo un error", "copy": "Copiar", "share": "Compartir"},
+    "de": {"search": "Suchen", "search_placeholder": "Stell deine Frage...", "loading": "Wird geladen...",
+           "sources": "Quellen", "trending": "Trends", "error": "Ein Fehler ist aufgetreten", "copy": "Kopieren", "share": "Teilen"},
+    "ar": {"search": "بحث", "search_placeholder": "اطرح سؤالك...", "loading": "جار التحميل...",
+           "sources": "المصادر", "trending": "الأكثر رواجاً", "error": "حدث خطأ", "copy": "نسخ", "share": "مشاركة"},
+    "he": {"search": "חיפוש", "search_placeholder": "שאל את שאלתך...", "loading": "טוען...",
+           "sources": "מקורות", "trending": "טרנדים", "error": "אירעה שגיאה", "copy": "העתק", "share": "שתף"},
+}
+
+
+def get_supported_languages() -> Dict[str, Dict[str, Any]]:
+    return SUPPORTED_LANGUAGES
+
+
+def is_rtl(lang: str) -> bool:
+    return SUPPORTED_LANGUAGES.get(lang, {}).get("rtl", False)
+
+
+def get_ui_text(key: str, lang: str = "fr") -> str:
+    return UI_TRANSLATIONS.get(lang, {}).get(key) or UI_TRANSLATIONS["en"].get(key, key)
+
+
+def detect_language(text: str, default: str = "fr") -> str:
+    """Détecte la langue d'un texte (modèle partagé services.langid)."""
+    return langid.detect_language(text, default=default)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MÉMOIRE DE TRADUCTION
+# ══════════════════════════════════════════════════════════════════════════════
+
+DB_PATH = os.getenv("TRANSLATION_MEMORY_DB", os.path.join("data", "translation_memory.db"))
+CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", 4))
+TM_TTL = 90 * 86400
+HOT_SIZE = 5000
+
+# Paquets envoyés en un seul appel LLM
+BATCH_MAX_ITEMS = 40
+BATCH_MAX_CHARS = 6000
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Forme canonique d'un texte pour la mémoire (NFC, espaces compactés)."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def _rewrap(original: str, translated: str) -> str:
+    """Remet les espaces de début/fin du texte original autour de la traduction."""
+    stripped = original.strip()
+    if not stripped:
+        return original
+    start = original.index(stripped)
+    return f"{original[:start]}{translated}{original[start + len(stripped):]}"
+
+
+def tm_key(source: str, target: str, text: str) -> str:
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return f"tm:{source}:{target}:{digest}"
+
+
+class TranslationMemory:
+    """Hot tier LRU + Redis (si disponible) ou SQLite."""
+
+    def __init__(self, path: str = DB_PATH, hot_size: int = HOT_SIZE):
+        self._hot: "OrderedDict[str, str]" = OrderedDict()
+        self._hot_size = hot_size
+        self._lock = threading.Lock()
+        self.redis = cache_service.redis if cache_service.available and not cache_service.using_memory else None
+        self.db = None
+        if self.redis is None:
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self.db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+                self.db.execute("PRAGMA journal_mode=WAL")
+                self.db.execute(
+                    "CREATE TABLE IF NOT EXISTS tm (key TEXT PRIMARY KEY, translated TEXT NOT NULL, updated REAL NOT NULL)"
+                )
+                self.db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Translation memory store unavailable ({e}), memory only")
+                self.db = None
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self.redis is not None else "sqlite" if self.db is not None else "memory"
+
+    def _remember(self, key: str, value: str):
+        self._hot[key] = value
+        self._hot.move_to_end(key)
+        while len(self._hot) > self._hot_size:
+            self._hot.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._hot:
+                    self._hot.move_to_end(key)
+                    found[key] = self._hot[key]
+        missing = [k for k in keys if k not in found]
+        if not missing:
+            return found
+        try:
+            if self.redis is not None:
+                stored = dict(zip(missing, self.redis.mget(missing)))
+            elif self.db is not None:
+                stored = {}
+                with self._lock:
+                    for i in range(0, len(missing), 500):
+                        chunk = missing[i:i + 500]
+                        rows = self.db.execute(
+                            f"SELECT key, translated FROM tm WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                        ).fetchall()
+                        stored.update(rows)
+            else:
+                stored = {}
+        except Exception as e:
+            logger.warning(f"⚠️ Translation memory read failed: {e}")
+            stored = {}
+        with self._lock:
+            for key, value in stored.items():
+                if value is not None:
+                    found[key] = value
+                    self._remember(key, value)
+        return found
+
+    def set_many(self, entries: Dict[str, str]):
+        if not entries:
+            return
+        with self._lock:
+            for key, value in entries.items():
+                self._remember(key, value)
+        try:
+            if self.redis is not None:
+                pipe = self.redis.pipeline()
+                for key, value in entries.items():
+                    pipe.setex(key, TM_TTL, value)
+                pipe.execute()
+            elif self.db is not None:
+                now = time.time()
+                with self._lock, self.db:
+                    self.db.executemany(
+                        "INSERT OR REPLACE INTO tm (key, translated, updated) VALUES (?, ?, ?)",
+                        [(key, value, now) for key, value in entries.items()],
+                    )
+        except Exception as e:
+            logger.warning(f"⚠️ Translation memory write failed: {e}")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SERVICE
+# ══════════════════════════════════════════════════════════════════════════════
+
+TRANSLATE_SYSTEM_PROMPT = """You are a professional translator.
+Translate faithfully, keep the tone, formatting, numbers, URLs, emojis and proper nouns.
+Never add explanations, notes or quotes around the result."""
+
+
+class TranslationService:
+    """Traductions unitaires et par lots, servies d'abord par la mémoire de traduction."""
+
+    def __init__(self, memory: Optional[TranslationMemory] = None, concurrency: int = CONCURRENCY):
+        self.memory = memory or TranslationMemory()
+        self.concurrency = concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"requested": 0, "memory_hits": 0, "deduplicated": 0, "translated": 0, "llm_calls": 0, "failures": 0}
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def translate(self, text: str, target: str, source: str = "auto") -> str:
+        """Traduit un texte (mémoire de traduction d'abord)."""
+        return (await self.translate_batch([text], target, source))[0]
+
+    async def translate_batch(self, texts: List[str], target: str, source: str = "auto") -> List[str]:
+        """Traduit une liste de textes, dans l'ordre (voir translate_batch_detailed)."""
+        return [translated for translated, _ in await self.translate_batch_detailed(texts, target, source)]
+
+    async def translate_batch_detailed(
+        self, texts: List[str], target: str, source: str = "auto"
+    ) -> List[Tuple[str, Optional[str]]]:
+        """
+        (traduction, langue source) par texte, dans l'ordre. Doublons et entrées déjà
+        en mémoire ne coûtent rien; le reste part en paquets parallèles.
+        Le texte normalisé ne sert que de clé (mémoire, doublons): le LLM
+        reçoit le texte original, et un texte non traduit (échec, déjà dans
+        la langue cible) est renvoyé tel quel.
+
+        source="auto": langue détectée texte par texte (repli sur la langue
+        dominante du lot pour les textes trop courts), les textes sont
+        groupés par langue source. Langue source None pour un texte vide.
+        """
+        self.stats["requested"] += len(texts)
+        normalized = [normalize(t) for t in texts]
+        originals: Dict[str, str] = {}
+        for text, norm in zip(texts, normalized):
+            if norm:
+                originals.setdefault(norm, text)
+        self.stats["deduplicated"] += len([n for n in normalized if n]) - len(originals)
+
+        sources: Dict[str, str] = {}
+        if source == "auto" and originals:
+            dominant = detect_language(" ".join(list(originals)[:20]), default=target)
+            sources = {norm: detect_language(norm, default=dominant) for norm in originals}
+        else:
+            sources = {norm: source for norm in originals}
+        groups: Dict[str, List[str]] = {}
+        for norm, lang in sources.items():
+            if lang != target:
+                groups.setdefault(lang, []).append(norm)
+
+        results: Dict[str, str] = {}
+        for group_result in await asyncio.gather(*(
+            self._translate_group(group, originals, target, group_source) for group_source, group in groups.items()
+        )):
+            results.update(group_result)
+
+        return [
+            (_rewrap(t, results[n]) if n in results else t, sources.get(n))
+            for t, n in zip(texts, normalized)
+        ]
+
+    async def _memory_io(self, method, *args):
+        # Store Redis / SQLite bloquant: hors de la boucle (le hot tier seul reste en ligne)
+        if self.memory.backend == "memory":
+            return method(*args)
+        return await asyncio.to_thread(method, *args)
+
+    async def _translate_group(self, unique: List[str], originals: Dict[str, str], target: str, source: str) -> Dict[str, str]:
+        """Textes d'une même langue source: mémoire, single-flight, puis LLM. Clés = textes normalisés."""
+        keys = {t: tm_key(source, target, t) for t in unique}
+        cached = await self._memory_io(self.memory.get_many, list(keys.values()))
+        results = {t: cached[k] for t, k in keys.items() if k in cached}
+        self.stats["memory_hits"] += len(results)
+
+        # Single-flight: les textes déjà en cours de traduction sont attendus
+        waiting: Dict[str, asyncio.Future] = {}
+        todo: List[str] = []
+        loop = asyncio.get_running_loop()
+        for text in unique:
+            if text in results:
+                continue
+            key = keys[text]
+            if key in self._inflight:
+                waiting[text] = self._inflight[key]
+            else:
+                self._inflight[key] = loop.create_future()
+                todo.append(text)
+
+        if todo:
+            translated: Dict[str, str] = {}
+            try:
+                by_original = await self._translate_missing([originals[t] for t in todo], target, source)
+                translated = {t: by_original[originals[t]] for t in todo if by_original.get(originals[t])}
+            except Exception as e:
+                logger.warning(f"⚠️ Batch translation failed: {e}")
+            finally:
+                # Libère les requêtes en attente, même si cet appel est annulé
+                for text in todo:
+                    future = self._inflight.pop(keys[text], None)
+                    if future is not None and not future.done():
+                        future.set_result(translated.get(text))
+            fresh = {}
+            for text in todo:
+                value = translated.get(text)
+                if value:
+                    fresh[keys[text]] = value
+                    results[text] = value
+            await self._memory_io(self.memory.set_many, fresh)
+            self.stats["translated"] += len(fresh)
+            self.stats["failures"] += len(todo) - len(fresh)
+
+        for text, future in waiting.items():
+            value = await future
+            if value:
+                results[text] = value
+        return results
+
+    async def _translate_missing(self, texts: List[str], target: str, source: str) -> Dict[str, str]:
+        """Paquets (≤ BATCH_MAX_ITEMS textes, ≤ BATCH_MAX_CHARS caractères) traduits en parallèle."""
+        packets: List[List[str]] = [[]]
+        size = 0
+        for text in texts:
+            if packets[-1] and (len(packets[-1]) >= BATCH_MAX_ITEMS or size + len(text) > BATCH_MAX_CHARS):
+                packets.append([])
+                size = 0
+            packets[-1].append(text)
+            size += len(text)
+
+        results: Dict[str, str] = {}
+        for packet_result in await asyncio.gather(*(self._translate_packet(p, target, source) for p in packets)):
+            results.update(packet_result)
+        return results
+
+    async def _call_llm(self, prompt: str, max_tokens: int) -> str:
+        from services.ai_router import ai_router
+        async with self._get_semaphore():
+            self.stats["llm_calls"] += 1
+            result = await ai_router.route(prompt=prompt, system_prompt=TRANSLATE_SYSTEM_PROMPT, max_tokens=max_tokens)
+        return result["response"]
+
+    async def _translate_packet(self, texts: List[str], target: str, source: str) -> Dict[str, str]:
+        source_name = SUPPORTED_LANGUAGES.get(source, {}).get("name", source)
+        target_name = SUPPORTED_LANGUAGES.get(target, {}).get("name", target)
+        max_tokens = min(8000, 256 + sum(len(t) for t in texts))
+
+        if len(texts) > 1:
+            prompt = (
+                f"Translate each string of this JSON array from {source_name} ({source}) to {target_name} ({target}).\n"
+                f"Answer with ONLY a JSON array of exactly {len(texts)} strings, same order.\n\n"
+                + json.dumps(texts, ensure_ascii=False)
+            )
+            try:
+                translated = _parse_json_array(await self._call_llm(prompt, max_tokens))
+                if len(translated) == len(texts):
+                    return {src: str(dst).strip() for src, dst in zip(texts, translated) if str(dst).strip()}
+                logger.warning(f"⚠️ Translation batch size mismatch ({len(translated)}/{len(texts)}), retrying one by one")
+            except Exception as e:
+                logger.warning(f"⚠️ Translation batch failed ({e}), retrying one by one")
+
+        async def one(text: str) -> Tuple[str, Optional[str]]:
+            prompt = f"Translate from {source_name} ({source}) to {target_name} ({target}):\n\n{text}"
+            try:
+                return text, (await self._call_llm(prompt, min(4000, 128 + len(text) * 2))).strip()
+            except Exception as e:
+                logger.warning(f"⚠️ Translation failed: {e}")
+                return text, None
+
+        return {text: value for text, value in await asyncio.gather(*(one(t) for t in texts)) if value}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"memory_backend": self.memory.backend, "concurrency": self.concurrency, **self.stats}
+
+
+def _parse_json_array(response: str) -> List[Any]:
+    """Extrait le tableau JSON d'une réponse LLM (tolère ```json ... ``` et texte autour)."""
+    start, end = response.find("["), response.rfind("]")
+    if start == -1 or end <= start:
+        raise ValueError("no JSON array in response")
+    value = json.loads(response[start:end + 1])
+    if not isinstance(value, list):
+        raise ValueError("response is not a JSON array")
+    return value
+
+
+# Singleton instance
+translation_service = TranslationService()
@@ -5,19 +5,11 @@ Routeur intelligent qui analyse la requête et retourne
 l'interface de domaine appropriée.
 """
 
-from typing import Dict, List, Optional, Type
+from typing import Dict, List, Optional, Tuple
+import importlib
 import logging
 
 from .base import BaseInterface
-from .finance import FinanceInterface
-from .weather import WeatherInterface
-from .tech import TechInterface
-from .tourism import TourismInterface
-from .sports import SportsInterface
-from .entertainment import EntertainmentInterface
-from .health import HealthInterface
-from .food import FoodInterface
-from .knowledge import KnowledgeInterface
 
 logger = logging.getLogger(__name__)
 
@@ -33,28 +25,42 @@ class InterfaceFactory:
     """
     
     # Ordre de priorité des interfaces (les plus spécifiques en premier)
-    INTERFACE_PRIORITY: List[Type[BaseInterface]] = [
-        FinanceInterface,       # Crypto, Bourse
-        WeatherInterface,       # Météo
-        SportsInterface,        # Sport
-        HealthInterface,        # Santé
-        FoodInterface,          # Cuisine/Recettes
-        EntertainmentInterface, # Films, Musique
-        TechInterface,          # Code, Dev
-        TourismInterface,       # Voyages
-        KnowledgeInterface,     # Fallback (toujours en dernier)
+    # (domaine, module, classe): les modules ne sont importés qu'au premier usage
+    INTERFACE_PRIORITY: List[Tuple[str, str, str]] = [
+        ("finance", "finance", "FinanceInterface"),                    # Crypto, Bourse
+        ("weather", "weather", "WeatherInterface"),                    # Météo
+        ("sports", "sports", "SportsInterface"),                       # Sport
+        ("health", "health", "HealthInterface"),                       # Santé
+        ("food", "food", "FoodInterface"),                             # Cuisine/Recettes
+        ("entertainment", "entertainment", "EntertainmentInterface"),  # Films, Musique
+        ("tech", "tech", "TechInterface"),                             # Code, Dev
+        ("tourism", "tourism", "TourismInterface"),                    # Voyages
+        ("knowledge", "knowledge", "KnowledgeInterface"),              # Fallback (toujours en dernier)
     ]
     
     def __init__(self):
-        # Cache des instances pour réutilisation
+        # Cache des instances, remplie à la demande
         self._instances: Dict[str, BaseInterface] = {}
-        
-        # Pré-instancier toutes les interfaces
-        for interface_class in self.INTERFACE_PRIORITY:
-            instance = interface_class()
-            self._instances[instance.DOMAIN_NAME] = instance
-        
-        logger.info(f"🏭 InterfaceFactory initialized with {len(self._instances)} domains")
+    
+    def _load(self, domain_name: str) -> Optional[BaseInterface]:
+        """Importe et instancie une interface au premier usage."""
+        if domain_name not in self._instances:
+            entry = next((e for e in self.INTERFACE_PRIORITY if e[0] == domain_name), None)
+            if entry is None:
+                return None
+            _, module_name, class_name = entry
+            module = importlib.import_module(f".{module_name}", __package__)
+            self._instances[domain_name] = getattr(module, class_name)()
+            logger.debug(f"🏭 Interface {domain_name} loaded")
+        return self._instances[domain_name]
+    
+    def _load_all(self) -> Dict[str, BaseInterface]:
+        """Charge toutes les interfaces (dans l'ordre de priorité)."""
+        if len(self._instances) < len(self.INTERFACE_PRIORITY):
+            for domain_name, _, _ in self.INTERFACE_PRIORITY:
+                self._load(domain_name)
+            logger.info(f"🏭 InterfaceFactory loaded {len(self._instances)} domains")
+        return {name: self._instances[name] for name, _, _ in self.INTERFACE_PRIORITY}
     
     def get_interface(self, query: str) -> BaseInterface:
         """
@@ -69,7 +75,7 @@ class InterfaceFactory:
         best_score: int = -1
         
         # 1. Analyser chaque interface
-        for name, instance in self._instances.items():
+        for name, instance in self._load_all().items():
             # Si match direct (mot clé ou pattern)
             if instance.matches(q_clean):
                 # On retourne direct le premier match spécifique (ordre de priorité)
@@ -89,25 +95,25 @@ class InterfaceFactory:
             return best_match
             
         logger.info(f"🔄 Fallback to knowledge for '{query[:30]}...'")
-        return self._instances["knowledge"]
+        return self._load("knowledge")
     
     def get_all_interfaces(self) -> Dict[str, BaseInterface]:
         """Retourne toutes les interfaces disponibles pour une recherche exhaustive."""
-        return self._instances
+        return self._load_all()
     
     def get_interface_by_name(self, domain_name: str) -> BaseInterface:
         """
         Retourne une interface par son nom de domaine.
         Utile pour forcer un domaine spécifique.
         """
-        return self._instances.get(domain_name, self._instances.get("knowledge"))
+        return self._load(domain_name) or self._load("knowledge")
     
     def get_all_domains(self) -> List[str]:
         """Liste tous les domaines disponibles."""
-        return list(self._instances.keys())
+        return [name for name, _, _ in self.INTERFACE_PRIORITY]
     
     async def close_all(self):
-        """Ferme proprement tous les clients HTTP des interfaces."""
+        """Ferme proprement les clients HTTP des interfaces chargées."""
         for instance in self._instances.values():
             await instance.close()
         logger.info("🧹 All interfaces closed")
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+🗜️ HTTP CACHING - Compression et validation des réponses
+=========================================================
+Deux briques, indépendantes des routes:
+
+- CompressionMiddleware (ASGI): gzip ou brotli selon Accept-Encoding.
+  Les flux (SSE, NDJSON) sont compressés trame par trame avec un flush
+  après chaque morceau: le client reçoit chaque événement immédiatement.
+- PayloadCache + cached_response: réponses JSON encodées une fois
+  (orjson), ETag = empreinte du corps, variantes gzip/brotli gardées
+  en mémoire. Un If-None-Match qui correspond renvoie 304 sans
+  reconstruire ni sérialiser le corps.
+
+Politiques Cache-Control (CACHE_*) choisies par route:
+
+    payload = await http_cache.get("languages", build_languages)
+    return cached_response(request, payload, CACHE_STATIC)
+"""
+
+import asyncio
+import gzip
+import hashlib
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+
+from services.stream_encoding import dumps
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Corps plus petits: la compression ne gagne rien (en-têtes + CPU)
+MINIMUM_SIZE = 500
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/javascript",
+    "text/", "image/svg+xml",
+)
+
+# Politiques de cache par type de route
+CACHE_STATIC = "public, max-age=86400, stale-while-revalidate=604800"  # langues, traductions UI, domaines
+CACHE_SHORT = "public, max-age=300, stale-while-revalidate=900"       # trending
+CACHE_REVALIDATE = "no-cache"                                         # stats: toujours revalider (304)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# NÉGOCIATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """"br" ou "gzip" selon Accept-Encoding (q=0 = refusé), None sinon."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible (RFC 9110): W/"x" et "x" désignent le même corps."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in if_none_match.split(","))
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _add_vary(headers: MutableHeaders):
+    vary = headers.get("vary", "")
+    if "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# COMPRESSEURS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compression d'un corps complet."""
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class StreamCompressor:
+    """Compresse un flux morceau par morceau; chaque morceau sort en entier (flush)."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=4)
+        else:
+            self._zlib = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 = format gzip
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MIDDLEWARE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class CompressionMiddleware:
+    """
+    Compression gzip/brotli des réponses HTTP.
+
+    Réponse complète (un seul message body): compressée d'un bloc si elle
+    dépasse `minimum_size`. Réponse en flux (StreamingResponse, SSE):
+    compressée au fil de l'eau, sans attendre la fin du flux. Les réponses
+    déjà encodées (cached_response) et les 304 passent telles quelles.
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[dict] = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] in (204, 304) or not _compressible(headers):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # En-têtes retenus jusqu'au premier morceau (taille, flux ou non)
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(raw=start["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = encoding
+                _add_vary(headers)
+                if more_body:
+                    del headers["Content-Length"]
+                    compressor = StreamCompressor(encoding)
+                else:
+                    body = compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start)
+
+            if more_body:
+                data = compressor.chunk(body) if body else b""
+                if data:
+                    await send({"type": "http.response.body", "body": data, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.chunk(body) + compressor.finish()})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RÉPONSES JSON EN CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class EncodedPayload:
+    """Corps JSON encodé une fois, son ETag et ses variantes compressées."""
+
+    __slots__ = ("body", "etag", "expires_at", "_encoded")
+
+    def __init__(self, content: Any, ttl: Optional[float] = None):
+        self.body = dumps(content)
+        self.etag = f'W/"{hashlib.blake2b(self.body, digest_size=12).hexdigest()}"'
+        self.expires_at = time.monotonic() + ttl if ttl else None
+        self._encoded: Dict[str, bytes] = {}
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def encoded(self, encoding: str) -> bytes:
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compress(self.body, encoding)
+        return self._encoded[encoding]
+
+
+Builder = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+class PayloadCache:
+    """
+    Réponses JSON prêtes à servir, par clé (LRU).
+
+    `ttl=None`: contenu statique, construit une seule fois par processus.
+    Une construction à la fois par clé: les requêtes simultanées attendent
+    le même résultat au lieu de le recalculer.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, EncodedPayload]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.builds = 0
+
+    def peek(self, key: str) -> Optional[EncodedPayload]:
+        payload = self._entries.get(key)
+        if payload is None or payload.expired:
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def put(self, key: str, content: Any, ttl: Optional[float] = None) -> EncodedPayload:
+        payload = self._entries[key] = EncodedPayload(content, ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.builds += 1
+        return payload
+
+    async def get(self, key: str, build: Builder, ttl: Optional[float] = None) -> EncodedPayload:
+        payload = self.peek(key)
+        if payload is not None:
+            self.hits += 1
+            return payload
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            payload = self.peek(key)
+            if payload is not None:
+                self.hits += 1
+                return payload
+            content = build()
+            if asyncio.iscoroutine(content):
+                content = await content
+            return self.put(key, content, ttl)
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "builds": self.builds}
+
+
+def cached_response(request: Request, payload: EncodedPayload, cache_control: str) -> Response:
+    """
+    Réponse JSON avec ETag et Cache-Control; 304 si le client a déjà ce corps.
+
+    La variante compressée est servie directement (Content-Encoding posé):
+    CompressionMiddleware la laisse passer sans recompresser.
+    """
+    headers = {"ETag": payload.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+    body = payload.body
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding and len(body) >= MINIMUM_SIZE:
+        body = payload.encoded(encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+# Singleton
+http_cache = PayloadCache()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+📡 STREAM ENCODING - Encodage JSON des flux SSE / NDJSON et des réponses
+=========================================================================
+Un seul encodeur pour tous les flux (deep search, smart pipeline, chat,
+batch MegaBrain) et pour les réponses JSON de l'API:
+
+- orjson (UTF-8 natif, sérialisation en C), repli sur json si absent
+  ou si orjson refuse l'objet (entiers > 64 bits)
+- Trames SSE (`data: {...}\\n\\n`) et NDJSON (`{...}\\n`) produites
+  directement en bytes: StreamingResponse les envoie sans ré-encodage
+- Enregistrements (sources...) laissés à orjson: les pré-encoder
+  (orjson.Fragment) coûte plus cher que les ré-encoder (voir le benchmark)
+- FastJSONResponse: classe de réponse par défaut de l'app FastAPI
+
+Benchmark: packages/api-server/scripts/bench_stream_encoding.py
+"""
+
+import json
+from typing import Any, Dict
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Clés non-str (ids numériques...) acceptées comme le fait json.dumps
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ENCODAGE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _default(obj: Any) -> Any:
+    """Types non JSON: ensembles en listes, le reste en str."""
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    JSON compact en UTF-8 (ensembles en listes, autres types inconnus en str).
+    Ce qu'orjson refuse (entiers au-delà de 64 bits, clés exotiques) repasse
+    par json.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+        except TypeError:  # orjson.JSONEncodeError
+            pass
+    return _stdlib_dumps(obj)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TRAMES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def sse_event(event: Dict[str, Any]) -> bytes:
+    """Trame SSE d'un événement déjà construit ({"type": ..., ...})."""
+    return b"data: " + dumps(event) + b"\n\n"
+
+
+def sse(event_type: str, data: Any) -> bytes:
+    """Trame SSE {"type": event_type, "data": data}."""
+    return sse_event({"type": event_type, "data": data})
+
+
+def ndjson(obj: Any) -> bytes:
+    """Ligne NDJSON."""
+    return dumps(obj) + b"\n"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RÉPONSES
+# ══════════════════════════════════════════════════════════════════════════════
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encodée par orjson.
+
+    Classe par défaut de l'app; une route qui renvoie directement
+    `FastJSONResponse(data)` évite en plus le passage de FastAPI par
+    jsonable_encoder (coûteux sur les gros résultats imbriqués).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,526 @@
+# -*- coding: utf-8 -*-
+"""
+🎤 VOICE SERVICE - Synthèse vocale (edge-tts) et transcription (Whisper)
+=========================================================================
+TTS en streaming, phrase par phrase: le premier morceau d'audio part dès
+que la première phrase est synthétisée, les phrases suivantes sont
+préparées en avance (look-ahead) pendant la lecture.
+
+Synthèse complète (`synthesize_timed`): phrases synthétisées en parallèle
+(parallélisme borné), MP3 recollés tels quels (sans ré-encodage) et
+timings mot à mot (événements WordBoundary) pour les sous-titres. Moteur
+partagé par la route /api/voice et le studio vidéo.
+
+Chaque phrase est mise en cache sur disque, adressée par son contenu
+(sha256 de texte + voix + débit + langue): les réponses et suggestions
+répétées ne sont plus jamais re-synthétisées. Éviction LRU par taille.
+
+Configuration (env):
+    VOICE_CACHE_DIR       dossier du cache audio (défaut: data/tts_cache)
+    VOICE_CACHE_MAX_MB    taille max du cache (défaut: 500)
+    GROQ_API_KEY / OPENAI_API_KEY   transcription Whisper
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import json
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# VOIX
+# ══════════════════════════════════════════════════════════════════════════════
+
+VOICE_MAP: Dict[str, List[str]] = {
+    "fr": ["fr-FR-DeniseNeural", "fr-FR-HenriNeural", "fr-FR-EloiseNeural"],
+    "en": ["en-US-JennyNeural", "en-US-GuyNeural", "en-GB-SoniaNeural"],
+    "es": ["es-ES-ElviraNeural", "es-ES-AlvaroNeural", "es-MX-DaliaNeural"],
+    "de": ["de-DE-KatjaNeural", "de-DE-ConradNeural"],
+    "it": ["it-IT-ElsaNeural", "it-IT-DiegoNeural"],
+    "pt": ["pt-BR-FranciscaNeural", "pt-PT-RaquelNeural"],
+    "nl": ["nl-NL-ColetteNeural", "nl-NL-MaartenNeural"],
+    "ru": ["ru-RU-SvetlanaNeural", "ru-RU-DmitryNeural"],
+    "ar": ["ar-SA-ZariyahNeural", "ar-SA-HamedNeural"],
+    "he": ["he-IL-HilaNeural", "he-IL-AvriNeural"],
+    "zh": ["zh-CN-XiaoxiaoNeural", "zh-CN-YunxiNeural"],
+    "ja": ["ja-JP-NanamiNeural", "ja-JP-KeitaNeural"],
+    "ko": ["ko-KR-SunHiNeural", "ko-KR-InJoonNeural"],
+    "tr": ["tr-TR-EmelNeural", "tr-TR-AhmetNeural"],
+    "pl": ["pl-PL-ZofiaNeural", "pl-PL-MarekNeural"],
+    "hi": ["hi-IN-SwaraNeural", "hi-IN-MadhurNeural"],
+}
+
+
+def get_voices(lang: Optional[str] = None) -> Dict[str, List[str]]:
+    """Voix disponibles, éventuellement filtrées par langue."""
+    if lang:
+        return {lang: VOICE_MAP.get(lang, [])}
+    return VOICE_MAP
+
+
+def resolve_voice(lang: str, voice: Optional[str] = None) -> str:
+    if voice:
+        return voice
+    return VOICE_MAP.get(lang, VOICE_MAP["fr"])[0]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# DÉCOUPAGE EN PHRASES
+# ══════════════════════════════════════════════════════════════════════════════
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…。！？])\s+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+_MARKDOWN = re.compile(r"[*_#`>\[\]]+")
+
+# Phrases plus courtes fusionnées avec la suivante (évite les micro-requêtes)
+MIN_SENTENCE_CHARS = 40
+MAX_SENTENCE_CHARS = 400
+
+
+def clean_text(text: str) -> str:
+    """Texte lisible à voix haute: sans markdown, espaces compactés."""
+    text = unicodedata.normalize("NFC", _MARKDOWN.sub(" ", text))
+    return " ".join(text.split())
+
+
+def split_sentences(text: str, min_chars: int = MIN_SENTENCE_CHARS, max_chars: int = MAX_SENTENCE_CHARS) -> List[str]:
+    """
+    Découpe en phrases de taille raisonnable: les courtes sont fusionnées,
+    les longues recoupées aux virgules, puis aux espaces.
+    """
+    pieces: List[str] = []
+    for sentence in _SENTENCE_END.split(clean_text(text)):
+        while len(sentence) > max_chars:
+            cut = max((m.end() for m in _CLAUSE_END.finditer(sentence, 0, max_chars)), default=0)
+            if cut < min_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+
+    merged: List[str] = []
+    for piece in pieces:
+        if merged and len(merged[-1]) < min_chars and len(merged[-1]) + len(piece) < max_chars:
+            merged[-1] = f"{merged[-1]} {piece}"
+        else:
+            merged.append(piece)
+    return merged
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CACHE AUDIO (disque, adressé par contenu)
+# ══════════════════════════════════════════════════════════════════════════════
+
+CACHE_DIR = os.getenv("VOICE_CACHE_DIR", os.path.join("data", "tts_cache"))
+CACHE_MAX_BYTES = int(float(os.getenv("VOICE_CACHE_MAX_MB", 500)) * 1024 * 1024)
+READ_CHUNK = 32 * 1024
+
+
+def words_path(audio_path: str) -> str:
+    """Timings mot à mot associés à un fichier audio: {nom}.words.json."""
+    return f"{os.path.splitext(str(audio_path))[0]}.words.json"
+
+
+class AudioCache:
+    """
+    Fichiers MP3 {dir}/{ab}/{sha256}.mp3 (+ .words.json), LRU par date
+    d'accès (mtime).
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, voice: str, rate: str, lang: str) -> str:
+        return hashlib.sha256(f"{voice}\x00{rate}\x00{lang}\x00{text}".encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.mp3")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path(key)
+        try:
+            os.utime(path)  # Marque l'entrée comme récemment utilisée
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def get_words(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Timings d'une phrase en cache (None si absents: entrée antérieure)."""
+        try:
+            with open(words_path(self.path(key)), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, audio: bytes, words: Optional[List[Dict[str, Any]]] = None):
+        if not audio:
+            return
+        path = self.path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if words is not None:
+                # Écrit avant l'audio: un MP3 présent a toujours ses timings
+                tmp = f"{words_path(path)}.{os.getpid()}.part"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(words, f, ensure_ascii=False)
+                os.replace(tmp, words_path(path))
+            tmp = f"{path}.{os.getpid()}.part"
+            with open(tmp, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, path)  # Atomique: jamais de fichier tronqué lu par un autre worker
+        except OSError as e:
+            logger.warning(f"⚠️ TTS cache write failed: {e}")
+            return
+        if self._size is None:
+            self._size = self._scan_size()
+        else:
+            self._size += len(audio)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".mp3"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à 90% de la taille max."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+            try:
+                os.remove(words_path(path))
+            except OSError:
+                pass
+        self._size = total
+        if removed:
+            logger.info(f"🧹 TTS cache: {removed} files evicted")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "size_mb": round((self._size if self._size is not None else self._scan_size()) / 1024 / 1024, 1),
+            "max_mb": round(self.max_bytes / 1024 / 1024),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TTS
+# ══════════════════════════════════════════════════════════════════════════════
+
+_DONE = object()
+
+# Sortie edge-tts: MP3 CBR 48 kbit/s (audio-24khz-48kbitrate-mono-mp3),
+# la durée d'une phrase se déduit de sa taille
+MP3_BYTES_PER_SECOND = 48000 // 8
+# Offsets et durées WordBoundary en unités de 100 ns
+TICKS_PER_SECOND = 10_000_000
+
+
+@dataclass
+class SpeechResult:
+    """Audio MP3 complet et timings mot à mot ({text, start, end} en secondes)."""
+    audio: bytes
+    words: List[Dict[str, Any]]
+    duration: float
+
+    def save(self, path: str) -> str:
+        """Écrit le MP3 et ses timings ({nom}.words.json) à côté."""
+        with open(path, "wb") as f:
+            f.write(self.audio)
+        with open(words_path(path), "w", encoding="utf-8") as f:
+            json.dump(self.words, f, ensure_ascii=False)
+        return path
+
+
+def _communicate(sentence: str, voice: str, rate: str):
+    import edge_tts
+    try:
+        return edge_tts.Communicate(sentence, voice, rate=rate, boundary="WordBoundary")
+    except TypeError:  # edge-tts < 7: WordBoundary par défaut, pas d'option
+        return edge_tts.Communicate(sentence, voice, rate=rate)
+
+
+class TTSService:
+    """Synthèse edge-tts par phrase (streaming ou complète), avec cache audio."""
+
+    def __init__(
+        self, cache: Optional[AudioCache] = None, rate: str = "+0%", lookahead: int = 2, concurrency: int = 4
+    ):
+        self.cache = cache or AudioCache()
+        self.rate = rate
+        self.lookahead = lookahead
+        self.concurrency = concurrency
+
+    async def _synthesize_sentence(
+        self, sentence: str, voice: str, rate: str, queue: Optional[asyncio.Queue] = None
+    ) -> Tuple[bytes, List[Dict[str, Any]]]:
+        """
+        Audio et timings d'une phrase; les morceaux MP3 sont aussi poussés
+        dans `queue` au fil de l'eau (streaming).
+        """
+        audio = bytearray()
+        words: List[Dict[str, Any]] = []
+        try:
+            async for chunk in _communicate(sentence, voice, rate).stream():
+                if chunk["type"] == "audio":
+                    audio.extend(chunk["data"])
+                    if queue is not None:
+                        await queue.put(chunk["data"])
+                elif chunk["type"] == "WordBoundary":
+                    start = chunk["offset"] / TICKS_PER_SECOND
+                    end = start + chunk["duration"] / TICKS_PER_SECOND
+                    words.append({"text": chunk["text"], "start": round(start, 3), "end": round(end, 3)})
+        finally:
+            if queue is not None:
+                await queue.put(_DONE)
+        return bytes(audio), words
+
+    def is_cached(self, text: str, lang: str = "fr", voice: Optional[str] = None) -> bool:
+        voice = resolve_voice(lang, voice)
+        return all(
+            os.path.exists(self.cache.path(self.cache.key(s, voice, self.rate, lang)))
+            for s in split_sentences(text)
+        )
+
+    async def stream(self, text: str, lang: str = "fr", voice: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        Itère les morceaux MP3 dans l'ordre du texte. Phrases en cache lues
+        depuis le disque; les autres synthétisées en parallèle (au plus
+        `lookahead` d'avance) et enregistrées dans le cache.
+        """
+        voice = resolve_voice(lang, voice)
+        sentences = split_sentences(text)
+        keys = [self.cache.key(s, voice, self.rate, lang) for s in sentences]
+        cached = {i: self.cache.get(key) for i, key in enumerate(keys)}
+        queues: Dict[int, asyncio.Queue] = {}
+        tasks: Dict[int, asyncio.Task] = {}
+
+        def start(j: int):
+            if j not in tasks:
+                queues[j] = asyncio.Queue()
+                tasks[j] = asyncio.create_task(self._synthesize_sentence(sentences[j], voice, self.rate, queues[j]))
+
+        try:
+            for i, key in enumerate(keys):
+                # Look-ahead: les phrases suivantes non cachées démarrent déjà
+                for j in range(i, min(len(keys), i + 1 + self.lookahead)):
+                    if cached[j] is None:
+                        start(j)
+
+                if i not in tasks:
+                    try:
+                        with open(cached[i], "rb") as f:
+                            while True:
+                                block = f.read(READ_CHUNK)
+                                if not block:
+                                    break
+                                yield block
+                        continue
+                    except FileNotFoundError:
+                        start(i)  # Évincée entre-temps: on la resynthétise
+
+                while True:
+                    chunk = await queues[i].get()
+                    if chunk is _DONE:
+                        break
+                    yield chunk
+                audio, words = await tasks.pop(i)  # Relance l'erreur éventuelle d'edge-tts
+                queues.pop(i)
+                self.cache.put(key, audio, words)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    async def synthesize_timed(
+        self,
+        text: str,
+        lang: str = "fr",
+        voice: Optional[str] = None,
+        rate: Optional[str] = None,
+        concurrency: Optional[int] = None,
+    ) -> Optional[SpeechResult]:
+        """
+        Audio complet et timings mot à mot (None si la synthèse échoue).
+
+        Phrases synthétisées en parallèle (au plus `concurrency` à la fois) ou
+        lues depuis le cache, puis recollées dans l'ordre: les trames MP3 sont
+        concaténées telles quelles et les timings décalés de la durée des
+        phrases précédentes.
+        """
+        voice = resolve_voice(lang, voice)
+        rate = rate or self.rate
+        sentences = split_sentences(text)
+        if not sentences:
+            return None
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def sentence_audio(sentence: str) -> Tuple[bytes, List[Dict[str, Any]]]:
+            key = self.cache.key(sentence, voice, rate, lang)
+            path, words = self.cache.get(key), self.cache.get_words(key)
+            if path and words is not None:
+                try:
+                    with open(path, "rb") as f:
+                        return f.read(), words
+                except FileNotFoundError:
+                    pass  # Évincée entre-temps
+            async with semaphore:
+                audio, words = await self._synthesize_sentence(sentence, voice, rate)
+            self.cache.put(key, audio, words)
+            return audio, words
+
+        try:
+            parts = await asyncio.gather(*(sentence_audio(s) for s in sentences))
+        except Exception as e:
+            logger.error(f"❌ TTS synthesis failed: {e}")
+            return None
+
+        audio = bytearray()
+        words: List[Dict[str, Any]] = []
+        for part, part_words in parts:
+            offset = len(audio) / MP3_BYTES_PER_SECOND
+            words.extend(
+                {"text": w["text"], "start": round(w["start"] + offset, 3), "end": round(w["end"] + offset, 3)}
+                for w in part_words
+            )
+            audio.extend(part)
+        if not audio:
+            return None
+        return SpeechResult(bytes(audio), words, round(len(audio) / MP3_BYTES_PER_SECOND, 3))
+
+    async def synthesize(self, text: str, lang: str = "fr", voice: Optional[str] = None) -> Optional[bytes]:
+        """Audio MP3 complet (None si la synthèse échoue)."""
+        result = await self.synthesize_timed(text, lang, voice)
+        return result.audio if result else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cache": self.cache.stats(),
+            "rate": self.rate,
+            "lookahead": self.lookahead,
+            "concurrency": self.concurrency,
+        }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SOUS-TITRES (depuis les timings mot à mot)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def subtitle_cues(
+    words: List[Dict[str, Any]], max_chars: int = 42, max_duration: float = 5.0, max_gap: float = 0.8
+) -> List[Tuple[float, float, str]]:
+    """
+    Regroupe les mots en sous-titres (début, fin, texte): nouveau sous-titre
+    au-delà de `max_chars` caractères, `max_duration` secondes ou après une
+    pause de plus de `max_gap` secondes.
+    """
+    cues: List[Tuple[float, float, str]] = []
+    line: List[Dict[str, Any]] = []
+    for word in words:
+        if line and (
+            len(" ".join(w["text"] for w in line)) + 1 + len(word["text"]) > max_chars
+            or word["end"] - line[0]["start"] > max_duration
+            or word["start"] - line[-1]["end"] > max_gap
+        ):
+            cues.append((line[0]["start"], line[-1]["end"], " ".join(w["text"] for w in line)))
+            line = []
+        line.append(word)
+    if line:
+        cues.append((line[0]["start"], line[-1]["end"], " ".join(w["text"] for w in line)))
+    return cues
+
+
+def _srt_time(seconds: float) -> str:
+    ms = int(round(seconds * 1000))
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+
+def format_srt(cues: List[Tuple[float, float, str]]) -> str:
+    """Sous-titres au format SRT."""
+    return "\n".join(
+        f"{i}\n{_srt_time(start)} --> {_srt_time(end)}\n{text}\n"
+        for i, (start, end, text) in enumerate(cues, 1)
+    )
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# STT (Whisper via Groq ou OpenAI)
+# ══════════════════════════════════════════════════════════════════════════════
+
+STT_PROVIDERS = [
+    ("GROQ_API_KEY", "https://api.groq.com/openai/v1/audio/transcriptions", "whisper-large-v3"),
+    ("OPENAI_API_KEY", "https://api.openai.com/v1/audio/transcriptions", "whisper-1"),
+]
+
+
+class STTService:
+    """Transcription audio → texte, premier provider Whisper configuré."""
+
+    async def transcribe(self, audio: bytes, lang: Optional[str] = None, prompt: Optional[str] = None) -> Optional[str]:
+        for env_key, url, model in STT_PROVIDERS:
+            api_key = os.getenv(env_key)
+            if not api_key:
+                continue
+            data = {"model": model, "response_format": "json"}
+            if lang:
+                data["language"] = lang
+            if prompt:
+                data["prompt"] = prompt
+            try:
+                async with httpx.AsyncClient(timeout=60.0) as client:
+                    response = await client.post(
+                        url,
+                        headers={"Authorization": f"Bearer {api_key}"},
+                        data=data,
+                        files={"file": ("audio.webm", audio)},
+                    )
+                if response.status_code == 200:
+                    return response.json().get("text", "").strip()
+                logger.warning(f"⚠️ {model} transcription returned {response.status_code}")
+            except Exception as e:
+                logger.warning(f"⚠️ {model} transcription failed: {e}")
+        return None
+
+
+# Singleton instances
+tts_service = TTSService()
+stt_service = STTService()
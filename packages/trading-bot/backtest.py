@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+"""
+🔁 BACKTESTER - Rejeu de bars historiques
+==========================================
+Rejoue des fichiers de bars à travers les classes du bot live
+(MomentumStrategy / RSIStrategy, IndicatorEngine, RiskManager); les
+ordres sont exécutés par un broker simulé vectorisé (pas d'AlpacaClient).
+
+Données: un fichier par symbole (AAPL.csv, MSFT.parquet, ...) avec les
+colonnes t, o, h, l, c (ou timestamp, open, high, low, close). Chaque
+fichier est converti une fois en .npy puis lu en memory-map.
+
+    python backtest.py data/
+    python backtest.py data/ --strategy rsi --grid period=7,14 oversold=25,30
+    python backtest.py --synthetic 200 --bars 2000 --grid lookback=10,20,30
+
+Chaque combinaison de paramètres × groupe de symboles (--chunk) est un
+portefeuille indépendant, exécuté dans un process pool.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from bot import STRATEGIES, RiskManager, TradingConfig, TradingSignal
+from indicators import IndicatorEngine
+
+logger = logging.getLogger("Backtest")
+
+BAR_COLUMNS = ("t", "o", "h", "l", "c")
+COLUMN_ALIASES = {
+    "t": ("t", "timestamp", "time", "date"),
+    "o": ("o", "open"),
+    "h": ("h", "high"),
+    "l": ("l", "low"),
+    "c": ("c", "close"),
+}
+SOURCE_SUFFIXES = (".csv", ".parquet")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DONNÉES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _parse_time(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def _resolve_columns(names: List[str]) -> Dict[str, str]:
+    lowered = {name.lower().strip(): name for name in names}
+    out = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        match = next((lowered[a] for a in aliases if a in lowered), None)
+        if match is None:
+            raise ValueError(f"Missing column '{column}' (got {names})")
+        out[column] = match
+    return out
+
+
+def _read_csv(path: Path) -> np.ndarray:
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        columns = _resolve_columns(reader.fieldnames or [])
+        rows = [
+            [_parse_time(row[columns["t"]])] + [float(row[columns[c]]) for c in BAR_COLUMNS[1:]]
+            for row in reader
+        ]
+    return np.array(rows, dtype=np.float64).reshape(-1, len(BAR_COLUMNS))
+
+
+def _read_parquet(path: Path) -> np.ndarray:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError(f"pyarrow is required to read {path.name}")
+    table = pq.read_table(path, memory_map=True)
+    columns = _resolve_columns(table.column_names)
+    times = table.column(columns["t"]).to_pylist()
+    out = np.empty((table.num_rows, len(BAR_COLUMNS)), dtype=np.float64)
+    out[:, 0] = [t.timestamp() if hasattr(t, "timestamp") else _parse_time(t) for t in times]
+    for i, column in enumerate(BAR_COLUMNS[1:], start=1):
+        out[:, i] = table.column(columns[column]).to_numpy()
+    return out
+
+
+def load_bars(path: Path) -> np.ndarray:
+    """Bars (t, o, h, l, c) d'un fichier, via un cache .npy memory-mappé."""
+    path = Path(path)
+    cache = path if path.suffix == ".npy" else path.with_suffix(".npy")
+    if cache != path and (not cache.exists() or cache.stat().st_mtime < path.stat().st_mtime):
+        data = _read_parquet(path) if path.suffix == ".parquet" else _read_csv(path)
+        data = data[np.argsort(data[:, 0], kind="stable")]
+        np.save(cache, data)
+    return np.load(cache, mmap_mode="r")
+
+
+def discover(data_dir: Path) -> Dict[str, Path]:
+    """Un fichier par symbole; la source (CSV/Parquet) prime sur son cache .npy."""
+    found: Dict[str, Path] = {}
+    for path in sorted(Path(data_dir).iterdir()):
+        symbol = path.stem.upper()
+        if path.suffix in SOURCE_SUFFIXES:
+            found[symbol] = path
+        elif path.suffix == ".npy" and symbol not in found and not any(
+            path.with_suffix(s).exists() for s in SOURCE_SUFFIXES
+        ):
+            found[symbol] = path
+    return found
+
+
+def write_synthetic(data_dir: Path, symbols: int, bars: int, seed: int = 7) -> Dict[str, Path]:
+    """Génère des marches aléatoires en CSV (données de bench)."""
+    rng = np.random.default_rng(seed)
+    start = datetime(2020, 1, 1).timestamp()
+    paths = {}
+    for i in range(symbols):
+        closes = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.02, bars)))
+        opens = np.concatenate([[closes[0]], closes[:-1]])
+        spread = np.abs(rng.normal(0, 0.01, bars)) * closes
+        path = Path(data_dir) / f"SYN{i:04d}.csv"
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(BAR_COLUMNS)
+            for j in range(bars):
+                high = max(opens[j], closes[j]) + spread[j]
+                low = min(opens[j], closes[j]) - spread[j]
+                writer.writerow([int(start + j * 86400), f"{opens[j]:.4f}", f"{high:.4f}", f"{low:.4f}", f"{closes[j]:.4f}"])
+        paths[path.stem.upper()] = path
+    return paths
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BROKER SIMULÉ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class SimulatedBroker:
+    """
+    Positions, ordres bracket et capital en mémoire (un tableau par champ).
+    Les ordres market sont exécutés au prix fourni (clôture de la bar du signal),
+    les stop-loss / take-profit sur le low / high des bars suivantes.
+    """
+
+    def __init__(self, symbols: List[str], cash: float):
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        n = len(self.symbols)
+        self.cash = float(cash)
+        self.qty = np.zeros(n, dtype=np.int64)
+        self.entry = np.zeros(n)
+        self.stop = np.zeros(n)
+        self.take = np.zeros(n)
+        self.last_price = np.zeros(n)
+        self.trades = 0
+        self.wins = 0
+        self.orders = 0
+
+    @property
+    def equity(self) -> float:
+        return self.cash + float(np.dot(self.qty, self.last_price))
+
+    @property
+    def open_positions(self) -> int:
+        return int(np.count_nonzero(self.qty))
+
+    def mark(self, rows: np.ndarray, prices: np.ndarray):
+        self.last_price[rows] = prices
+
+    def buy(self, row: int, qty: int, price: float, stop_loss: Optional[float] = None, take_profit: Optional[float] = None) -> bool:
+        cost = qty * price
+        if qty <= 0 or cost > self.cash:
+            return False
+        self.cash -= cost
+        self.qty[row] = qty
+        self.entry[row] = price
+        self.stop[row] = stop_loss or 0.0
+        self.take[row] = take_profit or np.inf
+        self.last_price[row] = price
+        self.orders += 1
+        return True
+
+    def sell(self, row: int, price: float) -> bool:
+        qty = int(self.qty[row])
+        if qty == 0:
+            return False
+        self.cash += qty * price
+        self.trades += 1
+        self.wins += price > self.entry[row]
+        self.qty[row] = 0
+        self.last_price[row] = price
+        return True
+
+    def check_brackets(self, rows: np.ndarray, opens: np.ndarray, highs: np.ndarray, lows: np.ndarray):
+        """Déclenche les stop-loss / take-profit touchés par les bars courantes."""
+        held = self.qty[rows] > 0
+        if not held.any():
+            return
+        rows, opens, highs, lows = rows[held], opens[held], highs[held], lows[held]
+        stop_hit = lows <= self.stop[rows]
+        take_hit = (highs >= self.take[rows]) & ~stop_hit  # Stop prioritaire (prudent)
+        # Gap: exécution à l'ouverture si elle dépasse déjà le niveau
+        for row, price in zip(rows[stop_hit], np.minimum(opens, self.stop[rows])[stop_hit]):
+            self.sell(int(row), float(price))
+        for row, price in zip(rows[take_hit], np.maximum(opens, self.take[rows])[take_hit]):
+            self.sell(int(row), float(price))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REJEU
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _align(data: List[np.ndarray]):
+    """Aligne les symboles sur l'union des timestamps (NaN quand pas de bar)."""
+    times = np.unique(np.concatenate([d[:, 0] for d in data]))
+    grid = np.full((4, len(times), len(data)), np.nan)
+    for row, d in enumerate(data):
+        steps = np.searchsorted(times, d[:, 0])
+        grid[:, steps, row] = d[:, 1:5].T
+    return times, grid
+
+
+def run_backtest(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Rejoue un portefeuille (groupe de symboles × jeu de paramètres)."""
+    if not task.get("verbose"):
+        logging.getLogger("TradingBot").setLevel(logging.CRITICAL)
+    start = time.perf_counter()
+
+    symbols = list(task["paths"])
+    data = [load_bars(task["paths"][s]) for s in symbols]
+    times, (opens, highs, lows, closes) = _align(data)
+
+    config = TradingConfig(strategy=task["strategy"], symbols=symbols, **task["config"])
+    strategy = STRATEGIES[task["strategy"]](**task["params"])
+    risk = RiskManager(config)
+    risk.initial_equity = risk.daily_start_equity = task["equity"]
+
+    engine = IndicatorEngine(symbols, **strategy.indicator_params())
+    broker = SimulatedBroker(symbols, task["equity"])
+    order = {s: i for i, s in enumerate(symbols)}
+
+    peak = task["equity"]
+    max_drawdown = 0.0
+    present = ~np.isnan(closes)
+
+    for step in range(len(times)):
+        rows = np.flatnonzero(present[step])
+        c = closes[step, rows]
+        broker.check_brackets(rows, opens[step, rows], highs[step, rows], lows[step, rows])
+        engine.update(rows, c, highs[step, rows], lows[step, rows])
+        broker.mark(rows, c)
+
+        equity = broker.equity
+        peak = max(peak, equity)
+        max_drawdown = max(max_drawdown, (peak - equity) / peak)
+
+        # Mêmes règles que RiskManager.check_can_trade
+        if risk.trading_halted or not risk.check_equity(equity):
+            continue
+        if broker.open_positions >= config.max_positions:
+            continue
+
+        for symbol, signal in sorted(strategy.signals(engine).items(), key=lambda item: order[item[0]]):
+            row = order[symbol]
+            if not present[step, row]:
+                continue  # Pas de bar ce pas-ci: pas d'ordre sur un prix périmé
+            price = float(closes[step, row])
+            if signal == TradingSignal.BUY and broker.qty[row] == 0:
+                if broker.open_positions >= config.max_positions:
+                    continue
+                broker.buy(
+                    row,
+                    risk.calculate_position_size(equity, price),
+                    price,
+                    risk.calculate_stop_loss(price, "buy"),
+                    risk.calculate_take_profit(price, "buy"),
+                )
+            elif signal == TradingSignal.SELL and broker.qty[row] > 0:
+                broker.sell(row, price)
+
+    elapsed = time.perf_counter() - start
+    bars = int(present.sum())
+    final = broker.equity
+    return {
+        "strategy": task["strategy"],
+        "params": {**task["params"], **task["config"]},
+        "symbols": len(symbols),
+        "bars": bars,
+        "orders": broker.orders,
+        "trades": broker.trades,
+        "win_rate": round(broker.wins / broker.trades, 3) if broker.trades else None,
+        "return_pct": round((final - task["equity"]) / task["equity"] * 100, 2),
+        "max_drawdown_pct": round(max_drawdown * 100, 2),
+        "halted": risk.halt_reason or None,
+        "elapsed_s": round(elapsed, 3),
+        "bars_per_sec": round(bars / elapsed) if elapsed else None,
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _parse_value(value: str):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def parse_grid(specs: List[str]) -> Dict[str, List[Any]]:
+    """["lookback=10,20", "stop_loss_pct=0.02,0.03"] → {"lookback": [10, 20], ...}"""
+    grid = {}
+    for spec in specs:
+        key, _, values = spec.partition("=")
+        grid[key.strip()] = [_parse_value(v.strip()) for v in values.split(",") if v.strip()]
+    return grid
+
+
+def build_tasks(paths: Dict[str, Path], strategy: str, grid: Dict[str, List[Any]], chunk: int,
+                equity: float, verbose: bool = False) -> List[Dict[str, Any]]:
+    config_fields = {f.name for f in fields(TradingConfig)}
+    symbols = list(paths)
+    chunk = chunk or len(symbols)
+    groups = [symbols[i:i + chunk] for i in range(0, len(symbols), chunk)]
+    tasks = []
+    for combo in itertools.product(*grid.values()) if grid else [()]:
+        values = dict(zip(grid.keys(), combo))
+        for group in groups:
+            tasks.append({
+                "paths": {s: str(paths[s]) for s in group},
+                "strategy": strategy,
+                "params": {k: v for k, v in values.items() if k not in config_fields},
+                "config": {k: v for k, v in values.items() if k in config_fields},
+                "equity": equity,
+                "verbose": verbose,
+            })
+    return tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the trading bot strategies on stored bars")
+    parser.add_argument("data_dir", nargs="?", help="Dossier de fichiers de bars (SYMBOL.csv / .parquet / .npy)")
+    parser.add_argument("--strategy", default="momentum", choices=sorted(STRATEGIES))
+    parser.add_argument("--grid", nargs="*", default=[], help="Paramètres à balayer: lookback=10,20 stop_loss_pct=0.02,0.03")
+    parser.add_argument("--chunk", type=int, default=0, help="Symboles par portefeuille (défaut: tous)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Process du pool")
+    parser.add_argument("--equity", type=float, default=100000.0)
+    parser.add_argument("--synthetic", type=int, default=0, help="Génère N symboles aléatoires au lieu de lire data_dir")
+    parser.add_argument("--bars", type=int, default=2000, help="Bars par symbole synthétique")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)-7s | %(message)s')
+
+    if args.synthetic:
+        data_dir = Path(args.data_dir or tempfile.mkdtemp(prefix="backtest-"))
+        data_dir.mkdir(parents=True, exist_ok=True)
+        paths = write_synthetic(data_dir, args.synthetic, args.bars)
+        logger.info(f"🎲 {len(paths)} synthetic symbols written to {data_dir}")
+    elif args.data_dir:
+        paths = discover(Path(args.data_dir))
+    else:
+        parser.error("data_dir or --synthetic is required")
+    if not paths:
+        parser.error("no bar files found")
+
+    # Conversion CSV/Parquet → .npy une fois, avant de lancer les workers
+    for path in paths.values():
+        load_bars(path)
+
+    tasks = build_tasks(paths, args.strategy, parse_grid(args.grid), args.chunk, args.equity, args.verbose)
+    workers = max(1, min(args.workers or 1, len(tasks)))
+    logger.info(f"🔁 {len(tasks)} backtests ({len(paths)} symbols) on {workers} workers")
+
+    start = time.perf_counter()
+    results = []
+    if workers == 1:
+        results = [run_backtest(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(run_backtest, task) for task in tasks]):
+                results.append(future.result())
+    wall = time.perf_counter() - start
+    total_bars = sum(r["bars"] for r in results)
+
+    results.sort(key=lambda r: r["return_pct"], reverse=True)
+    summary = {
+        "backtests": len(results),
+        "workers": workers,
+        "bars": total_bars,
+        "wall_s": round(wall, 3),
+        "bars_per_sec": round(total_bars / wall) if wall else None,
+    }
+
+    if args.json:
+        print(json.dumps({"summary": summary, "results": results}, indent=2))
+        return
+
+    print(f"\n{'return %':>9} {'max dd %':>9} {'trades':>7} {'win':>6}  params")
+    for r in results:
+        win = f"{r['win_rate']:.0%}" if r["win_rate"] is not None else "-"
+        params = ", ".join(f"{k}={v}" for k, v in r["params"].items()) or "(defaults)"
+        print(f"{r['return_pct']:>9.2f} {r['max_drawdown_pct']:>9.2f} {r['trades']:>7} {win:>6}  {params} [{r['symbols']} symbols]")
+    print(f"\n⚡ {total_bars:,} bars in {wall:.2f}s on {workers} workers → {summary['bars_per_sec']:,} bars/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,17 +8,24 @@ Bot de trading automatisé avec gestion du risque.
 """
 
 import os
+import math
+import time
 import asyncio
 import logging
+from collections import deque, defaultdict
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Any
 from enum import Enum
 import httpx
+import numpy as np
 from threading import Thread
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import json
 
+from indicators import IndicatorEngine
+from stream import BarStream, StreamError
+
 # Configuration logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +35,62 @@ logging.basicConfig(
 logger = logging.getLogger("TradingBot")
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# TICK METRICS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TickMetrics:
+    """Durées des ticks de trading (lues par le health server)."""
+    
+    def __init__(self, window: int = 100):
+        self.durations: deque = deque(maxlen=window)   # (fetch_ms, analyze_ms, total_ms)
+        self.ticks = 0
+        self.errors = 0
+        self.last_tick: Optional[str] = None
+        self.last_symbols = 0
+        self.rest_calls: Dict[str, int] = defaultdict(int)   # Appels REST broker par ressource
+        self.cache_hits: Dict[str, int] = defaultdict(int)   # Lectures servies par l'état local
+    
+    def record(self, fetch_ms: float, analyze_ms: float, symbols: int):
+        self.durations.append((fetch_ms, analyze_ms, fetch_ms + analyze_ms))
+        self.ticks += 1
+        self.last_symbols = symbols
+        self.last_tick = datetime.utcnow().isoformat()
+    
+    def record_error(self):
+        self.errors += 1
+    
+    def record_call(self, resource: str, cached: bool):
+        (self.cache_hits if cached else self.rest_calls)[resource] += 1
+    
+    @staticmethod
+    def _pct(values: List[float], pct: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+    
+    def summary(self) -> Dict[str, Any]:
+        totals = [d[2] for d in self.durations]
+        return {
+            "ticks": self.ticks,
+            "errors": self.errors,
+            "last_tick": self.last_tick,
+            "symbols": self.last_symbols,
+            "last_ms": round(totals[-1]) if totals else None,
+            "p50_ms": round(self._pct(totals, 50)),
+            "p95_ms": round(self._pct(totals, 95)),
+            "max_ms": round(max(totals)) if totals else None,
+            "fetch_p50_ms": round(self._pct([d[0] for d in self.durations], 50)),
+            "analyze_p50_ms": round(self._pct([d[1] for d in self.durations], 50)),
+            "rest_calls": dict(self.rest_calls),
+            "cache_hits": dict(self.cache_hits),
+        }
+
+
+tick_metrics = TickMetrics()
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # HEALTH CHECK SERVER (pour Fly.io)
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -35,18 +98,27 @@ logger = logging.getLogger("TradingBot")
 class HealthHandler(BaseHTTPRequestHandler):
     """Handler pour le health check."""
     
+    def _send_json(self, payload: Dict):
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(payload).encode())
+    
     def do_GET(self):
         if self.path == '/health' or self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
             status = {
                 "status": "healthy",
                 "bot": "trading-bot-nasdaq",
                 "mode": "paper" if "paper" in os.getenv("ALPACA_BASE_URL", "") else "live",
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow().isoformat(),
+                "tick": tick_metrics.summary()
             }
-            self.wfile.write(json.dumps(status).encode())
+            self._send_json(status)
+        elif self.path == '/metrics':
+            self._send_json({
+                **tick_metrics.summary(),
+                "recent_ms": [round(d[2]) for d in tick_metrics.durations]
+            })
         else:
             self.send_response(404)
             self.end_headers()
@@ -97,9 +169,24 @@ class TradingConfig:
     # Strategy
     strategy: str = "momentum"  # momentum, mean_reversion, rsi
     
+    # Market data
+    bars_timeframe: str = "1Day"
+    bars_limit: int = 50                # Bars par symbole
+    symbols_per_request: int = 100      # Symboles par requête multi-bars
+    data_concurrency: int = 8           # Requêtes data simultanées max
+    
+    # État broker local (compte, positions, ordres)
+    state_ttl: float = 15.0             # Secondes avant de relire compte/positions
+    reconcile_interval: float = 30.0    # Réconciliation complète en tâche de fond
+    
     # Mode
     paper_trading: bool = True  # ALWAYS START WITH PAPER!
     
+    # Boucle: "poll" (toutes les 60s) ou "stream" (websocket, repli sur poll)
+    mode: str = field(default_factory=lambda: os.getenv("TRADING_MODE", "poll"))
+    stream_url: str = field(default_factory=lambda: os.getenv("ALPACA_STREAM_URL", "wss://stream.data.alpaca.markets/v2/iex"))
+    stream_timeframe: str = "1Min"      # Bars poussées par le flux
+    
     def validate(self) -> bool:
         """Valide la configuration."""
         if not self.alpaca_api_key or not self.alpaca_secret:
@@ -114,6 +201,13 @@ class TradingConfig:
 # ALPACA CLIENT
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Statuts d'un ordre pas encore exécuté ni annulé (https://alpaca.markets/docs/trading/orders/)
+OPEN_ORDER_STATUSES = {
+    "new", "accepted", "pending_new", "partially_filled", "accepted_for_bidding",
+    "pending_replace", "pending_cancel", "calculated", "held",
+}
+
+
 class AlpacaClient:
     """Client pour l'API Alpaca."""
     
@@ -126,24 +220,92 @@ class AlpacaClient:
         }
         self.base_url = config.alpaca_base_url
         self.data_url = "https://data.alpaca.markets"
+        
+        # État local: servi depuis la mémoire tant qu'il a moins de state_ttl secondes
+        self.account: Optional[Dict] = None
+        self.positions: Dict[str, Dict] = {}
+        self.orders: Dict[str, Dict] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
     
-    async def get_account(self) -> Dict:
-        """Récupère les infos du compte."""
-        response = await self.client.get(
-            f"{self.base_url}/v2/account",
-            headers=self.headers
-        )
+    def _fresh(self, resource: str) -> bool:
+        return time.monotonic() - self._fetched_at.get(resource, float("-inf")) < self.config.state_ttl
+    
+    def invalidate(self, *resources: str):
+        """Force la relecture des ressources au prochain accès."""
+        for resource in resources or ("account", "positions", "orders"):
+            self._fetched_at.pop(resource, None)
+    
+    async def _get_json(self, path: str, **params):
+        response = await self.client.get(f"{self.base_url}{path}", headers=self.headers, params=params or None)
         response.raise_for_status()
         return response.json()
     
-    async def get_positions(self) -> List[Dict]:
+    async def _cached(self, resource: str, fresh: bool, fetch):
+        """Lit une ressource depuis l'état local, ou la relit (un seul appel pour les lecteurs concurrents)."""
+        if not fresh and self._fresh(resource):
+            tick_metrics.record_call(resource, cached=True)
+            return
+        lock = self._locks.setdefault(resource, asyncio.Lock())
+        async with lock:
+            if not fresh and self._fresh(resource):
+                tick_metrics.record_call(resource, cached=True)
+                return
+            await fetch()
+            self._fetched_at[resource] = time.monotonic()
+            tick_metrics.record_call(resource, cached=False)
+    
+    async def get_account(self, fresh: bool = False) -> Dict:
+        """Récupère les infos du compte."""
+        async def fetch():
+            self.account = await self._get_json("/v2/account")
+        await self._cached("account", fresh, fetch)
+        return self.account
+    
+    async def get_positions(self, fresh: bool = False) -> List[Dict]:
         """Récupère les positions ouvertes."""
-        response = await self.client.get(
-            f"{self.base_url}/v2/positions",
-            headers=self.headers
+        async def fetch():
+            positions = {p["symbol"]: p for p in await self._get_json("/v2/positions")}
+            # Achat pas encore exécuté: la position locale reste tant que son ordre est ouvert
+            for symbol, position in self.positions.items():
+                if position.get("pending") and symbol not in positions and self.order_is_open(position.get("order_id")):
+                    positions[symbol] = position
+            self.positions = positions
+        await self._cached("positions", fresh, fetch)
+        return list(self.positions.values())
+    
+    async def get_orders(self, fresh: bool = False) -> List[Dict]:
+        """Récupère les ordres ouverts."""
+        async def fetch():
+            self.orders = {o["id"]: o for o in await self._get_json("/v2/orders", status="open", nested="true")}
+        await self._cached("orders", fresh, fetch)
+        return list(self.orders.values())
+    
+    def order_is_open(self, order_id: Optional[str]) -> bool:
+        order = self.orders.get(order_id) if order_id else None
+        return order is not None and order.get("status", "new") in OPEN_ORDER_STATUSES
+    
+    def open_order(self, symbol: str) -> Optional[Dict]:
+        """Ordre principal encore ouvert sur un symbole (les jambes bracket ne comptent pas)."""
+        return next(
+            (o for o in self.orders.values() if o.get("symbol") == symbol and o.get("status", "new") in OPEN_ORDER_STATUSES),
+            None
         )
-        response.raise_for_status()
-        return response.json()
+    
+    async def reconcile(self):
+        """Relit compte, positions et ordres ouverts (source de vérité: le broker)."""
+        # Ordres d'abord: les positions en attente d'exécution sont gardées d'après eux
+        await asyncio.gather(self.get_account(fresh=True), self.get_orders(fresh=True))
+        await self.get_positions(fresh=True)
+    
+    async def run_reconciliation(self, interval: float):
+        """Réconciliation périodique (fills de stop-loss / take-profit côté broker...)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.warning(f"⚠️ Reconciliation failed: {e}")
     
     async def get_quote(self, symbol: str) -> Dict:
         """Récupère le prix actuel."""
@@ -164,6 +326,32 @@ class AlpacaClient:
         response.raise_for_status()
         return response.json().get("bars", [])
     
+    async def get_multi_bars(self, symbols: List[str], timeframe: str = "1Day", limit: int = 50) -> Dict[str, List[Dict]]:
+        """Récupère l'historique de plusieurs symboles en une requête (paginée)."""
+        # Le `limit` de l'endpoint multi-symboles est global: on borne par date
+        # de début puis on garde les `limit` dernières bars de chaque symbole.
+        params = {
+            "symbols": ",".join(symbols),
+            "timeframe": timeframe,
+            "start": bars_start(timeframe, limit),
+            "limit": 10000,
+        }
+        bars: Dict[str, List[Dict]] = {symbol: [] for symbol in symbols}
+        while True:
+            response = await self.client.get(
+                f"{self.data_url}/v2/stocks/bars",
+                headers=self.headers,
+                params=params
+            )
+            response.raise_for_status()
+            data = response.json()
+            for symbol, symbol_bars in (data.get("bars") or {}).items():
+                bars.setdefault(symbol, []).extend(symbol_bars)
+            if not data.get("next_page_token"):
+                break
+            params["page_token"] = data["next_page_token"]
+        return {symbol: symbol_bars[-limit:] for symbol, symbol_bars in bars.items()}
+    
     async def place_order(
         self,
         symbol: str,
@@ -194,7 +382,21 @@ class AlpacaClient:
             json=order_data
         )
         response.raise_for_status()
-        return response.json()
+        order = response.json()
+        
+        # Mise à jour locale depuis la réponse: la position compte tout de suite
+        # (pas de double achat) et reste "pending" jusqu'à l'exécution ou
+        # l'annulation de l'ordre; les chiffres réels arrivent à la réconciliation
+        order_id = order.get("id", f"local-{len(self.orders)}")
+        self.orders[order_id] = order
+        if side == "buy" and symbol not in self.positions:
+            self.positions[symbol] = {
+                "symbol": symbol, "qty": str(qty), "side": "long", "pending": True, "order_id": order_id
+            }
+        elif side == "sell":
+            self.positions.pop(symbol, None)
+        self.invalidate("account")
+        return order
     
     async def close_position(self, symbol: str) -> Dict:
         """Ferme une position."""
@@ -203,12 +405,105 @@ class AlpacaClient:
             headers=self.headers
         )
         response.raise_for_status()
-        return response.json()
+        order = response.json()
+        
+        self.positions.pop(symbol, None)
+        if order.get("id"):
+            self.orders[order["id"]] = order
+        self.invalidate("account")
+        return order
     
     async def close(self):
         await self.client.aclose()
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# MARKET DATA
+# ═══════════════════════════════════════════════════════════════════════════════
+
+TIMEFRAME_MINUTES = {"Min": 1, "T": 1, "Hour": 60, "H": 60, "Day": 390, "D": 390, "Week": 1950, "W": 1950}
+
+
+def bars_start(timeframe: str, limit: int) -> str:
+    """Date de début (RFC3339) couvrant `limit` bars de marché, week-ends et fériés inclus."""
+    amount = int("".join(c for c in timeframe if c.isdigit()) or 1)
+    unit = timeframe.lstrip("0123456789")
+    minutes = amount * TIMEFRAME_MINUTES.get(unit, 390) * limit
+    trading_days = minutes / 390  # 6h30 de séance
+    calendar_days = math.ceil(trading_days * 7 / 5 * 1.2) + 4
+    return (datetime.utcnow() - timedelta(days=calendar_days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass
+class MarketSnapshot:
+    """Vue cohérente du marché et du compte pour un tick."""
+    
+    account: Dict
+    positions: Dict[str, Dict]          # Par symbole
+    bars: Dict[str, List[Dict]]         # Par symbole
+    fetched_at: datetime = field(default_factory=datetime.utcnow)
+    fetch_ms: float = 0.0
+    
+    @property
+    def equity(self) -> float:
+        return float(self.account["equity"])
+    
+    def has_position(self, symbol: str) -> bool:
+        return symbol in self.positions
+
+
+class MarketDataFeed:
+    """Récupère bars, positions et compte en parallèle, une fois par tick."""
+    
+    def __init__(self, client: AlpacaClient, config: TradingConfig):
+        self.client = client
+        self.config = config
+        self._semaphore = asyncio.Semaphore(config.data_concurrency)
+    
+    async def _fetch_chunk(self, symbols: List[str], timeframe: str) -> Dict[str, List[Dict]]:
+        async with self._semaphore:
+            try:
+                return await self.client.get_multi_bars(symbols, timeframe, self.config.bars_limit)
+            except Exception as e:
+                logger.warning(f"⚠️ Multi-bars failed ({e}), falling back to per-symbol fetch")
+        
+        async def one(symbol: str):
+            async with self._semaphore:
+                try:
+                    return symbol, await self.client.get_bars(symbol, timeframe, self.config.bars_limit)
+                except Exception as e:
+                    logger.error(f"❌ Bars error {symbol}: {e}")
+                    return symbol, []
+        
+        return dict(await asyncio.gather(*(one(symbol) for symbol in symbols)))
+    
+    async def fetch_bars(self, symbols: List[str], timeframe: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """Bars de tous les symboles (requêtes multi-symboles, concurrence bornée)."""
+        timeframe = timeframe or self.config.bars_timeframe
+        size = max(1, self.config.symbols_per_request)
+        chunks = [symbols[i:i + size] for i in range(0, len(symbols), size)]
+        bars: Dict[str, List[Dict]] = {}
+        for result in await asyncio.gather(*(self._fetch_chunk(chunk, timeframe) for chunk in chunks)):
+            bars.update(result)
+        return bars
+    
+    async def snapshot(self, symbols: List[str], timeframe: Optional[str] = None) -> MarketSnapshot:
+        """Compte, positions et bars récupérés en parallèle."""
+        start = time.perf_counter()
+        account, positions, _, bars = await asyncio.gather(
+            self.client.get_account(),
+            self.client.get_positions(),
+            self.client.get_orders(),
+            self.fetch_bars(symbols, timeframe),
+        )
+        return MarketSnapshot(
+            account=account,
+            positions={p["symbol"]: p for p in positions},
+            bars=bars,
+            fetch_ms=(time.perf_counter() - start) * 1000,
+        )
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # RISK MANAGER
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -225,20 +520,31 @@ class RiskManager:
     
     async def initialize(self, client: AlpacaClient):
         """Initialise avec le capital actuel."""
-        account = await client.get_account()
+        account = await client.get_account(fresh=True)
         self.initial_equity = float(account["equity"])
         self.daily_start_equity = self.initial_equity
         logger.info(f"💰 Capital initial: ${self.initial_equity:,.2f}")
     
-    async def check_can_trade(self, client: AlpacaClient) -> bool:
+    async def check_can_trade(self, client: AlpacaClient, snapshot: Optional[MarketSnapshot] = None) -> bool:
         """Vérifie si on peut trader (risk checks)."""
         if self.trading_halted:
             logger.warning(f"🛑 Trading halté: {self.halt_reason}")
             return False
         
-        account = await client.get_account()
-        current_equity = float(account["equity"])
+        account = snapshot.account if snapshot else await client.get_account()
+        if not self.check_equity(float(account["equity"])):
+            return False
         
+        # Check nombre de positions
+        positions = snapshot.positions if snapshot else await client.get_positions()
+        if len(positions) >= self.config.max_positions:
+            logger.info(f"⏸️ Max positions atteint ({self.config.max_positions})")
+            return False
+        
+        return True
+    
+    def check_equity(self, current_equity: float) -> bool:
+        """Règles de perte (journalière, totale) - halte le trading si dépassées."""
         # Check perte journalière
         daily_loss = (self.daily_start_equity - current_equity) / self.daily_start_equity
         if daily_loss > self.config.max_daily_loss_pct:
@@ -255,12 +561,6 @@ class RiskManager:
             logger.error(f"🛑 {self.halt_reason}")
             return False
         
-        # Check nombre de positions
-        positions = await client.get_positions()
-        if len(positions) >= self.config.max_positions:
-            logger.info(f"⏸️ Max positions atteint ({self.config.max_positions})")
-            return False
-        
         return True
     
     def calculate_position_size(self, equity: float, price: float) -> int:
@@ -294,6 +594,16 @@ class TradingSignal(Enum):
     HOLD = "hold"
 
 
+def signals_from_masks(engine: IndicatorEngine, buy: np.ndarray, sell: np.ndarray) -> Dict[str, TradingSignal]:
+    """Convertit des masques BUY/SELL (un booléen par symbole) en signaux non-HOLD."""
+    out = {}
+    for row in np.flatnonzero(buy):
+        out[engine.symbols[row]] = TradingSignal.BUY
+    for row in np.flatnonzero(sell & ~buy):
+        out[engine.symbols[row]] = TradingSignal.SELL
+    return out
+
+
 class MomentumStrategy:
     """Stratégie momentum simple."""
     
@@ -318,6 +628,14 @@ class MomentumStrategy:
         elif momentum < -0.05:  # -5% sur la période
             return TradingSignal.SELL
         return TradingSignal.HOLD
+    
+    def indicator_params(self) -> Dict:
+        return {"momentum_lookback": self.lookback}
+    
+    def signals(self, engine: IndicatorEngine) -> Dict[str, TradingSignal]:
+        """Signaux de tous les symboles depuis le moteur d'indicateurs (vectorisé)."""
+        momentum = engine.momentum()
+        return signals_from_masks(engine, momentum > 0.05, momentum < -0.05)
 
 
 class RSIStrategy:
@@ -356,6 +674,20 @@ class RSIStrategy:
         elif rsi > self.overbought:
             return TradingSignal.SELL
         return TradingSignal.HOLD
+    
+    def indicator_params(self) -> Dict:
+        return {"rsi_period": self.period}
+    
+    def signals(self, engine: IndicatorEngine) -> Dict[str, TradingSignal]:
+        """Signaux de tous les symboles depuis le RSI Wilder incrémental (vectorisé)."""
+        rsi = engine.rsi()
+        return signals_from_masks(engine, rsi < self.oversold, rsi > self.overbought)
+
+
+STRATEGIES = {
+    "momentum": MomentumStrategy,
+    "rsi": RSIStrategy,
+}
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -368,15 +700,17 @@ class TradingBot:
     def __init__(self, config: TradingConfig):
         self.config = config
         self.client = AlpacaClient(config)
+        self.market_data = MarketDataFeed(self.client, config)
         self.risk_manager = RiskManager(config)
         
         # Sélection de la stratégie
-        if config.strategy == "momentum":
-            self.strategy = MomentumStrategy()
-        elif config.strategy == "rsi":
-            self.strategy = RSIStrategy()
-        else:
-            self.strategy = MomentumStrategy()
+        self.strategy = STRATEGIES.get(config.strategy, MomentumStrategy)()
+        
+        # Indicateurs incrémentaux de tous les symboles
+        self.indicators = IndicatorEngine(config.symbols, **self.strategy.indicator_params())
+        
+        # Mode stream: dernières bars reçues par symbole
+        self.recent_bars: Dict[str, deque] = defaultdict(lambda: deque(maxlen=config.bars_limit))
         
         self.running = False
     
@@ -391,67 +725,188 @@ class TradingBot:
         logger.info("📈 TRADING BOT STARTED")
         logger.info(f"   Mode: {'PAPER' if self.config.paper_trading else 'LIVE'}")
         logger.info(f"   Strategy: {self.config.strategy}")
+        logger.info(f"   Loop: {self.config.mode}")
         logger.info(f"   Symbols: {len(self.config.symbols)}")
         logger.info(f"   Max position: {self.config.max_position_pct*100}%")
         logger.info(f"   Stop-loss: {self.config.stop_loss_pct*100}%")
         logger.info("=" * 60)
         
         self.running = True
+        reconcile_task = asyncio.create_task(self.client.run_reconciliation(self.config.reconcile_interval))
         
         try:
+            if self.config.mode == "stream":
+                if await self.run_streaming():
+                    return
+                logger.warning("↩️ Stream unavailable, falling back to 60s polling")
+                # Les bars du polling n'ont pas la même granularité: indicateurs repartis de zéro
+                self.indicators = IndicatorEngine(self.config.symbols, **self.strategy.indicator_params())
+            
             while self.running:
                 await self.trading_loop()
                 await asyncio.sleep(60)  # Check every minute
         except KeyboardInterrupt:
             logger.info("🛑 Bot stopped by user")
         finally:
+            reconcile_task.cancel()
             await self.client.close()
     
     async def trading_loop(self):
         """Boucle de trading principale."""
         # Check trading hours
-        now = datetime.utcnow()
-        if not (self.config.trading_start_hour <= now.hour < self.config.trading_end_hour):
+        if not self.in_trading_hours():
             return
         
-        # Check if we can trade
-        if not await self.risk_manager.check_can_trade(self.client):
+        # Compte, positions et bars de tous les symboles en un aller-retour
+        try:
+            snapshot = await self.market_data.snapshot(self.config.symbols)
+        except Exception as e:
+            tick_metrics.record_error()
+            logger.error(f"❌ Market data error: {e}")
             return
         
-        # Get account info
-        account = await self.client.get_account()
-        equity = float(account["equity"])
+        analyze_start = time.perf_counter()
         
-        # Analyze each symbol
-        for symbol in self.config.symbols:
-            try:
-                await self.analyze_and_trade(symbol, equity)
-            except Exception as e:
-                logger.error(f"❌ Error trading {symbol}: {e}")
-    
-    async def analyze_and_trade(self, symbol: str, equity: float):
-        """Analyse un symbol et trade si signal."""
-        # Get historical data
-        bars = await self.client.get_bars(symbol)
+        # Seules les nouvelles bars sont intégrées, puis signaux de tous les symboles d'un coup
+        self.indicators.sync(snapshot.bars)
+        signals = self.strategy.signals(self.indicators)
+        
+        # Check if we can trade
+        if await self.risk_manager.check_can_trade(self.client, snapshot):
+            for symbol in self.config.symbols:
+                if symbol not in signals:
+                    continue
+                try:
+                    await self.analyze_and_trade(symbol, snapshot, signals[symbol])
+                except Exception as e:
+                    logger.error(f"❌ Error trading {symbol}: {e}")
+        
+        tick_metrics.record(snapshot.fetch_ms, (time.perf_counter() - analyze_start) * 1000, len(snapshot.bars))
+    
+    def in_trading_hours(self) -> bool:
+        now = datetime.utcnow()
+        return self.config.trading_start_hour <= now.hour < self.config.trading_end_hour
+    
+    async def run_streaming(self) -> bool:
+        """
+        Mode événementiel: les bars arrivent par websocket, les indicateurs sont
+        mis à jour à l'arrivée et les signaux évalués immédiatement.
+        Retourne False si le flux est indisponible (le bot repasse en polling).
+        """
+        stream = BarStream(
+            self.config.stream_url,
+            self.config.alpaca_api_key,
+            self.config.alpaca_secret,
+            self.config.symbols,
+        )
+        
+        # Amorçage des indicateurs sur l'historique à la granularité du flux
+        try:
+            history = await self.market_data.fetch_bars(self.config.symbols, self.config.stream_timeframe)
+        except Exception as e:
+            logger.error(f"❌ Stream warm-up failed: {e}")
+            history = {}
+        self.indicators.sync(history)
+        for symbol, bars in history.items():
+            self.recent_bars[symbol].extend(bars)
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def pump():
+            async for item in stream.bars():
+                queue.put_nowait(item)
+        
+        pump_task = asyncio.create_task(pump())
+        try:
+            while self.running:
+                if pump_task.done():
+                    pump_task.result()  # Propage StreamError
+                    return True
+                try:
+                    first = await asyncio.wait_for(queue.get(), timeout=5)
+                except asyncio.TimeoutError:
+                    continue
+                # Les bars d'une même minute arrivent en rafale: traitées ensemble
+                batch = [first]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                try:
+                    await self.on_bars(batch)
+                except Exception as e:
+                    tick_metrics.record_error()
+                    logger.error(f"❌ Stream tick error: {e}")
+            return True
+        except StreamError as e:
+            logger.error(f"❌ {e}")
+            return False
+        finally:
+            pump_task.cancel()
+    
+    async def on_bars(self, batch: List[tuple]):
+        """Intègre des bars reçues du flux et trade les symboles concernés."""
+        analyze_start = time.perf_counter()
+        new_bars: Dict[str, List[Dict]] = {}
+        for symbol, bar in batch:
+            new_bars.setdefault(symbol, []).append(bar)
+            self.recent_bars[symbol].append(bar)
+        self.indicators.sync(new_bars)
+        
+        if not self.in_trading_hours():
+            return
+        
+        signals = {s: sig for s, sig in self.strategy.signals(self.indicators).items() if s in new_bars}
+        fetch_ms = 0.0
+        if signals:
+            # Compte et positions seulement quand il y a quelque chose à faire
+            fetch_start = time.perf_counter()
+            account, positions = await asyncio.gather(self.client.get_account(), self.client.get_positions())
+            fetch_ms = (time.perf_counter() - fetch_start) * 1000
+            snapshot = MarketSnapshot(
+                account=account,
+                positions={p["symbol"]: p for p in positions},
+                bars={symbol: list(self.recent_bars[symbol]) for symbol in signals},
+                fetch_ms=fetch_ms,
+            )
+            if await self.risk_manager.check_can_trade(self.client, snapshot):
+                for symbol, signal in signals.items():
+                    try:
+                        await self.analyze_and_trade(symbol, snapshot, signal)
+                    except Exception as e:
+                        logger.error(f"❌ Error trading {symbol}: {e}")
+        
+        tick_metrics.record(fetch_ms, (time.perf_counter() - analyze_start) * 1000 - fetch_ms, len(new_bars))
+    
+    async def analyze_and_trade(self, symbol: str, snapshot: MarketSnapshot, signal: Optional[TradingSignal] = None):
+        """Trade un symbol selon son signal (calculé depuis les bars si absent)."""
+        bars = snapshot.bars.get(symbol)
         if not bars:
             return
         
         # Get signal
-        signal = self.strategy.analyze(bars)
+        if signal is None:
+            signal = self.strategy.analyze(bars)
         
         if signal == TradingSignal.HOLD:
             return
         
-        # Check if already have position
-        positions = await self.client.get_positions()
-        has_position = any(p["symbol"] == symbol for p in positions)
+        # Ordre précédent pas encore exécuté: pas de second ordre sur le symbole
+        pending = self.client.open_order(symbol)
+        if pending is not None:
+            logger.debug(f"⏳ {symbol}: order {pending.get('id')} still {pending.get('status')}, skipping")
+            return
+        
+        has_position = snapshot.has_position(symbol)
         
         if signal == TradingSignal.BUY and not has_position:
-            await self.execute_buy(symbol, equity, bars)
+            if len(snapshot.positions) >= self.config.max_positions:
+                return
+            if await self.execute_buy(symbol, snapshot.equity, bars):
+                snapshot.positions[symbol] = {"symbol": symbol}
         elif signal == TradingSignal.SELL and has_position:
-            await self.execute_sell(symbol)
+            if await self.execute_sell(symbol):
+                snapshot.positions.pop(symbol, None)
     
-    async def execute_buy(self, symbol: str, equity: float, bars: List[Dict]):
+    async def execute_buy(self, symbol: str, equity: float, bars: List[Dict]) -> bool:
         """Exécute un achat."""
         current_price = float(bars[-1]["c"])
         
@@ -475,18 +930,22 @@ class TradingBot:
                 take_profit=take_profit
             )
             logger.info(f"✅ Order placed: {order['id']}")
+            return True
         except Exception as e:
             logger.error(f"❌ Failed to place order: {e}")
+            return False
     
-    async def execute_sell(self, symbol: str):
+    async def execute_sell(self, symbol: str) -> bool:
         """Ferme une position."""
         logger.info(f"📕 SELL {symbol}: Closing position")
         
         try:
             await self.client.close_position(symbol)
             logger.info(f"✅ Position closed")
+            return True
         except Exception as e:
             logger.error(f"❌ Failed to close position: {e}")
+            return False
     
     def stop(self):
         """Arrête le bot."""
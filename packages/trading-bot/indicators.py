@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+📐 INDICATOR ENGINE - Indicateurs incrémentaux vectorisés
+==========================================================
+Un état NumPy par symbole (une ligne par symbole), mis à jour en O(1)
+par nouvelle bar et vectorisé sur tous les symboles à la fois:
+
+- RSI lissé Wilder
+- Momentum sur `lookback` bars
+- Moyennes mobiles simples (sommes glissantes)
+- ATR lissé Wilder
+
+Les bars déjà vues (champ "t") ne sont jamais réappliquées: d'un tick
+à l'autre seule la dernière bar est intégrée. La bar en cours de
+formation (même "t", clôture / haut / bas mis à jour) remplace la
+précédente version: l'état d'avant sa dernière intégration est gardé
+pour être restauré puis réappliqué.
+"""
+
+from typing import Dict, List, Iterable, Optional, Sequence
+
+import numpy as np
+
+
+class IndicatorEngine:
+    """Indicateurs de N symboles dans des tableaux (N,) / (N, fenêtre)."""
+
+    # Tableaux par ligne restaurés par rollback() (le ring buffer l'est par case)
+    _STATE = ("count", "prev_close", "avg_gain", "avg_loss", "atr_value", "ma_sums")
+
+    def __init__(
+        self,
+        symbols: Iterable[str] = (),
+        rsi_period: int = 14,
+        atr_period: int = 14,
+        momentum_lookback: int = 20,
+        ma_periods: Sequence[int] = (20, 50),
+    ):
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.momentum_lookback = momentum_lookback
+        self.ma_periods = tuple(ma_periods)
+        # Ring buffer assez long pour le momentum et la plus longue MA
+        self.window = max(momentum_lookback, *self.ma_periods, 1) + 1
+
+        self.index: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.last_t: Dict[str, str] = {}
+
+        self.count = np.zeros(0, dtype=np.int64)
+        self.prev_close = np.zeros(0)
+        self.avg_gain = np.zeros(0)
+        self.avg_loss = np.zeros(0)
+        self.atr_value = np.zeros(0)
+        self.closes = np.zeros((0, self.window))
+        self.ma_sums = np.zeros((0, len(self.ma_periods)))
+        # État de chaque ligne avant sa dernière bar (remplacement de la bar en formation)
+        self._undo = {name: getattr(self, name).copy() for name in self._STATE}
+        self._undo_slot = np.zeros(0)
+
+        self.add_symbols(symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    # ──────────────────────────────────────────────────────────────
+    # Symboles
+    # ──────────────────────────────────────────────────────────────
+
+    def add_symbols(self, symbols: Iterable[str]):
+        """Ajoute des lignes pour de nouveaux symboles."""
+        new = [s for s in dict.fromkeys(symbols) if s not in self.index]
+        if not new:
+            return
+        for symbol in new:
+            self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        extra = len(new)
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.prev_close = np.concatenate([self.prev_close, np.zeros(extra)])
+        self.avg_gain = np.concatenate([self.avg_gain, np.zeros(extra)])
+        self.avg_loss = np.concatenate([self.avg_loss, np.zeros(extra)])
+        self.atr_value = np.concatenate([self.atr_value, np.zeros(extra)])
+        self.closes = np.vstack([self.closes, np.zeros((extra, self.window))])
+        self.ma_sums = np.vstack([self.ma_sums, np.zeros((extra, len(self.ma_periods)))])
+        for name in self._STATE:
+            self._undo[name] = np.concatenate([self._undo[name], np.zeros_like(getattr(self, name)[-extra:])])
+        self._undo_slot = np.concatenate([self._undo_slot, np.zeros(extra)])
+
+    def reset(self, symbol: str):
+        """Remet à zéro l'état d'un symbole (avant un re-seed)."""
+        row = self.index[symbol]
+        self.count[row] = 0
+        self.prev_close[row] = self.avg_gain[row] = self.avg_loss[row] = self.atr_value[row] = 0.0
+        self.closes[row] = 0.0
+        self.ma_sums[row] = 0.0
+        self.last_t.pop(symbol, None)
+
+    # ──────────────────────────────────────────────────────────────
+    # Mise à jour
+    # ──────────────────────────────────────────────────────────────
+
+    def update(self, rows: np.ndarray, close: np.ndarray, high: Optional[np.ndarray] = None, low: Optional[np.ndarray] = None):
+        """Intègre une nouvelle bar pour chaque ligne de `rows` (O(1) par symbole)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        close = np.asarray(close, dtype=float)
+        high = close if high is None else np.asarray(high, dtype=float)
+        low = close if low is None else np.asarray(low, dtype=float)
+
+        cnt = self.count[rows]
+        for name in self._STATE:
+            self._undo[name][rows] = getattr(self, name)[rows]
+        self._undo_slot[rows] = self.closes[rows, cnt % self.window]
+
+        new_cnt = cnt + 1
+        has_prev = cnt > 0
+        prev = np.where(has_prev, self.prev_close[rows], close)
+
+        # RSI Wilder: moyenne simple des `period` premiers deltas, puis lissage
+        p = self.rsi_period
+        delta = close - prev
+        gain = np.maximum(delta, 0.0)
+        loss = np.maximum(-delta, 0.0)
+        smooth = cnt > p
+        avg_gain = np.where(smooth, (self.avg_gain[rows] * (p - 1) + gain) / p, self.avg_gain[rows] + gain)
+        avg_loss = np.where(smooth, (self.avg_loss[rows] * (p - 1) + loss) / p, self.avg_loss[rows] + loss)
+        seeded = cnt == p
+        self.avg_gain[rows] = np.where(seeded, avg_gain / p, avg_gain)
+        self.avg_loss[rows] = np.where(seeded, avg_loss / p, avg_loss)
+
+        # ATR Wilder (première TR = high - low)
+        a = self.atr_period
+        true_range = np.maximum(high - low, np.maximum(np.abs(high - prev), np.abs(low - prev)))
+        atr = np.where(new_cnt > a, (self.atr_value[rows] * (a - 1) + true_range) / a, self.atr_value[rows] + true_range)
+        self.atr_value[rows] = np.where(new_cnt == a, atr / a, atr)
+
+        # Ring buffer des clôtures + sommes glissantes des MA
+        self.closes[rows, cnt % self.window] = close
+        for k, period in enumerate(self.ma_periods):
+            leaving = np.where(new_cnt > period, self.closes[rows, (new_cnt - 1 - period) % self.window], 0.0)
+            self.ma_sums[rows, k] += close - leaving
+
+        self.prev_close[rows] = close
+        self.count[rows] = new_cnt
+
+    def rollback(self, rows: np.ndarray):
+        """Annule la dernière bar intégrée de chaque ligne de `rows` (un seul niveau)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return
+        for name in self._STATE:
+            getattr(self, name)[rows] = self._undo[name][rows]
+        self.closes[rows, self.count[rows] % self.window] = self._undo_slot[rows]
+
+    def push_bar(self, symbol: str, bar: Dict):
+        """Intègre une bar Alpaca ({"t", "o", "h", "l", "c", ...}) d'un symbole."""
+        self.add_symbols([symbol])
+        t = bar.get("t")
+        if t is not None and symbol in self.last_t:
+            if t < self.last_t[symbol]:
+                return
+            if t == self.last_t[symbol]:
+                # Nouvelle version de la bar en formation
+                self.rollback(np.array([self.index[symbol]]))
+        self.update(
+            np.array([self.index[symbol]]),
+            np.array([float(bar["c"])]),
+            np.array([float(bar.get("h", bar["c"]))]),
+            np.array([float(bar.get("l", bar["c"]))]),
+        )
+        if t is not None:
+            self.last_t[symbol] = t
+
+    def sync(self, bars_by_symbol: Dict[str, List[Dict]]) -> int:
+        """
+        Intègre uniquement les bars pas encore vues de chaque symbole; la bar
+        de même "t" que la dernière intégrée (bar en formation) la remplace.
+        Les symboles inconnus (ou sans horodatage) sont seedés depuis leur historique.
+        Retourne le nombre de bars appliquées.
+        """
+        self.add_symbols(bars_by_symbol.keys())
+        pending: Dict[int, List[Dict]] = {}
+        replaced: List[int] = []
+        for symbol, bars in bars_by_symbol.items():
+            if not bars:
+                continue
+            last = self.last_t.get(symbol)
+            if last is None or bars[-1].get("t") is None:
+                self.reset(symbol)
+                new_bars = bars
+            else:
+                new_bars = [bar for bar in bars if bar.get("t") is not None and bar["t"] >= last]
+                if new_bars and new_bars[0]["t"] == last:
+                    replaced.append(self.index[symbol])
+            if new_bars:
+                pending[self.index[symbol]] = new_bars
+                if new_bars[-1].get("t") is not None:
+                    self.last_t[symbol] = new_bars[-1]["t"]
+
+        self.rollback(np.array(replaced, dtype=np.int64))
+
+        # Une passe vectorisée par "rang" de bar en attente
+        applied = 0
+        depth = max((len(bars) for bars in pending.values()), default=0)
+        for step in range(depth):
+            batch = [(row, bars[step]) for row, bars in pending.items() if step < len(bars)]
+            rows = np.fromiter((row for row, _ in batch), dtype=np.int64, count=len(batch))
+            close = np.fromiter((float(bar["c"]) for _, bar in batch), dtype=float, count=len(batch))
+            high = np.fromiter((float(bar.get("h", bar["c"])) for _, bar in batch), dtype=float, count=len(batch))
+            low = np.fromiter((float(bar.get("l", bar["c"])) for _, bar in batch), dtype=float, count=len(batch))
+            self.update(rows, close, high, low)
+            applied += len(batch)
+        return applied
+
+    # ──────────────────────────────────────────────────────────────
+    # Lecture (tous les symboles d'un coup)
+    # ──────────────────────────────────────────────────────────────
+
+    def last_close(self) -> np.ndarray:
+        return self.prev_close.copy()
+
+    def rsi(self) -> np.ndarray:
+        """RSI Wilder (50 tant que la période n'est pas remplie)."""
+        ready = self.count > self.rsi_period
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value = 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+        value = np.where(self.avg_loss == 0, 100.0, value)
+        return np.where(ready, value, 50.0)
+
+    def momentum(self) -> np.ndarray:
+        """Variation relative sur `lookback` bars (NaN tant que pas assez de bars)."""
+        lookback = self.momentum_lookback
+        ready = self.count >= lookback
+        rows = np.arange(len(self.symbols))
+        past = self.closes[rows, (self.count - lookback) % self.window]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value = (self.prev_close - past) / past
+        return np.where(ready, value, np.nan)
+
+    def ma(self, period: int) -> np.ndarray:
+        """Moyenne mobile simple (NaN tant que pas assez de bars)."""
+        k = self.ma_periods.index(period)
+        return np.where(self.count >= period, self.ma_sums[:, k] / period, np.nan)
+
+    def atr(self) -> np.ndarray:
+        """ATR Wilder (NaN tant que la période n'est pas remplie)."""
+        return np.where(self.count >= self.atr_period, self.atr_value, np.nan)
+
+    def values(self, symbol: str) -> Dict[str, float]:
+        """Indicateurs courants d'un symbole."""
+        row = self.index[symbol]
+        out = {
+            "close": float(self.prev_close[row]),
+            "bars": int(self.count[row]),
+            "rsi": float(self.rsi()[row]),
+            "momentum": float(self.momentum()[row]),
+            "atr": float(self.atr()[row]),
+        }
+        for period in self.ma_periods:
+            out[f"ma_{period}"] = float(self.ma(period)[row])
+        return out
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+📡 BAR STREAM - Flux de bars temps réel (protocole Alpaca)
+===========================================================
+Client websocket du flux market data d'Alpaca (auth → subscribe → bars)
+avec reconnexion, et serveur de replay local qui parle le même
+protocole à partir de fichiers de bars (ceux du backtester).
+
+    # Serveur de replay (60 pas de temps/s), puis le bot en mode stream
+    python stream.py data/ --port 8765 --speed 60
+    TRADING_MODE=stream ALPACA_STREAM_URL=ws://localhost:8765 python bot.py
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+import websockets
+
+logger = logging.getLogger("TradingBot")
+
+# Champs d'une bar du flux Alpaca → format REST (get_bars)
+BAR_FIELDS = ("t", "o", "h", "l", "c", "v")
+
+
+class StreamError(Exception):
+    """Connexion ou authentification au flux impossible."""
+
+
+def _to_bar(message: Dict) -> Dict:
+    return {field: message[field] for field in BAR_FIELDS if field in message}
+
+
+class BarStream:
+    """Client du flux de bars: auth, abonnement et reconnexion avec backoff."""
+
+    def __init__(self, url: str, key: str, secret: str, symbols: List[str],
+                 max_retries: int = 5, backoff: float = 1.0):
+        self.url = url
+        self.key = key
+        self.secret = secret
+        self.symbols = list(symbols)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.connected = False
+        self.bars_received = 0
+
+    async def _expect(self, ws, kind: str, msg: Optional[str] = None) -> List[Dict]:
+        messages = json.loads(await asyncio.wait_for(ws.recv(), timeout=10))
+        for message in messages:
+            if message.get("T") == "error":
+                raise StreamError(f"{message.get('code')}: {message.get('msg')}")
+            if message.get("T") == kind and (msg is None or message.get("msg") == msg):
+                return messages
+        raise StreamError(f"Unexpected stream message: {messages}")
+
+    async def _session(self) -> AsyncIterator[tuple]:
+        async with websockets.connect(self.url, ping_interval=20, max_queue=4096) as ws:
+            await self._expect(ws, "success", "connected")
+            await ws.send(json.dumps({"action": "auth", "key": self.key, "secret": self.secret}))
+            await self._expect(ws, "success", "authenticated")
+            await ws.send(json.dumps({"action": "subscribe", "bars": self.symbols}))
+            await self._expect(ws, "subscription")
+            self.connected = True
+            logger.info(f"📡 Stream connected: {len(self.symbols)} symbols ({self.url})")
+
+            async for raw in ws:
+                for message in json.loads(raw):
+                    if message.get("T") == "b":
+                        self.bars_received += 1
+                        yield message["S"], _to_bar(message)
+                    elif message.get("T") == "error":
+                        raise StreamError(f"{message.get('code')}: {message.get('msg')}")
+
+    async def bars(self) -> AsyncIterator[tuple]:
+        """
+        Itère (symbol, bar) indéfiniment, en se reconnectant après une coupure.
+        Lève StreamError après `max_retries` échecs consécutifs.
+        """
+        failures = 0
+        while True:
+            try:
+                async for item in self._session():
+                    failures = 0
+                    yield item
+                raise StreamError("Stream closed by server")
+            except (OSError, asyncio.TimeoutError, StreamError, websockets.WebSocketException) as e:
+                self.connected = False
+                failures += 1
+                if failures > self.max_retries:
+                    raise StreamError(f"Stream unavailable after {self.max_retries} retries: {e}")
+                delay = min(60.0, self.backoff * 2 ** (failures - 1))
+                logger.warning(f"⚠️ Stream error ({e}), reconnecting in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SERVEUR DE REPLAY
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class ReplayServer:
+    """
+    Serveur websocket local qui rejoue des bars avec le protocole Alpaca.
+    `speed` = pas de temps rejoués par seconde (0 = aussi vite que possible).
+    """
+
+    def __init__(self, bars: Dict[str, List[Dict]], speed: float = 1.0, loop: bool = False):
+        self.bars = bars
+        self.speed = speed
+        self.loop = loop
+
+    @classmethod
+    def from_dir(cls, data_dir: Path, **kwargs) -> "ReplayServer":
+        from backtest import discover, load_bars  # Réutilise le format du backtester
+        bars = {}
+        for symbol, path in discover(Path(data_dir)).items():
+            bars[symbol] = [
+                {"t": datetime.fromtimestamp(t, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                 "o": o, "h": h, "l": l, "c": c, "v": 0}
+                for t, o, h, l, c in load_bars(path).tolist()
+            ]
+        return cls(bars, **kwargs)
+
+    def _timeline(self, symbols: List[str]) -> List[List[Dict]]:
+        """Bars groupées par timestamp (une frame par pas de temps)."""
+        steps: Dict[str, List[Dict]] = {}
+        for symbol in symbols:
+            for bar in self.bars.get(symbol, []):
+                steps.setdefault(bar["t"], []).append({"T": "b", "S": symbol, **bar})
+        return [steps[t] for t in sorted(steps)]
+
+    async def handler(self, ws):
+        await ws.send(json.dumps([{"T": "success", "msg": "connected"}]))
+        json.loads(await ws.recv())  # auth (non vérifiée en local)
+        await ws.send(json.dumps([{"T": "success", "msg": "authenticated"}]))
+        request = json.loads(await ws.recv())
+        symbols = [s for s in request.get("bars", []) if s in self.bars] if request.get("bars") != ["*"] else list(self.bars)
+        await ws.send(json.dumps([{"T": "subscription", "bars": symbols}]))
+
+        while True:
+            for frame in self._timeline(symbols):
+                await ws.send(json.dumps(frame))
+                if self.speed:
+                    await asyncio.sleep(1 / self.speed)
+            if not self.loop:
+                break
+        # Comme le vrai flux: la connexion reste ouverte une fois les données épuisées
+        await ws.wait_closed()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        return await websockets.serve(self.handler, host, port)
+
+
+async def _main(args):
+    server = ReplayServer.from_dir(Path(args.data_dir), speed=args.speed, loop=args.loop)
+    await server.serve(args.host, args.port)
+    logger.info(f"📡 Replaying {len(server.bars)} symbols on ws://{args.host}:{args.port}")
+    await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local bar replay server (Alpaca stream protocol)")
+    parser.add_argument("data_dir", help="Dossier de fichiers de bars (format du backtester)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=1.0, help="Pas de temps par seconde (0 = max)")
+    parser.add_argument("--loop", action="store_true", help="Rejouer en boucle")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)-7s | %(message)s')
+    asyncio.run(_main(args))
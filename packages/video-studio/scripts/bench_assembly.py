@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🎬 VIDEO STUDIO - Benchmark du montage ffmpeg
+# ═══════════════════════════════════════════════════════════════════════════════
+"""
+Compare les deux modes de montage de HeyGenOpenSource sur des médias de
+synthèse (aucun appel réseau ni moteur avatar):
+
+- per_section: un ffmpeg par section (en parallèle) + concat
+- single_pass: un seul graphe filter_complex, un seul encodage
+
+    python scripts/bench_assembly.py
+    python scripts/bench_assembly.py --sections 8 --seconds 12 --preset medium
+    python scripts/bench_assembly.py --no-subtitles   # ffmpeg sans drawtext
+
+Mesure le temps mur, le temps CPU de ffmpeg (processus enfants) et la
+taille de la vidéo finale. Nécessite ffmpeg dans le PATH.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from ffmpeg_assembly import Segment  # noqa: E402
+from heygen_opensource import HeyGenOpenSource, VideoConfig  # noqa: E402
+from media_probe import probe_duration  # noqa: E402
+
+TEXT = ("L'intelligence artificielle transforme notre quotidien: "
+        "voici les points essentiels à connaître, expliqués simplement.")
+
+
+def ffmpeg(*args: str):
+    subprocess.run(["ffmpeg", "-y", "-hide_banner", "-loglevel", "error", *args], check=True)
+
+
+def make_assets(work: Path, sections: int, seconds: float):
+    """Illustrations, narrations MP3 (format Edge-TTS) et clips avatar 512x512."""
+    assets = {"images": [], "audios": [], "avatars": []}
+    for i in range(sections):
+        image = work / f"illustration_{i}.jpg"
+        ffmpeg("-f", "lavfi", "-i", f"testsrc2=s=1920x1080:r=1,hue=h={i * 40}", "-frames:v", "1", str(image))
+        assets["images"].append(image)
+    for i in range(sections + 2):
+        audio = work / f"narration_{i}.mp3"
+        ffmpeg("-f", "lavfi", "-i", f"sine=frequency={220 + 20 * i}:duration={seconds}",
+               "-ar", "24000", "-ac", "1", "-b:a", "48k", str(audio))
+        assets["audios"].append(audio)
+    for name in ("intro", "outro"):
+        clip = work / f"avatar_{name}.mp4"
+        ffmpeg("-f", "lavfi", "-i", f"testsrc=s=512x512:r=25:d={seconds}",
+               "-f", "lavfi", "-i", f"sine=duration={seconds}",
+               "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-shortest", str(clip))
+        assets["avatars"].append(clip)
+    return assets
+
+
+def child_cpu() -> float:
+    t = os.times()
+    return t.children_user + t.children_system
+
+
+async def per_section(producer: HeyGenOpenSource, assets, output: Path) -> bool:
+    sem = asyncio.Semaphore(producer.encode_slots)
+
+    async def encode(i):
+        async with sem:
+            return await producer.create_section_video(assets["images"][i], assets["audios"][i + 1], TEXT, i)
+
+    sections = await asyncio.gather(*(encode(i) for i in range(len(assets["images"]))))
+    parts = [assets["avatars"][0], *sections, assets["avatars"][1]]
+    return await producer.assemble_video(parts, output)
+
+
+async def single_pass(producer: HeyGenOpenSource, assets, output: Path) -> bool:
+    n = len(assets["images"])
+    audios = assets["audios"]
+    durations = await asyncio.gather(*(probe_duration(a) for a in audios))
+    segments = [Segment(audio=audios[0], duration=durations[0], video=assets["avatars"][0])]
+    for i in range(n):
+        segments.append(Segment(
+            audio=audios[i + 1], duration=durations[i + 1], image=assets["images"][i],
+            subtitle_file=producer._write_subtitle(TEXT, i),
+        ))
+    segments.append(Segment(audio=audios[-1], duration=durations[-1], video=assets["avatars"][1]))
+    return await producer.assemble_single_pass(segments, output)
+
+
+def run(mode, producer, assets, output):
+    cpu, start = child_cpu(), time.perf_counter()
+    ok = asyncio.run(mode(producer, assets, output))
+    wall, cpu = time.perf_counter() - start, child_cpu() - cpu
+    size = output.stat().st_size / 1024 / 1024 if ok else 0.0
+    return ok, wall, cpu, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-section vs single-pass assembly")
+    parser.add_argument("--sections", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=8.0, help="Durée de chaque plan")
+    parser.add_argument("--preset", default="veryfast")
+    parser.add_argument("--crf", type=int, default=23)
+    parser.add_argument("--no-subtitles", action="store_true")
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg"):
+        sys.exit("ffmpeg introuvable dans le PATH")
+
+    work = Path(tempfile.mkdtemp(prefix="bench_assembly_"))
+    try:
+        assets = make_assets(work, args.sections, args.seconds)
+        config = VideoConfig(
+            output_dir=work, temp_dir=work, use_artifact_cache=False,
+            burn_subtitles=not args.no_subtitles, x264_preset=args.preset, x264_crf=args.crf,
+        )
+        producer = HeyGenOpenSource(config)
+        total = (args.sections + 2) * args.seconds
+
+        print(f"\n🎬 {args.sections} sections + intro/outro, {total:.0f}s de vidéo, "
+              f"preset {args.preset}, crf {args.crf}, {os.cpu_count()} cœurs\n")
+        print(f"{'mode':<12} {'mur':>8} {'CPU ffmpeg':>11} {'x temps réel':>13} {'taille':>9}")
+        for name, mode in (("per_section", per_section), ("single_pass", single_pass)):
+            ok, wall, cpu, size = run(mode, producer, assets, work / f"{name}.mp4")
+            if not ok:
+                print(f"{name:<12} ❌ échec")
+                continue
+            print(f"{name:<12} {wall:>7.2f}s {cpu:>10.2f}s {total / wall:>12.1f}x {size:>7.1f}MB")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+🗃️ ARTIFACT CACHE - Cache adressé par contenu des artefacts de production
+==========================================================================
+Les illustrations et rendus avatar sont indexés par le hash de ce qui les
+détermine (le TTS a son propre cache par phrase, voir voice_service):
+
+- Illustration: (prompt, taille, seed)
+- Avatar: (contenu de l'image, contenu de l'audio, moteur, options)
+
+Une re-production (variantes A/B, reprise de batch) ne refait que ce qui a
+changé. Les entrées sont réutilisées dans les dossiers de job par lien dur
+(ou reflink, ou copie en dernier recours): pas de duplication sur disque.
+
+⚠️ Un fichier servi depuis le cache partage son inode avec l'entrée: on ne
+réécrit jamais un fichier en place, `cached()` le supprime avant de produire.
+
+Stockage: {dir}/{ab}/{sha256}{suffixe}, LRU par date d'utilisation (mtime)
+et éviction au-delà de `max_bytes`.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("ArtifactCache")
+
+try:
+    import fcntl
+    FICLONE = 0x40049409  # ioctl Linux (btrfs, xfs): copie copy-on-write
+except ImportError:  # Windows
+    fcntl = None
+
+
+class ArtifactCache:
+    """Artefacts de production indexés par hash de contenu."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.links = {"hardlink": 0, "reflink": 0, "copy": 0}
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # CLÉS
+    # ──────────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def key(kind: str, *parts: Any) -> str:
+        """Clé `kind-sha256` des paramètres qui déterminent l'artefact."""
+        payload = "\x00".join(str(p) for p in parts)
+        return f"{kind}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def file_digest(self, path: Path) -> str:
+        """sha256 du contenu d'un fichier (mémoïsé par chemin, taille, mtime)."""
+        stat = os.stat(path)
+        memo = (str(path), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(memo)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            digest = self._digests[memo] = h.hexdigest()
+        return digest
+
+    def path(self, key: str, suffix: str) -> Path:
+        digest = key.rsplit("-", 1)[-1]
+        return self.directory / digest[:2] / f"{key}{suffix}"
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # LIENS
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _link(self, src: Path, dest: Path):
+        """Lien dur, sinon reflink, sinon copie (autre disque, FAT...)."""
+        try:
+            os.link(src, dest)
+            self.links["hardlink"] += 1
+            return
+        except OSError:
+            pass
+        if fcntl is not None:
+            try:
+                with open(src, "rb") as s, open(dest, "wb") as d:
+                    fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+                self.links["reflink"] += 1
+                return
+            except OSError:
+                dest.unlink(missing_ok=True)
+        shutil.copyfile(src, dest)
+        self.links["copy"] += 1
+
+    def fetch(self, key: str, dest: Path) -> Optional[Path]:
+        """Place l'artefact `key` en `dest`; None s'il n'est pas en cache."""
+        dest = Path(dest)
+        entry = self.path(key, dest.suffix)
+        kind = key.split("-", 1)[0]
+        try:
+            os.utime(entry)  # Marque l'entrée comme récemment utilisée
+        except OSError:
+            self.misses[kind] = self.misses.get(kind, 0) + 1
+            return None
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.unlink(missing_ok=True)
+            self._link(entry, dest)
+        except OSError as e:
+            logger.warning(f"⚠️ Cache artefact illisible {entry.name}: {e}")
+            self.misses[kind] = self.misses.get(kind, 0) + 1
+            return None
+        self.hits[kind] = self.hits.get(kind, 0) + 1
+        return dest
+
+    def store(self, key: str, src: Path):
+        """Ajoute `src` au cache (lien dur si possible), de façon atomique."""
+        src = Path(src)
+        entry = self.path(key, src.suffix)
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.part")
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            tmp.unlink(missing_ok=True)
+            self._link(src, tmp)
+            os.replace(tmp, entry)  # Jamais d'entrée tronquée lue par un autre job
+            size = entry.stat().st_size
+        except OSError as e:
+            logger.warning(f"⚠️ Écriture cache artefact échouée: {e}")
+            tmp.unlink(missing_ok=True)
+            return
+        if self._size is None:
+            self._size = self._scan_size()
+        else:
+            self._size += size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    async def cached(
+        self,
+        key: str,
+        dest: Path,
+        produce: Callable[[], Awaitable[Optional[Path]]],
+    ) -> Optional[Path]:
+        """
+        Artefact `key` en `dest`: depuis le cache, sinon via `produce()` puis
+        mis en cache. Deux jobs qui demandent la même clé en même temps ne la
+        produisent qu'une fois.
+        """
+        dest = Path(dest)
+        hit = self.fetch(key, dest)
+        if hit:
+            return hit
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            if await asyncio.shield(pending):
+                return self.fetch(key, dest)
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        ok = False
+        try:
+            # `dest` peut être un lien vers une entrée: ne jamais écrire au travers
+            dest.unlink(missing_ok=True)
+            result = await produce()
+            if result and Path(result).exists():
+                self.store(key, Path(result))
+                ok = True
+            return result
+        finally:
+            self._inflight.pop(key, None)
+            future.set_result(ok)
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # ÉVICTION
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _entries(self):
+        if not self.directory.exists():
+            return
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".part"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à 90% de la taille max."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)  # Les liens déjà placés dans les jobs restent valides
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        self._size = total
+        if removed:
+            logger.info(f"🧹 Cache artefacts: {removed} fichiers évincés")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "size_mb": round((self._size if self._size is not None else self._scan_size()) / 1024 / 1024, 1),
+            "max_mb": round(self.max_bytes / 1024 / 1024),
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "links": dict(self.links),
+        }
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 AVATAR ENGINE SERVER - Worker persistant d'un moteur d'avatar
+=================================================================
+Processus longue durée lancé par avatar_workers.AvatarWorker: charge les
+poids du moteur UNE fois (plusieurs Go pour SadTalker + GFPGAN) puis sert
+les rendus reçus sur stdin.
+
+Protocole (une ligne JSON par message):
+    → {"id": 1, "op": "render", "image": ..., "audio": ..., "output": ..., "options": {...}}
+    ← {"id": 1, "ok": true, "output": ..., "elapsed": 12.3}
+    → {"id": 2, "op": "ping"}
+    ← {"id": 2, "ok": true, "jobs": 4, "rss_mb": 3120.5}
+Au démarrage: {"event": "ready", "engine": ..., "load_time": ...}
+
+Tout ce que les moteurs écrivent sur stdout (print, barres tqdm...) est
+redirigé vers stderr: stdout ne transporte que le protocole.
+
+    python avatar_engine_server.py --engine sadtalker --engine-dir D:/AI_Models/avatar/SadTalker --size 256
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+import traceback
+from typing import Any, Dict
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ADAPTATEURS DE MOTEURS (modèles gardés en mémoire)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _device() -> str:
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+class SadTalkerEngine:
+    """SadTalker: mêmes étapes que inference.py, modèles instanciés une fois."""
+
+    def __init__(self, engine_dir: str, size: int = 256, preprocess: str = "crop"):
+        sys.path.insert(0, engine_dir)
+        from src.utils.preprocess import CropAndExtract
+        from src.test_audio2coeff import Audio2Coeff
+        from src.facerender.animate import AnimateFromCoeff
+        from src.generate_batch import get_data
+        from src.generate_facerender_batch import get_facerender_data
+        from src.utils.init_path import init_path
+
+        self.engine_dir = engine_dir
+        self.device = _device()
+        self._classes = (CropAndExtract, Audio2Coeff, AnimateFromCoeff)
+        self._get_data = get_data
+        self._get_facerender_data = get_facerender_data
+        self._init_path = init_path
+        self._models: Dict[tuple, tuple] = {}
+        # Seuls les poids de la taille demandée par le client sont préchargés
+        self._load(size, preprocess)
+
+    def _load(self, size: int, preprocess: str) -> tuple:
+        # Les poids du rendu dépendent de la taille et du mode "full"
+        key = (size, preprocess == "full")
+        if key not in self._models:
+            paths = self._init_path(
+                os.path.join(self.engine_dir, "checkpoints"),
+                os.path.join(self.engine_dir, "src", "config"),
+                size, False, preprocess,
+            )
+            crop, a2c, animate = self._classes
+            self._models[key] = (crop(paths, self.device), a2c(paths, self.device), animate(paths, self.device))
+        return self._models[key]
+
+    def render(self, image: str, audio: str, output: str, options: Dict[str, Any]) -> str:
+        size = int(options.get("size", 256))
+        preprocess = options.get("preprocess", "crop")
+        still = bool(options.get("still_mode", True))
+        preprocess_model, audio_to_coeff, animate_from_coeff = self._load(size, preprocess)
+
+        save_dir = os.path.join(os.path.dirname(output), f"sadtalker_{int(time.time() * 1000)}")
+        os.makedirs(save_dir, exist_ok=True)
+        first_coeff_path, crop_pic_path, crop_info = preprocess_model.generate(
+            image, os.path.join(save_dir, "first_frame_dir"), preprocess,
+            source_image_flag=True, pic_size=size,
+        )
+        if first_coeff_path is None:
+            raise RuntimeError("Visage introuvable dans l'image")
+        batch = self._get_data(first_coeff_path, audio, self.device, None, still=still)
+        coeff_path = audio_to_coeff.generate(batch, save_dir, 0, None)
+        data = self._get_facerender_data(
+            coeff_path, crop_pic_path, first_coeff_path, audio, 2, None, None, None,
+            expression_scale=float(options.get("expression_scale", 1.0)),
+            still_mode=still, preprocess=preprocess, size=size,
+        )
+        result = animate_from_coeff.generate(
+            data, save_dir, image, crop_info,
+            enhancer="gfpgan" if options.get("use_enhancer") else None,
+            background_enhancer=None, preprocess=preprocess, img_size=size,
+        )
+        shutil.move(result, output)
+        shutil.rmtree(save_dir, ignore_errors=True)
+        return output
+
+
+class Wav2LipEngine:
+    """Wav2Lip: inference.py importé une fois, `load_model` renvoie le modèle en cache."""
+
+    def __init__(self, engine_dir: str, **preload):
+        os.chdir(engine_dir)  # inference.py écrit dans temp/ relatif
+        sys.path.insert(0, engine_dir)
+        checkpoint = os.path.join(engine_dir, "checkpoints", "wav2lip_gan.pth")
+        # inference.py lit ses arguments à l'import
+        sys.argv = ["inference.py", "--checkpoint_path", checkpoint, "--face", "", "--audio", ""]
+        import inference
+
+        model = inference.load_model(checkpoint)
+        inference.load_model = lambda path: model
+        self.inference = inference
+
+    def render(self, image: str, audio: str, output: str, options: Dict[str, Any]) -> str:
+        args = self.inference.args
+        args.face, args.audio, args.outfile = image, audio, output
+        args.static = image.lower().endswith((".jpg", ".jpeg", ".png"))
+        self.inference.main()
+        return output
+
+
+ENGINES = {
+    "sadtalker": SadTalkerEngine,
+    "wav2lip": Wav2LipEngine,
+}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BOUCLE DE SERVICE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _rss_mb() -> float:
+    """Mémoire résidente actuelle (pas le pic: ru_maxrss ne redescend jamais)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024**2, 1)
+    except (OSError, ValueError, IndexError, AttributeError):  # macOS, Windows
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().rss / 1024**2, 1)
+        except ImportError:
+            return 0.0
+
+
+def serve(engine_name: str, engine_dir: str, preload: Dict[str, Any]):
+    # stdout réservé au protocole; le reste (moteurs, librairies C) part sur stderr
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8", buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    def send(message: Dict[str, Any]):
+        protocol.write(json.dumps(message, ensure_ascii=False) + "\n")
+        protocol.flush()
+
+    start = time.perf_counter()
+    try:
+        engine = ENGINES[engine_name](engine_dir, **preload)
+    except Exception as e:
+        traceback.print_exc()
+        send({"event": "error", "error": f"{type(e).__name__}: {e}"})
+        return 1
+    send({"event": "ready", "engine": engine_name, "load_time": round(time.perf_counter() - start, 2)})
+
+    jobs = 0
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        request_id = request.get("id")
+        op = request.get("op")
+        if op == "ping":
+            send({"id": request_id, "ok": True, "jobs": jobs, "rss_mb": _rss_mb()})
+        elif op == "render":
+            t0 = time.perf_counter()
+            try:
+                output = engine.render(request["image"], request["audio"], request["output"], request.get("options") or {})
+                jobs += 1
+                send({"id": request_id, "ok": True, "output": output, "elapsed": round(time.perf_counter() - t0, 2)})
+            except Exception as e:
+                traceback.print_exc()
+                send({"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"})
+        elif op == "shutdown":
+            send({"id": request_id, "ok": True})
+            break
+        else:
+            send({"id": request_id, "ok": False, "error": f"op inconnue: {op}"})
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent avatar engine worker")
+    parser.add_argument("--engine", required=True, choices=sorted(ENGINES))
+    parser.add_argument("--engine-dir", required=True)
+    parser.add_argument("--size", type=int, default=256, help="SadTalker: taille des poids préchargés (256/512)")
+    parser.add_argument("--preprocess", default="crop", help="SadTalker: mode de prétraitement préchargé")
+    args = parser.parse_args()
+    sys.exit(serve(args.engine, args.engine_dir, {"size": args.size, "preprocess": args.preprocess}))
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,19 @@ from dataclasses import dataclass, field
 from enum import Enum
 import httpx
 
+try:
+    from services.avatar_workers import AvatarWorkerPool, AvatarRenderError
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from avatar_workers import AvatarWorkerPool, AvatarRenderError
+
+# Moteur TTS partagé avec l'API (brain-core/src/voice/voice_service.py)
+try:
+    from services.voice_service import tts_service
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "brain-core" / "src" / "voice"))
+    from voice_service import tts_service
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("AvatarVideoGenerator")
@@ -71,6 +84,7 @@ class AvatarConfig:
     use_enhancer: bool = True  # GFPGAN pour améliorer le visage
     
     # Options SadTalker
+    sadtalker_size: int = 256  # 256 ou 512 (poids du rendu), worker et CLI
     preprocess: str = "crop"  # crop, resize, full, extcrop, extfull
     still_mode: bool = True  # Moins de mouvements de tête
     expression_scale: float = 1.0
@@ -83,6 +97,10 @@ class AvatarConfig:
     openvino_device: str = "CPU"  # CPU, GPU, AUTO
     openvino_precision: str = "FP16"  # FP32, FP16, INT8
     
+    # Workers persistants (modèles gardés en mémoire entre les clips)
+    use_warm_workers: bool = True
+    worker_health_interval: float = 60.0  # secondes entre deux pings
+    
     # API Cloud (fallback)
     replicate_token: str = ""
     
@@ -158,6 +176,11 @@ class AvatarVideoGenerator:
         self.config = config or AvatarConfig()
         self.installed_engines: Dict[str, bool] = {}
         self._check_installations()
+        self.workers = AvatarWorkerPool(
+            self.config.models_dir / "logs", health_interval=self.config.worker_health_interval,
+            # Le worker précharge les seuls poids utilisés par les rendus
+            preload={"size": self.config.sadtalker_size, "preprocess": self.config.preprocess},
+        )
     
     def _check_installations(self):
         """Vérifie quels moteurs sont installés."""
@@ -166,8 +189,8 @@ class AvatarVideoGenerator:
         
         logger.info(f"Moteurs disponibles: {[k for k, v in self.installed_engines.items() if v]}")
     
-    def _is_engine_installed(self, engine: AvatarEngine) -> bool:
-        """Vérifie si un moteur est installé."""
+    def _engine_dir(self, engine: AvatarEngine) -> Optional[Path]:
+        """Dossier d'installation d'un moteur local."""
         engine_paths = {
             AvatarEngine.SADTALKER: self.config.models_dir / "SadTalker",
             AvatarEngine.MUSETALK: self.config.models_dir / "MuseTalk",
@@ -176,12 +199,15 @@ class AvatarVideoGenerator:
             AvatarEngine.ECHOMIMIC: self.config.models_dir / "EchoMimic",
             AvatarEngine.LATENTSYNC: self.config.models_dir / "LatentSync",
         }
-        
+        return engine_paths.get(engine)
+    
+    def _is_engine_installed(self, engine: AvatarEngine) -> bool:
+        """Vérifie si un moteur est installé."""
         if engine == AvatarEngine.REPLICATE_SADTALKER:
             return bool(self.config.replicate_token or os.getenv("REPLICATE_API_TOKEN"))
         
-        path = engine_paths.get(engine)
-        return path and path.exists()
+        path = self._engine_dir(engine)
+        return bool(path and path.exists())
     
     # ──────────────────────────────────────────────────────────────────────────
     # INSTALLATION AUTOMATIQUE
@@ -310,16 +336,28 @@ class AvatarVideoGenerator:
         audio_path = Path(audio_path)
         output_path = Path(output_path)
         
-        # Auto-sélection du meilleur moteur disponible
-        if engine is None:
-            engine = self._select_best_engine()
-        
-        if not self.installed_engines.get(engine.value, False):
-            logger.warning(f"{engine.value} non installé, utilisation de Replicate...")
-            engine = AvatarEngine.REPLICATE_SADTALKER
+        requested = engine or self._select_best_engine()
+        engine = self.resolve_engine(engine)
+        if engine != requested:
+            logger.warning(f"{requested.value} non installé, utilisation de Replicate...")
         
         logger.info(f"🎭 Génération avec {engine.value}...")
         
+        # Worker chaud: modèles déjà en mémoire, pas de nouveau processus
+        if self.config.use_warm_workers and self.workers.supports(engine.value):
+            try:
+                result = await self.workers.render(
+                    engine.value, self._engine_dir(engine), image_path, audio_path, output_path,
+                    self._worker_options()
+                )
+            except AvatarRenderError as e:
+                logger.error(f"{engine.value} erreur (worker): {e}")
+                return None
+            if result:
+                logger.info(f"✅ Vidéo {engine.value} (worker): {result}")
+                return result
+            logger.warning(f"Worker {engine.value} indisponible, lancement classique...")
+        
         # Dispatch vers le bon générateur
         generators = {
             AvatarEngine.SADTALKER: self._generate_sadtalker,
@@ -338,6 +376,29 @@ class AvatarVideoGenerator:
         
         return await generator(image_path, audio_path, output_path, **kwargs)
     
+    def _worker_options(self) -> Dict[str, Any]:
+        """Options de rendu transmises aux workers persistants."""
+        return {
+            "size": self.config.sadtalker_size,
+            "preprocess": self.config.preprocess,
+            "still_mode": self.config.still_mode,
+            "expression_scale": self.config.expression_scale,
+            "use_enhancer": self.config.use_enhancer,
+        }
+    
+    async def shutdown(self):
+        """Arrête les workers persistants."""
+        await self.workers.shutdown()
+    
+    def resolve_engine(self, engine: Optional[AvatarEngine] = None) -> AvatarEngine:
+        """Moteur réellement utilisé par `generate` pour `engine`."""
+        # Auto-sélection du meilleur moteur disponible
+        if engine is None:
+            engine = self._select_best_engine()
+        if not self.installed_engines.get(engine.value, False):
+            return AvatarEngine.REPLICATE_SADTALKER
+        return engine
+    
     def _select_best_engine(self) -> AvatarEngine:
         """Sélectionne le meilleur moteur disponible."""
         # Priorité: OpenVINO > SadTalker > MuseTalk > Replicate
@@ -376,6 +437,7 @@ class AvatarVideoGenerator:
             --source_image "{image_path}" \
             --result_dir "{output_path.parent}" \
             --preprocess {self.config.preprocess} \
+            --size {self.config.sadtalker_size} \
             --still \
             --expression_scale {self.config.expression_scale} \
             {"--enhancer gfpgan" if self.config.use_enhancer else ""}
@@ -655,7 +717,10 @@ class AvatarVideoGenerator:
         rate: Optional[str] = None
     ) -> Optional[Path]:
         """
-        Génère l'audio TTS avec Edge-TTS.
+        Génère l'audio TTS avec Edge-TTS (moteur en process de voice_service).
+        
+        Phrases synthétisées en parallèle et mises en cache; les timings mot
+        à mot sont écrits à côté ({nom}.words.json).
         
         Args:
             text: Texte à convertir en speech
@@ -670,25 +735,15 @@ class AvatarVideoGenerator:
         voice = voice or self.config.tts_voice
         rate = rate or self.config.tts_rate
         
-        # Nettoyer le texte
-        clean_text = text.replace('"', '').replace("'", "'")
-        
-        cmd = f'edge-tts --voice "{voice}" --rate="{rate}" --text "{clean_text}" --write-media "{output_path}"'
-        
-        try:
-            process = await asyncio.create_subprocess_shell(
-                cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-            await process.communicate()
-            
-            if output_path.exists():
-                logger.info(f"✅ Audio TTS: {output_path}")
-                return output_path
-                
-        except Exception as e:
-            logger.error(f"Erreur TTS: {e}")
+        result = await tts_service.synthesize_timed(text, voice=voice, rate=rate)
+        if not result:
+            logger.error(f"Erreur TTS: {output_path}")
+            return None
         
-        return None
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(result.save, str(output_path))
+        logger.info(f"✅ Audio TTS: {output_path}")
+        return output_path
     
     async def enhance_video(
         self, 
@@ -741,7 +796,12 @@ class AvatarVideoGenerator:
                 "openvino_device": self.config.openvino_device,
                 "tts_voice": self.config.tts_voice
             },
-            "recommended_engine": self._select_best_engine().value
+            "recommended_engine": self._select_best_engine().value,
+            "warm_workers": {
+                "enabled": self.config.use_warm_workers,
+                "engines": [e for e, ok in self.installed_engines.items() if ok and self.workers.supports(e)],
+                "workers": self.workers.get_stats(),
+            }
         }
 
 
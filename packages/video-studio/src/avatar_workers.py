@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 AVATAR WORKERS - Moteurs d'avatar chauds (processus persistants)
+====================================================================
+Au lieu de relancer `python inference.py` (et de recharger plusieurs Go de
+poids) pour chaque clip intro/outro, un worker par moteur installé garde
+ses modèles en mémoire et traite les rendus un par un depuis une file.
+
+- Communication par pipe (stdin/stdout, une ligne JSON par message),
+  serveur: avatar_engine_server.py
+- Contrôle de santé (ping) périodique et avant usage après inactivité
+- Redémarrage automatique après crash ou blocage (timeout de rendu),
+  avec backoff; abandon après MAX_LOAD_FAILURES échecs de chargement
+  consécutifs (état "failed", seul un nouveau rendu retente)
+- Statistiques exposées par AvatarVideoGenerator.get_status()["workers"]
+
+Moteurs servis à chaud: ceux de avatar_engine_server.ENGINES (SadTalker,
+Wav2Lip). Les autres gardent le lancement par sous-processus.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("AvatarWorkers")
+
+SERVER_SCRIPT = Path(__file__).with_name("avatar_engine_server.py")
+
+# Moteurs disposant d'un adaptateur persistant (cf. avatar_engine_server.ENGINES)
+WARM_ENGINES = ("sadtalker", "wav2lip")
+
+# Échecs de chargement consécutifs avant de cesser les redémarrages automatiques
+MAX_LOAD_FAILURES = 3
+
+
+class AvatarRenderError(Exception):
+    """Le moteur a refusé le rendu (visage introuvable...): inutile de réessayer ailleurs."""
+
+
+class AvatarWorker:
+    """Un processus moteur persistant et sa file de rendus."""
+
+    def __init__(
+        self,
+        engine: str,
+        engine_dir: Path,
+        log_dir: Path,
+        command: Optional[List[str]] = None,
+        preload: Optional[Dict[str, Any]] = None,
+        load_timeout: float = 600.0,
+        render_timeout: float = 1800.0,
+        ping_timeout: float = 15.0,
+    ):
+        self.engine = engine
+        self.engine_dir = Path(engine_dir)
+        self.log_path = Path(log_dir) / f"{engine}_worker.log"
+        self.command = command or [
+            sys.executable, "-u", str(SERVER_SCRIPT),
+            "--engine", engine, "--engine-dir", str(self.engine_dir),
+            *(arg for name, value in (preload or {}).items() for arg in (f"--{name}", str(value))),
+        ]
+        self.load_timeout = load_timeout
+        self.render_timeout = render_timeout
+        self.ping_timeout = ping_timeout
+
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.state = "stopped"  # stopped, starting, ready, busy, dead, failed
+        self._lock: Optional[asyncio.Lock] = None
+        self._ids = itertools.count(1)
+        self._log = None
+        self._failures_in_row = 0
+
+        self.started_at = 0.0
+        self.last_load_time = 0.0
+        self.restarts = 0
+        self.jobs = 0
+        self.failures = 0
+        self.render_time = 0.0
+        self.last_ping_ms: Optional[float] = None
+        self.last_error = ""
+        self.rss_mb: Optional[float] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # CYCLE DE VIE
+    # ──────────────────────────────────────────────────────────────────────────
+
+    async def start(self) -> bool:
+        """Lance le processus et attend le chargement des modèles."""
+        if self.alive and self.state in ("ready", "busy"):
+            return True
+        await self.stop()
+        if self._failures_in_row:
+            # Backoff: 2s, 4s, 8s... (max 60s) après des échecs consécutifs
+            await asyncio.sleep(min(60, 2 ** self._failures_in_row))
+
+        self.state = "starting"
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._log = open(self.log_path, "ab")
+        t0 = time.perf_counter()
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=self._log,
+                limit=1 << 20,
+            )
+            message = await asyncio.wait_for(self._read(), self.load_timeout)
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            message = {"event": "error", "error": f"{type(e).__name__}: {e}"}
+
+        if message.get("event") != "ready":
+            self.last_error = message.get("error", "arrêt pendant le chargement")
+            logger.error(f"❌ Worker {self.engine} non démarré: {self.last_error} (voir {self.log_path})")
+            self._failures_in_row += 1
+            await self.stop()
+            if self._failures_in_row >= MAX_LOAD_FAILURES:
+                # Moteur cassé (poids manquants, CUDA...): plus de relance par le contrôle de santé
+                logger.error(f"⛔ Worker {self.engine} abandonné après {self._failures_in_row} échecs consécutifs")
+                self.state = "failed"
+            else:
+                self.state = "dead"
+            return False
+
+        self.last_load_time = round(time.perf_counter() - t0, 2)
+        if self.started_at:
+            self.restarts += 1
+        self.started_at = time.time()
+        self.state = "ready"
+        logger.info(f"🔥 Worker {self.engine} prêt (pid {self.process.pid}, modèles chargés en {self.last_load_time}s)")
+        return True
+
+    async def stop(self):
+        """Arrête le processus (proprement si possible)."""
+        process, self.process = self.process, None
+        if process is not None and process.returncode is None:
+            try:
+                process.stdin.write(b'{"op": "shutdown"}\n')
+                await process.stdin.drain()
+                await asyncio.wait_for(process.wait(), 5)
+            except (OSError, asyncio.TimeoutError, ConnectionError):
+                process.kill()
+                await process.wait()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        self.state = "stopped"
+
+    async def restart(self, reason: str) -> bool:
+        logger.warning(f"♻️ Redémarrage du worker {self.engine}: {reason}")
+        self.last_error = reason
+        await self.stop()
+        return await self.start()
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # PROTOCOLE
+    # ──────────────────────────────────────────────────────────────────────────
+
+    async def _read(self) -> Dict[str, Any]:
+        line = await self.process.stdout.readline()
+        if not line:
+            raise ConnectionError(f"worker {self.engine} terminé (code {self.process.returncode})")
+        return json.loads(line)
+
+    async def _request(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        payload["id"] = next(self._ids)
+        self.process.stdin.write((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+        while True:
+            message = await asyncio.wait_for(self._read(), timeout)
+            if message.get("id") == payload["id"]:
+                return message
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def ping(self) -> bool:
+        """Contrôle de santé: le worker répond-il (et avec quelle mémoire) ?"""
+        if not self.alive:
+            return False
+        async with self._get_lock():
+            return await self._ping_locked()
+
+    async def _ping_locked(self) -> bool:
+        if not self.alive:
+            return False
+        t0 = time.perf_counter()
+        try:
+            response = await self._request({"op": "ping"}, self.ping_timeout)
+        except (asyncio.TimeoutError, ConnectionError, OSError, ValueError) as e:
+            self.last_error = f"ping: {type(e).__name__}: {e}"
+            return False
+        self.last_ping_ms = round((time.perf_counter() - t0) * 1000, 1)
+        self.rss_mb = response.get("rss_mb")
+        return bool(response.get("ok"))
+
+    async def render(
+        self, image: Path, audio: Path, output: Path, options: Dict[str, Any]
+    ) -> Optional[Path]:
+        """
+        Rendu d'un clip (un à la fois par worker); (re)démarre le worker si besoin.
+        
+        None si le worker est indisponible (l'appelant peut lancer le moteur
+        autrement); AvatarRenderError si le moteur a refusé le rendu.
+        """
+        async with self._get_lock():
+            if self.state == "failed":
+                # Une seule nouvelle tentative par rendu: un échec de plus repasse en "failed"
+                self._failures_in_row = MAX_LOAD_FAILURES - 1
+            if not self.alive or self.state in ("dead", "failed"):
+                if not await self.start():
+                    return None
+            elif not await self._ping_locked():
+                if not await self.restart(self.last_error or "ping sans réponse"):
+                    return None
+
+            self.state = "busy"
+            payload = {
+                "op": "render",
+                "image": str(Path(image).resolve()),
+                "audio": str(Path(audio).resolve()),
+                "output": str(Path(output).resolve()),
+                "options": options,
+            }
+            try:
+                response = await self._request(payload, self.render_timeout)
+            except (asyncio.TimeoutError, ConnectionError, OSError, ValueError) as e:
+                # Worker planté ou bloqué: relancé au prochain rendu ou contrôle de santé
+                self.failures += 1
+                self._failures_in_row += 1
+                self.last_error = f"rendu: {type(e).__name__}: {e}"
+                logger.error(f"❌ Worker {self.engine} perdu ({self.last_error})")
+                await self.stop()
+                self.state = "dead"
+                return None
+
+            self.state = "ready"
+            if not response.get("ok"):
+                self.failures += 1
+                self.last_error = response.get("error", "")
+                raise AvatarRenderError(self.last_error)
+
+            self._failures_in_row = 0
+            self.jobs += 1
+            self.render_time += response.get("elapsed", 0.0)
+            return Path(response["output"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state if self.alive or self.state in ("dead", "failed") else "stopped",
+            "pid": self.process.pid if self.alive else None,
+            "uptime_s": round(time.time() - self.started_at) if self.alive else 0,
+            "load_time_s": self.last_load_time,
+            "jobs": self.jobs,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "avg_render_s": round(self.render_time / self.jobs, 2) if self.jobs else None,
+            "last_ping_ms": self.last_ping_ms,
+            "rss_mb": self.rss_mb,
+            "last_error": self.last_error,
+            "log": str(self.log_path),
+        }
+
+
+class AvatarWorkerPool:
+    """Un worker chaud par moteur, démarré à la première demande."""
+
+    def __init__(self, log_dir: Path, health_interval: float = 60.0, preload: Optional[Dict[str, Any]] = None):
+        self.log_dir = Path(log_dir)
+        self.health_interval = health_interval
+        self.preload = preload or {}
+        self.workers: Dict[str, AvatarWorker] = {}
+        self._loop = None
+        self._monitor: Optional[asyncio.Task] = None
+
+    def supports(self, engine: str) -> bool:
+        return engine in WARM_ENGINES
+
+    def _reset_for_loop(self):
+        """Processus asyncio liés à leur boucle: nouveaux workers par asyncio.run()."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._monitor = None
+            for worker in self.workers.values():
+                # L'ancien processus s'arrête seul (stdin fermé avec l'ancienne boucle)
+                worker.process = None
+                worker.state = "stopped"
+                worker._lock = None
+
+    def get_worker(self, engine: str, engine_dir: Path) -> AvatarWorker:
+        self._reset_for_loop()
+        worker = self.workers.get(engine)
+        if worker is None:
+            worker = self.workers[engine] = AvatarWorker(engine, engine_dir, self.log_dir, preload=self.preload)
+        if self._monitor is None or self._monitor.done():
+            self._monitor = asyncio.get_running_loop().create_task(self._health_loop())
+        return worker
+
+    async def render(
+        self, engine: str, engine_dir: Path, image: Path, audio: Path, output: Path, options: Dict[str, Any]
+    ) -> Optional[Path]:
+        return await self.get_worker(engine, engine_dir).render(image, audio, output, options)
+
+    async def _health_loop(self):
+        """
+        Ping les workers inactifs; relance ceux qui ne répondent plus ou ont planté.
+        
+        Les workers "failed" ne sont pas relancés ici (cf. MAX_LOAD_FAILURES).
+        """
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for worker in list(self.workers.values()):
+                if worker._get_lock().locked():
+                    continue
+                if worker.state == "dead":
+                    async with worker._get_lock():
+                        await worker.restart(worker.last_error or "crash")
+                elif worker.state == "ready" and not await worker.ping():
+                    async with worker._get_lock():
+                        await worker.restart(worker.last_error or "ping sans réponse")
+
+    async def shutdown(self):
+        """Arrête tous les workers (fin de batch, arrêt du service)."""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        await asyncio.gather(*(worker.stop() for worker in self.workers.values()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {engine: worker.get_stats() for engine, worker in self.workers.items()}
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""
+📦 BATCH SCHEDULER - Production vidéo en masse
+===============================================
+Produit plusieurs vidéos en parallèle sans qu'elles se marchent dessus:
+
+- Dossier de travail isolé par job (`temp_dir/jobs/<id>`): plus de
+  `section_0.mp4`, `intro.mp3` ou `concat.txt` partagés entre vidéos
+- Pool de workers dimensionné selon les cœurs et la mémoire disponible
+- File de jobs persistante (SQLite): après un crash, les jobs "running"
+  repassent "pending" et la production reprend là où elle s'était arrêtée
+- Un job est identifié par son id ET une empreinte de ses paramètres
+  (titre, avatar, options de rendu): un id réutilisé pour une autre vidéo
+  repart de zéro au lieu de renvoyer l'ancienne sortie. Relancer un batch
+  redonne leurs tentatives aux jobs en échec
+- Limites par étape (LLM, TTS, avatar, ffmpeg) partagées par tous les jobs
+  via le `ResourcePool` du producteur
+
+Usage:
+```python
+producer = HeyGenOpenSource()
+videos = await producer.batch_produce(VIDEO_TOPICS, start_id=1)
+
+# Reprise après crash: mêmes arguments, les vidéos terminées sont sautées
+videos = await producer.batch_produce(VIDEO_TOPICS, start_id=1)
+```
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from services.production_graph import cpu_cores
+except ImportError:
+    from production_graph import cpu_cores
+
+logger = logging.getLogger("BatchScheduler")
+
+# ══════════════════════════════════════════════════════════════════════════════
+# DIMENSIONNEMENT
+# ══════════════════════════════════════════════════════════════════════════════
+
+def available_memory_gb() -> Optional[float]:
+    """Mémoire disponible (psutil si installé, sinon /proc/meminfo)."""
+    try:
+        import psutil
+        return psutil.virtual_memory().available / 1024**3
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024**2
+    except OSError:
+        pass
+    return None
+
+
+def worker_count(job_memory_gb: float, max_workers: int = 0) -> int:
+    """
+    Vidéos produites simultanément.
+
+    Une vidéo occupe ~2 cœurs en pointe (encodage + rendu avatar) et
+    `job_memory_gb` de RAM (modèles avatar, frames ffmpeg).
+    """
+    workers = max(1, cpu_cores() // 2)
+    memory = available_memory_gb()
+    if memory is not None and job_memory_gb > 0:
+        workers = min(workers, max(1, int(memory // job_memory_gb)))
+    if max_workers:
+        workers = min(workers, max_workers)
+    return workers
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FILE DE JOBS PERSISTANTE
+# ══════════════════════════════════════════════════════════════════════════════
+
+# Champs de VideoConfig qui changent la vidéo produite
+OUTPUT_OPTIONS = (
+    "voice", "voice_rate", "avatar_engine", "use_real_photo", "resolution", "fps",
+    "use_enhancer", "burn_subtitles", "assembly_mode", "x264_preset", "x264_crf",
+    "x264_tune", "add_background_music", "music_volume",
+)
+
+
+def job_fingerprint(title: str, avatar_style: str, config: Any = None) -> str:
+    """Empreinte des paramètres d'un job: titre, avatar et options de rendu."""
+    options = {name: getattr(config, name) for name in OUTPUT_OPTIONS if hasattr(config, name)}
+    data = json.dumps([title, avatar_style, options], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+    """Jobs de production dans SQLite (WAL), survivant aux redémarrages."""
+
+    def __init__(self, db_path: Path):
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                video_id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                avatar_style TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                output TEXT,
+                error TEXT,
+                duration REAL,
+                updated_at REAL NOT NULL,
+                fingerprint TEXT
+            )
+        """)
+        # Bases créées avant l'empreinte: les jobs existants seront réinitialisés
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        if "fingerprint" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN fingerprint TEXT")
+        self._conn.commit()
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._conn.commit()
+            return rows
+
+    def enqueue(self, video_id: int, title: str, avatar_style: str, fingerprint: str = ""):
+        """
+        Ajoute un job. S'il existe déjà avec la même empreinte, il garde son
+        état (terminé, en échec...); avec d'autres paramètres, il est remplacé
+        et repart de zéro.
+        """
+        fingerprint = fingerprint or job_fingerprint(title, avatar_style)
+        self._execute(
+            """INSERT INTO jobs (video_id, title, avatar_style, fingerprint, updated_at) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(video_id) DO UPDATE SET
+                   title = excluded.title, avatar_style = excluded.avatar_style,
+                   fingerprint = excluded.fingerprint, status = 'pending', attempts = 0,
+                   output = NULL, error = NULL, duration = NULL, updated_at = excluded.updated_at
+               WHERE jobs.fingerprint IS NOT excluded.fingerprint""",
+            (video_id, title, avatar_style, fingerprint, time.time()),
+        )
+
+    def recover(self) -> int:
+        """Remet en attente les jobs interrompus par un crash."""
+        rows = self._execute(
+            "UPDATE jobs SET status = 'pending', updated_at = ? WHERE status = 'running' RETURNING video_id",
+            (time.time(),),
+        )
+        return len(rows)
+
+    def claim(self, video_ids: List[int]) -> Optional[Dict[str, Any]]:
+        """Prend le prochain job en attente parmi `video_ids` (ordre croissant)."""
+        if not video_ids:
+            return None
+        marks = ",".join("?" * len(video_ids))
+        rows = self._execute(
+            f"""UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ?
+                WHERE video_id = (
+                    SELECT video_id FROM jobs WHERE status = 'pending' AND video_id IN ({marks})
+                    ORDER BY video_id LIMIT 1
+                )
+                RETURNING video_id, title, avatar_style, attempts""",
+            (time.time(), *video_ids),
+        )
+        if not rows:
+            return None
+        video_id, title, avatar_style, attempts = rows[0]
+        return {"video_id": video_id, "title": title, "avatar_style": avatar_style, "attempts": attempts}
+
+    def finish(self, video_id: int, output: Optional[Path], error: str = "", duration: float = 0.0):
+        status = "done" if output else "failed"
+        self._execute(
+            "UPDATE jobs SET status = ?, output = ?, error = ?, duration = ?, updated_at = ? WHERE video_id = ?",
+            (status, str(output) if output else None, error[:500], round(duration, 1), time.time(), video_id),
+        )
+
+    def retry_failed(self, video_ids: List[int], max_attempts: int) -> int:
+        """Remet en attente les échecs qui n'ont pas épuisé leurs tentatives."""
+        if not video_ids:
+            return 0
+        marks = ",".join("?" * len(video_ids))
+        rows = self._execute(
+            f"""UPDATE jobs SET status = 'pending' WHERE status = 'failed'
+                AND attempts < ? AND video_id IN ({marks}) RETURNING video_id""",
+            (max_attempts, *video_ids),
+        )
+        return len(rows)
+
+    def requeue(self, video_ids: List[int]) -> int:
+        """
+        Nouvelle soumission: les jobs en échec retrouvent toutes leurs
+        tentatives, les jobs terminés dont la vidéo a disparu sont refaits.
+        """
+        if not video_ids:
+            return 0
+        marks = ",".join("?" * len(video_ids))
+        done = self._execute(
+            f"SELECT video_id, output FROM jobs WHERE status = 'done' AND video_id IN ({marks})",
+            tuple(video_ids),
+        )
+        missing = [video_id for video_id, output in done if not output or not Path(output).exists()]
+        rows = self._execute(
+            f"""UPDATE jobs SET status = 'pending', attempts = 0, output = NULL, updated_at = ?
+                WHERE (status = 'failed' AND video_id IN ({marks}))
+                   OR video_id IN ({",".join("?" * len(missing)) or "NULL"})
+                RETURNING video_id""",
+            (time.time(), *video_ids, *missing),
+        )
+        return len(rows)
+
+    def outputs(self, video_ids: List[int]) -> List[Path]:
+        """Vidéos terminées parmi `video_ids`, dans l'ordre des ids."""
+        if not video_ids:
+            return []
+        marks = ",".join("?" * len(video_ids))
+        rows = self._execute(
+            f"SELECT output FROM jobs WHERE status = 'done' AND video_id IN ({marks}) ORDER BY video_id",
+            tuple(video_ids),
+        )
+        return [Path(output) for (output,) in rows if output and Path(output).exists()]
+
+    def get_stats(self) -> Dict[str, Any]:
+        rows = self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {"db": str(self.db_path), **{status: count for status, count in rows}}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ORDONNANCEUR
+# ══════════════════════════════════════════════════════════════════════════════
+
+class BatchScheduler:
+    """
+    Pool de workers asynchrones consommant la file de jobs.
+
+    Chaque job tourne sur un clone du producteur (`producer.for_job`) dont le
+    `temp_dir` est propre au job; les limites d'étapes restent partagées.
+    """
+
+    def __init__(self, producer, queue: Optional[JobQueue] = None, workers: int = 0):
+        self.producer = producer
+        config = producer.config
+        self.jobs_dir = config.temp_dir / "jobs"
+        self.queue = queue or JobQueue(config.output_dir / "batch_queue.db")
+        self.workers = workers or worker_count(config.job_memory_gb, config.max_parallel_videos)
+        self.max_attempts = config.max_job_attempts
+
+    async def _run_job(self, job: Dict[str, Any]) -> Optional[Path]:
+        video_id = job["video_id"]
+        work_dir = self.jobs_dir / str(video_id)
+        # Repartir d'un dossier propre (reste éventuel d'un run interrompu)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        producer = self.producer.for_job(work_dir)
+
+        start = time.perf_counter()
+        output, error = None, ""
+        try:
+            output = await producer.produce_video(job["title"], video_id, job["avatar_style"])
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Erreur production {job['title']}: {e}")
+        duration = time.perf_counter() - start
+
+        self.queue.finish(video_id, output, error or ("" if output else "production échouée"), duration)
+        if output:
+            # Les fichiers intermédiaires ne servent plus; gardés en cas d'échec
+            shutil.rmtree(work_dir, ignore_errors=True)
+        return output
+
+    async def _worker(self, video_ids: List[int]):
+        while True:
+            job = self.queue.claim(video_ids)
+            if job is None:
+                return
+            logger.info(f"▶️ Job {job['video_id']} (tentative {job['attempts']}): {job['title']}")
+            await self._run_job(job)
+
+    async def run(self, jobs: List[Dict[str, Any]]) -> List[Path]:
+        """
+        Produit les jobs [{video_id, title, avatar_style}] et renvoie les vidéos
+        terminées (y compris celles d'un run précédent).
+        """
+        config = self.producer.config
+        for job in jobs:
+            fingerprint = job_fingerprint(job["title"], job["avatar_style"], config)
+            self.queue.enqueue(job["video_id"], job["title"], job["avatar_style"], fingerprint)
+        recovered = self.queue.recover()
+        if recovered:
+            logger.info(f"♻️ {recovered} job(s) interrompu(s) remis en file")
+
+        video_ids = [job["video_id"] for job in jobs]
+        requeued = self.queue.requeue(video_ids)
+        if requeued:
+            logger.info(f"🔁 {requeued} job(s) en échec ou sans vidéo remis en file")
+        already_done = len(self.queue.outputs(video_ids))
+        start = time.perf_counter()
+
+        logger.info(f"📦 Batch: {len(jobs)} vidéos ({already_done} déjà faites), {self.workers} workers")
+        while True:
+            await asyncio.gather(*(self._worker(video_ids) for _ in range(self.workers)))
+            if not self.queue.retry_failed(video_ids, self.max_attempts):
+                break
+
+        elapsed = time.perf_counter() - start
+        results = self.queue.outputs(video_ids)
+        produced = len(results) - already_done
+        per_hour = produced * 3600 / elapsed if elapsed and produced else 0.0
+        logger.info(
+            f"\n📊 Batch terminé: {len(results)}/{len(jobs)} vidéos produites "
+            f"({produced} en {elapsed / 60:.1f} min, {per_hour:.1f} vidéos/heure)"
+        )
+        logger.info(f"   Ressources: {self.producer.resources.get_stats()}")
+        await self.producer.avatar_generator.shutdown()
+        return results
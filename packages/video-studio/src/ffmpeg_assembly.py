@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+🎞️ FFMPEG ASSEMBLY - Filtres vidéo et montage en un seul encodage
+==================================================================
+Filtres partagés par les deux modes de montage de HeyGenOpenSource:
+
+- "per_section": un ffmpeg par section (encodages en parallèle) puis
+  concaténation `-c copy`
+- "single_pass": un seul graphe filter_complex pour toute la vidéo
+  (zoompan, sous-titres, fondus, normalisation des clips avatar, concat)
+  et un seul encodage: pas de fichiers intermédiaires ni de ré-encodage
+
+Les sous-titres passent par `textfile=` (fichiers relatifs au dossier de
+travail, ffmpeg lancé avec cwd): aucun échappement d'apostrophes ou de
+deux-points à gérer, même avec des chemins Windows.
+
+Benchmark des deux modes: `python scripts/bench_assembly.py`.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RÉGLAGES D'ENCODAGE
+# ══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class EncodeSettings:
+    """Réglages libx264/AAC, identiques quel que soit le matériel."""
+    preset: str = "veryfast"   # ultrafast ... veryslow: vitesse vs taille
+    crf: int = 23              # Qualité constante (plus bas = meilleur)
+    tune: str = ""             # "", "stillimage", "film"...
+    audio_bitrate: str = "128k"
+    threads: int = 0           # 0 = automatique
+
+    def video_args(self) -> List[str]:
+        args = ["-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf)]
+        if self.tune:
+            args += ["-tune", self.tune]
+        if self.threads:
+            args += ["-threads", str(self.threads)]
+        return args + ["-pix_fmt", "yuv420p"]
+
+    def audio_args(self) -> List[str]:
+        return ["-c:a", "aac", "-b:a", self.audio_bitrate]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FILTRES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def subtitle_lines(text: str, width: int = 50, max_lines: int = 2) -> str:
+    """Sous-titre de `max_lines` lignes d'environ `width` caractères."""
+    lines, line = [], []
+    for word in text.split():
+        line.append(word)
+        if len(" ".join(line)) > width:
+            lines.append(" ".join(line))
+            line = []
+    if line:
+        lines.append(" ".join(line))
+    return "\n".join(lines[:max_lines])
+
+
+def section_video_filter(
+    duration: float,
+    size: Tuple[int, int],
+    fps: int,
+    subtitle_file: Optional[str] = None,
+) -> str:
+    """Image fixe → plan avec zoom lent, fondus et sous-titres (image non bouclée en entrée)."""
+    w, h = size
+    frames = max(1, round(duration * fps))
+    chain = [
+        f"scale={w}:{h}:force_original_aspect_ratio=increase,crop={w}:{h}",
+        f"zoompan=z='min(zoom+0.0005,1.1)':d={frames}:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':s={w}x{h}:fps={fps}",
+        f"fade=t=in:st=0:d=0.5,fade=t=out:st={max(0.0, duration - 0.5):.3f}:d=0.5",
+    ]
+    if subtitle_file:
+        chain += [
+            "drawbox=y=ih-140:color=black@0.5:width=iw:height=110:t=fill",
+            f"drawtext=textfile={subtitle_file}:fontcolor=white:fontsize=36:x=(w-text_w)/2:y=h-100:font=Arial",
+        ]
+    chain.append("setsar=1,format=yuv420p")
+    return ",".join(chain)
+
+
+def avatar_video_filter(duration: float, size: Tuple[int, int], fps: int) -> str:
+    """Clip avatar (512x512, 25 fps...) → cadre de la vidéo, calé sur la durée de l'audio."""
+    w, h = size
+    return (
+        f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+        f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,fps={fps},"
+        f"tpad=stop_mode=clone:stop_duration=2,trim=duration={duration:.3f},"
+        f"setpts=PTS-STARTPTS,setsar=1,format=yuv420p"
+    )
+
+
+def audio_filter(duration: float) -> str:
+    """Audio normalisé (44.1 kHz stéréo) et calé exactement sur `duration`."""
+    return (
+        f"aresample=44100,aformat=sample_fmts=fltp:channel_layouts=stereo,"
+        f"apad,atrim=duration={duration:.3f},asetpts=PTS-STARTPTS"
+    )
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MONTAGE EN UN SEUL ENCODAGE
+# ══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class Segment:
+    """Un plan de la vidéo finale: section illustrée (image) ou clip avatar (video)."""
+    audio: Path
+    duration: float
+    image: Optional[Path] = None
+    video: Optional[Path] = None
+    subtitle_file: Optional[str] = None
+
+
+def single_pass_args(
+    segments: List[Segment],
+    output: Path,
+    size: Tuple[int, int],
+    fps: int,
+    settings: EncodeSettings,
+) -> List[str]:
+    """Arguments ffmpeg (sans l'exécutable) pour monter `segments` en un encodage."""
+    inputs: List[str] = []
+    graph: List[str] = []
+    labels: List[str] = []
+
+    for k, seg in enumerate(segments):
+        visual, sound = 2 * k, 2 * k + 1
+        if seg.video is not None:
+            inputs += ["-i", str(seg.video)]
+            vf = avatar_video_filter(seg.duration, size, fps)
+        else:
+            inputs += ["-i", str(seg.image)]
+            vf = section_video_filter(seg.duration, size, fps, seg.subtitle_file)
+        inputs += ["-i", str(seg.audio)]
+        graph.append(f"[{visual}:v]{vf}[v{k}]")
+        graph.append(f"[{sound}:a]{audio_filter(seg.duration)}[a{k}]")
+        labels.append(f"[v{k}][a{k}]")
+
+    graph.append(f"{''.join(labels)}concat=n={len(segments)}:v=1:a=1[v][a]")
+
+    return [
+        "-y", "-hide_banner", "-loglevel", "error",
+        *inputs,
+        "-filter_complex", ";".join(graph),
+        "-map", "[v]", "-map", "[a]",
+        *settings.video_args(), "-r", str(fps),
+        *settings.audio_args(),
+        "-movflags", "+faststart",
+        str(output),
+    ]
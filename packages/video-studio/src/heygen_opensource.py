@@ -31,7 +31,10 @@ import subprocess
 import json
 import requests
 import random
+import hashlib
 import logging
+import copy
+import dataclasses
 from pathlib import Path
 from typing import Optional, Dict, List, Any
 from dataclasses import dataclass
@@ -40,9 +43,30 @@ import httpx
 # Importer notre générateur d'avatar
 try:
     from services.avatar_video_generator import AvatarVideoGenerator, AvatarEngine, AvatarConfig
+    from services.production_graph import ProductionGraph, ResourcePool, cpu_cores, encode_slots, encode_threads
+    from services.batch_scheduler import BatchScheduler
+    from services.artifact_cache import ArtifactCache
+    from services.media_probe import probe_duration
+    from services.ffmpeg_assembly import (
+        EncodeSettings, Segment, audio_filter, section_video_filter, single_pass_args, subtitle_lines
+    )
 except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
     from avatar_video_generator import AvatarVideoGenerator, AvatarEngine, AvatarConfig
+    from production_graph import ProductionGraph, ResourcePool, cpu_cores, encode_slots, encode_threads
+    from batch_scheduler import BatchScheduler
+    from artifact_cache import ArtifactCache
+    from media_probe import probe_duration
+    from ffmpeg_assembly import (
+        EncodeSettings, Segment, audio_filter, section_video_filter, single_pass_args, subtitle_lines
+    )
+
+# Moteur TTS partagé avec l'API (brain-core/src/voice/voice_service.py)
+try:
+    from services.voice_service import format_srt, subtitle_cues, tts_service, words_path
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "brain-core" / "src" / "voice"))
+    from voice_service import format_srt, subtitle_cues, tts_service, words_path
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -58,6 +82,7 @@ class VideoConfig:
     # Dossiers
     output_dir: Path = Path("d:/moteur israelien/heygen_videos_opensource")
     temp_dir: Path = Path("d:/moteur israelien/temp_heygen_opensource")
+    cache_dir: Path = Path("d:/moteur israelien/heygen_artifact_cache")
     
     # API Keys
     groq_key: str = os.getenv("GROQ_API_KEY", "")
@@ -75,6 +100,32 @@ class VideoConfig:
     resolution: tuple = (1920, 1080)
     fps: int = 25
     use_enhancer: bool = True
+    burn_subtitles: bool = True
+    
+    # Montage: "single_pass" (un seul encodage filter_complex) ou
+    # "per_section" (un ffmpeg par section puis concat)
+    assembly_mode: str = "single_pass"
+    x264_preset: str = "veryfast"
+    x264_crf: int = 23
+    x264_tune: str = ""
+    
+    # Parallélisme par étape, partagé par toutes les vidéos en cours (0 = auto)
+    max_llm: int = 2               # Générations de script simultanées
+    max_tts: int = 4               # Clips TTS synthétisés simultanément
+    tts_sentence_parallelism: int = 3  # Phrases synthétisées en parallèle par clip
+    max_network: int = 6           # Autres appels HTTP (illustrations, photos)
+    max_avatar_renders: int = 2    # Rendus avatar simultanés (intro + outro)
+    max_encodes: int = 0           # Encodages ffmpeg simultanés
+    
+    # Cache d'artefacts (illustrations, rendus avatar; le TTS a son cache par
+    # phrase dans voice_service)
+    use_artifact_cache: bool = True
+    cache_max_gb: float = 20.0
+    
+    # Production batch
+    max_parallel_videos: int = 0   # 0 = selon cœurs et mémoire
+    job_memory_gb: float = 3.0     # RAM estimée par vidéo en cours
+    max_job_attempts: int = 2      # Tentatives par vidéo avant abandon
     
     # Musique
     add_background_music: bool = False
@@ -161,6 +212,46 @@ class HeyGenOpenSource:
             use_enhancer=self.config.use_enhancer
         )
         self.avatar_generator = AvatarVideoGenerator(avatar_config)
+        
+        # Encodages CPU-bound: quelques ffmpeg multi-threads plutôt qu'un par cœur
+        cores = cpu_cores()
+        self.encode_slots = self.config.max_encodes or encode_slots(cores)
+        self.encode_threads = encode_threads(self.encode_slots, cores)
+        self.encode_settings = EncodeSettings(
+            preset=self.config.x264_preset,
+            crf=self.config.x264_crf,
+            tune=self.config.x264_tune,
+        )
+        self.resources = ResourcePool({
+            "llm": self.config.max_llm,
+            "tts": self.config.max_tts,
+            "network": self.config.max_network,
+            "avatar": self.config.max_avatar_renders,
+            "ffmpeg": self.encode_slots,
+        })
+        self.artifacts: Optional[ArtifactCache] = None
+        if self.config.use_artifact_cache:
+            self.artifacts = ArtifactCache(
+                self.config.cache_dir, int(self.config.cache_max_gb * 1024**3)
+            )
+        self.last_report: Optional[Dict[str, Any]] = None
+    
+    async def _cached(self, key: str, dest: Path, produce) -> Optional[Path]:
+        """Artefact depuis le cache d'artefacts, sinon produit (et mis en cache)."""
+        if self.artifacts is None:
+            return await produce()
+        return await self.artifacts.cached(key, dest, produce)
+    
+    def for_job(self, work_dir: Path) -> "HeyGenOpenSource":
+        """
+        Producteur pour un job isolé: même générateur d'avatar et mêmes
+        limites d'étapes, mais fichiers temporaires dans `work_dir`.
+        """
+        job = copy.copy(self)
+        job.config = dataclasses.replace(self.config, temp_dir=Path(work_dir))
+        job.config.temp_dir.mkdir(parents=True, exist_ok=True)
+        job.last_report = None
+        return job
     
     # ──────────────────────────────────────────────────────────────────────────
     # GÉNÉRATION DE SCRIPT
@@ -258,43 +349,44 @@ Génère 4-5 sections. Réponds UNIQUEMENT avec le JSON valide."""
     
     async def generate_audio(self, text: str, filename: str) -> Optional[Path]:
         """
-        Génère l'audio avec Edge-TTS.
+        Génère l'audio avec Edge-TTS (moteur en process de voice_service).
         
-        Edge-TTS offre des voix naturelles et gratuites de haute qualité.
+        Les phrases sont synthétisées en parallèle puis recollées sans
+        ré-encodage; les phrases déjà dites (intro/outro récurrentes...) sont
+        lues depuis le cache. Les timings mot à mot sont écrits à côté du
+        clip ({nom}.words.json) pour les sous-titres.
         """
         audio_path = self.config.temp_dir / filename
         
         # Ajouter des pauses naturelles
         natural_text = text.replace(". ", "... ").replace("! ", "!... ").replace("? ", "?... ")
-        clean_text = natural_text.replace('"', '').replace("'", "'")
-        
-        cmd = f'edge-tts --voice "{self.config.voice}" --rate="{self.config.voice_rate}" --text "{clean_text}" --write-media "{audio_path}"'
         
-        try:
-            process = await asyncio.create_subprocess_shell(
-                cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-            await process.communicate()
-            
-            if audio_path.exists():
-                logger.info(f"✅ Audio: {audio_path.name}")
-                return audio_path
-                
-        except Exception as e:
-            logger.error(f"Erreur TTS: {e}")
+        result = await tts_service.synthesize_timed(
+            natural_text,
+            voice=self.config.voice,
+            rate=self.config.voice_rate,
+            concurrency=self.config.tts_sentence_parallelism,
+        )
+        if not result:
+            logger.error(f"Erreur TTS: {filename}")
+            return None
         
-        return None
+        await asyncio.to_thread(result.save, str(audio_path))
+        logger.info(f"✅ Audio: {audio_path.name} ({result.duration:.1f}s, {len(result.words)} mots)")
+        return audio_path
     
     # ──────────────────────────────────────────────────────────────────────────
     # TÉLÉCHARGEMENT AVATAR
     # ──────────────────────────────────────────────────────────────────────────
     
-    async def get_avatar_image(self, style: str = "professional_woman") -> Optional[Path]:
+    async def get_avatar_image(self, style: str = "professional_woman", seed: str = "") -> Optional[Path]:
         """
         Obtient une image d'avatar (photo Unsplash ou génération IA).
         
         Args:
             style: Style d'avatar souhaité
+            seed: Choix stable de la photo (même sujet = même photo, donc
+                mêmes clips avatar réutilisés depuis le cache)
             
         Returns:
             Chemin vers l'image de l'avatar
@@ -304,7 +396,8 @@ Génère 4-5 sections. Réponds UNIQUEMENT avec le JSON valide."""
         # 1. Essayer une photo Unsplash (libre de droits)
         if self.config.use_real_photo:
             photos = AVATAR_PHOTOS.get(style, AVATAR_PHOTOS["professional_woman"])
-            selected_url = random.choice(photos)
+            digest = hashlib.sha1(f"{style}:{seed}".encode("utf-8")).digest()
+            selected_url = photos[int.from_bytes(digest[:4], "big") % len(photos)]
             
             try:
                 async with httpx.AsyncClient() as client:
@@ -366,14 +459,21 @@ Génère 4-5 sections. Réponds UNIQUEMENT avec le JSON valide."""
         logger.info(f"🖼️ Illustration {index}: {prompt[:50]}...")
         
         enhanced_prompt = f"{prompt}, professional photography, high quality, 4k resolution, clean composition"
+        seed = index * 123
+        path = self.config.temp_dir / f"illustration_{index}.jpg"
+        
+        key = ArtifactCache.key("illustration", enhanced_prompt, 1920, 1080, seed)
+        return await self._cached(key, path, lambda: self._download_illustration(enhanced_prompt, seed, path))
+    
+    async def _download_illustration(self, enhanced_prompt: str, seed: int, path: Path) -> Optional[Path]:
+        """Téléchargement Pollinations vers `path`."""
         clean_prompt = enhanced_prompt.replace(" ", "%20")
-        url = f"https://image.pollinations.ai/prompt/{clean_prompt}?width=1920&height=1080&nologo=true&seed={index*123}"
+        url = f"https://image.pollinations.ai/prompt/{clean_prompt}?width=1920&height=1080&nologo=true&seed={seed}"
         
         try:
             async with httpx.AsyncClient(timeout=120) as client:
                 response = await client.get(url)
                 if response.status_code == 200:
-                    path = self.config.temp_dir / f"illustration_{index}.jpg"
                     with open(path, "wb") as f:
                         f.write(response.content)
                     logger.info(f"✅ Illustration générée")
@@ -384,6 +484,37 @@ Génère 4-5 sections. Réponds UNIQUEMENT avec le JSON valide."""
         
         return None
     
+    # ──────────────────────────────────────────────────────────────────────────
+    # ANIMATION AVATAR
+    # ──────────────────────────────────────────────────────────────────────────
+    
+    async def render_avatar(self, image_path: Path, audio_path: Path, output_path: Path) -> Optional[Path]:
+        """
+        Anime l'avatar sur l'audio, avec réutilisation du rendu en cache si
+        (image, audio, moteur, options) n'ont pas changé.
+        """
+        engine = self.avatar_generator.resolve_engine(self.config.avatar_engine)
+        if self.artifacts is not None:
+            image_digest, audio_digest = await asyncio.gather(
+                asyncio.to_thread(self.artifacts.file_digest, image_path),
+                asyncio.to_thread(self.artifacts.file_digest, audio_path),
+            )
+            avatar_config = self.avatar_generator.config
+            key = ArtifactCache.key(
+                "avatar", image_digest, audio_digest, engine.value, avatar_config.sadtalker_size,
+                avatar_config.preprocess, avatar_config.still_mode,
+                avatar_config.expression_scale, avatar_config.use_enhancer,
+            )
+        else:
+            key = ""
+        
+        return await self._cached(key, output_path, lambda: self.avatar_generator.generate(
+            image_path=image_path,
+            audio_path=audio_path,
+            output_path=output_path,
+            engine=engine
+        ))
+    
     # ──────────────────────────────────────────────────────────────────────────
     # CRÉATION DE SECTIONS VIDÉO
     # ──────────────────────────────────────────────────────────────────────────
@@ -407,52 +538,51 @@ Génère 4-5 sections. Réponds UNIQUEMENT avec le JSON valide."""
         Returns:
             Chemin vers la vidéo de section
         """
-        output = self.config.temp_dir / f"section_{index}.mp4"
-        
-        # Obtenir la durée de l'audio
-        probe_cmd = f'ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "{audio_path}"'
-        probe = subprocess.run(probe_cmd, shell=True, capture_output=True, text=True)
-        duration = float(probe.stdout.strip()) if probe.stdout.strip() else 5
-        
-        # Préparer les sous-titres (2 lignes max)
-        words = text.split()
-        lines = []
-        line = []
-        for w in words:
-            line.append(w)
-            if len(" ".join(line)) > 50:
-                lines.append(" ".join(line))
-                line = []
-        if line:
-            lines.append(" ".join(line))
-        subtitle = "\\n".join(lines[:2])
-        
-        # Filtre FFmpeg avec zoom subtil et sous-titres
-        filter_complex = (
-            f"scale=1920:1080:force_original_aspect_ratio=increase,crop=1920:1080,"
-            f"zoompan=z='min(zoom+0.0005,1.1)':d={int(duration*25)}:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':s=1920x1080,"
-            f"fade=t=in:st=0:d=0.5,fade=t=out:st={duration-0.5}:d=0.5,"
-            f"drawbox=y=h-140:color=black@0.5:width=iw:height=110:t=fill,"
-            f"drawtext=text='{subtitle}':fontcolor=white:fontsize=36:x=(w-text_w)/2:y=h-100:font=Arial"
-        )
+        output = (self.config.temp_dir / f"section_{index}.mp4").resolve()
         
-        cmd = (
-            f'ffmpeg -y -loop 1 -i "{image_path}" -i "{audio_path}" '
-            f'-vf "{filter_complex}" '
-            f'-c:v libx264 -t {duration} -pix_fmt yuv420p -shortest "{output}"'
-        )
+        # Durée lue dans l'en-tête audio (pas de ffprobe bloquant)
+        duration = await probe_duration(audio_path)
         
-        process = await asyncio.create_subprocess_shell(
-            cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        vf = section_video_filter(
+            duration, self.config.resolution, self.config.fps, self._write_subtitle(text, index)
         )
-        await process.communicate()
+        settings = dataclasses.replace(self.encode_settings, threads=self.encode_threads)
+        
+        ok = await self._run_ffmpeg([
+            "-y", "-hide_banner", "-loglevel", "error",
+            "-i", str(Path(image_path).resolve()), "-i", str(Path(audio_path).resolve()),
+            "-vf", vf, "-af", audio_filter(duration),
+            *settings.video_args(), *settings.audio_args(),
+            str(output)
+        ])
         
-        if output.exists():
+        if ok and output.exists():
             logger.info(f"✅ Section {index} créée")
             return output
         
         return None
     
+    def _write_subtitle(self, text: str, index: int) -> Optional[str]:
+        """Écrit le sous-titre d'une section; nom relatif à temp_dir pour `textfile=`."""
+        if not self.config.burn_subtitles:
+            return None
+        name = f"subtitle_{index}.txt"
+        (self.config.temp_dir / name).write_text(subtitle_lines(text), encoding="utf-8")
+        return name
+    
+    async def _run_ffmpeg(self, args: List[str]) -> bool:
+        """Lance ffmpeg depuis temp_dir (fichiers de sous-titres relatifs)."""
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", *args,
+            cwd=str(self.config.temp_dir),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            logger.error(f"FFmpeg erreur: {stderr.decode(errors='replace')[-500:]}")
+            return False
+        return True
+    
     # ──────────────────────────────────────────────────────────────────────────
     # ASSEMBLAGE FINAL
     # ──────────────────────────────────────────────────────────────────────────
@@ -495,6 +625,83 @@ Génère 4-5 sections. Réponds UNIQUEMENT avec le JSON valide."""
         
         return False
     
+    async def assemble_single_pass(self, segments: List[Segment], output_path: Path) -> bool:
+        """
+        Monte toute la vidéo en un seul encodage (un graphe filter_complex).
+        
+        Les sections illustrées (zoom, fondus, sous-titres) et les clips avatar
+        (remis au format de la vidéo) sont concaténés dans le graphe: pas de
+        fichiers intermédiaires ni d'encodage par section.
+        
+        Args:
+            segments: Plans dans l'ordre du script
+            output_path: Chemin de sortie
+            
+        Returns:
+            True si succès
+        """
+        logger.info(f"⚙️ Montage en un seul encodage ({len(segments)} plans)...")
+        
+        if not segments:
+            logger.error("Aucune partie à assembler")
+            return False
+        
+        output_path = Path(output_path).resolve()
+        args = single_pass_args(
+            segments, output_path, self.config.resolution, self.config.fps, self.encode_settings
+        )
+        
+        if await self._run_ffmpeg(args) and output_path.exists():
+            size_mb = output_path.stat().st_size / (1024*1024)
+            logger.info(f"✅ Vidéo finale: {output_path} ({size_mb:.1f} MB)")
+            return True
+        
+        return False
+    
+    async def _build_segments(self, parts: List[Dict[str, Any]], results: Dict[str, Any]) -> List[Segment]:
+        """Plans du montage en un seul encodage (parties incomplètes ignorées)."""
+        ready = [
+            part for part in parts
+            if results[part["audio"]] and results[part.get("video") or part.get("image")]
+        ]
+        durations = await asyncio.gather(*(probe_duration(results[part["audio"]]) for part in ready))
+        segments = []
+        for part, duration in zip(ready, durations):
+            if "video" in part:
+                segments.append(Segment(
+                    audio=Path(results[part["audio"]]).resolve(),
+                    duration=duration,
+                    video=Path(results[part["video"]]).resolve(),
+                ))
+            else:
+                segments.append(Segment(
+                    audio=Path(results[part["audio"]]).resolve(),
+                    duration=duration,
+                    image=Path(results[part["image"]]).resolve(),
+                    subtitle_file=self._write_subtitle(part["text"], part["index"]),
+                ))
+        return segments
+    
+    def _write_captions(self, segments: List[Segment], output_path: Path) -> Optional[Path]:
+        """
+        Sous-titres SRT de la vidéo montée (fichier à côté, pour l'upload):
+        timings mot à mot du TTS de chaque plan, décalés du début du plan.
+        """
+        cues, offset = [], 0.0
+        for segment in segments:
+            try:
+                with open(words_path(segment.audio), encoding="utf-8") as f:
+                    words = json.load(f)
+            except (OSError, ValueError):
+                words = []
+            cues.extend((start + offset, end + offset, text) for start, end, text in subtitle_cues(words))
+            offset += segment.duration
+        if not cues:
+            return None
+        output_path.write_text(format_srt(cues), encoding="utf-8")
+        logger.info(f"✅ Sous-titres: {output_path.name} ({len(cues)} lignes)")
+        return output_path
+    
     # ──────────────────────────────────────────────────────────────────────────
     # PRODUCTION COMPLÈTE
     # ──────────────────────────────────────────────────────────────────────────
@@ -508,14 +715,21 @@ Génère 4-5 sections. Réponds UNIQUEMENT avec le JSON valide."""
         """
         🎬 PRODUCTION COMPLÈTE D'UNE VIDÉO.
         
-        Workflow:
-        1. Génération du script
-        2. Téléchargement/génération avatar
-        3. TTS pour intro/outro
-        4. Animation avatar pour intro/outro
-        5. Génération illustrations
-        6. Création des sections
-        7. Assemblage final
+        Workflow (graphe de tâches, cf. production_graph.py):
+        1. Script IA ║ téléchargement/génération avatar
+        2. En parallèle, dès que leurs entrées sont prêtes:
+           - TTS intro/outro → animation avatar intro/outro
+           - par section: illustration ║ TTS (→ encodage ffmpeg en mode
+             "per_section")
+        3. Assemblage final dans l'ordre du script (un seul encodage en mode
+           "single_pass", voir assemble_single_pass), avec un .srt à côté
+           tiré des timings mot à mot du TTS
+        
+        Limites par étape (`self.resources`): LLM, TTS, HTTP, rendus avatar et
+        encodages ffmpeg (selon les cœurs), partagées avec les autres vidéos
+        d'un batch.
+        Le rapport (temps mur par étape, utilisation CPU) est loggé et
+        conservé dans `self.last_report`.
         
         Args:
             topic: Sujet de la vidéo
@@ -530,96 +744,141 @@ Génère 4-5 sections. Réponds UNIQUEMENT avec le JSON valide."""
         logger.info("="*60)
         
         video_id = video_id or random.randint(1000, 9999)
+        temp_dir = self.config.temp_dir
+        
+        graph = ProductionGraph(pool=self.resources)
         
-        # 1. Script
-        script = await self.generate_script(topic)
+        # 1. Script et avatar (indépendants)
+        graph.add("script", "script", lambda: self.generate_script(topic), resource="llm")
+        graph.add("avatar_image", "avatar_image", lambda: self.get_avatar_image(avatar_style, seed=topic), resource="network")
+        await graph.run()
         
-        # 2. Avatar
-        avatar_img = await self.get_avatar_image(avatar_style)
-        if not avatar_img:
+        script = graph.result("script")
+        if not script:
+            logger.error("❌ Impossible de générer le script")
+            return None
+        if not graph.result("avatar_image"):
             logger.error("❌ Impossible d'obtenir un avatar")
             return None
         
-        parts = []
-        
-        # 3. Intro animée
-        logger.info("\n--- INTRO ---")
-        intro_audio = await self.generate_audio(script["avatar_intro"], "intro.mp3")
-        if intro_audio:
-            intro_video = await self.avatar_generator.generate(
-                image_path=avatar_img,
-                audio_path=intro_audio,
-                output_path=self.config.temp_dir / "avatar_intro.mp4",
-                engine=self.config.avatar_engine
+        # 2. Intro/outro animées + sections illustrées
+        single_pass = self.config.assembly_mode == "single_pass"
+        parts: List[Dict[str, Any]] = []
+        
+        def add_avatar_clip(name: str, text: str):
+            graph.add(
+                f"tts_{name}", "tts",
+                lambda: self.generate_audio(text, f"{name}.mp3"),
+                resource="tts",
+            )
+            # Un dossier par rendu: SadTalker déplace le dernier .mp4 de result_dir
+            output = temp_dir / f"avatar_{name}" / f"avatar_{name}.mp4"
+            output.parent.mkdir(parents=True, exist_ok=True)
+            graph.add(
+                f"avatar_{name}", "avatar",
+                lambda image, audio: self.render_avatar(image, audio, output),
+                deps=["avatar_image", f"tts_{name}"],
+                resource="avatar",
             )
-            if intro_video:
-                parts.append(intro_video)
+            parts.append({"video": f"avatar_{name}", "audio": f"tts_{name}"})
+        
+        add_avatar_clip("intro", script["avatar_intro"])
         
-        # 4. Sections illustrées
-        logger.info("\n--- SECTIONS ---")
         for i, section in enumerate(script["sections"]):
-            img = await self.generate_illustration(section["image_prompt"], i)
-            if not img:
-                continue
-            
-            audio = await self.generate_audio(section["text"], f"section_{i}.mp3")
-            if not audio:
-                continue
-            
-            vid = await self.create_section_video(img, audio, section["text"], i)
-            if vid:
-                parts.append(vid)
-        
-        # 5. Outro animée
-        logger.info("\n--- OUTRO ---")
-        outro_audio = await self.generate_audio(script["avatar_outro"], "outro.mp3")
-        if outro_audio:
-            outro_video = await self.avatar_generator.generate(
-                image_path=avatar_img,
-                audio_path=outro_audio,
-                output_path=self.config.temp_dir / "avatar_outro.mp4",
-                engine=self.config.avatar_engine
+            graph.add(
+                f"illustration_{i}", "illustration",
+                lambda prompt=section["image_prompt"], i=i: self.generate_illustration(prompt, i),
+                resource="network",
             )
-            if outro_video:
-                parts.append(outro_video)
+            graph.add(
+                f"tts_section_{i}", "tts",
+                lambda text=section["text"], i=i: self.generate_audio(text, f"section_{i}.mp3"),
+                resource="tts",
+            )
+            part = {"image": f"illustration_{i}", "audio": f"tts_section_{i}", "text": section["text"], "index": i}
+            if not single_pass:
+                # Un encodage par section, en parallèle; le montage concatène
+                graph.add(
+                    f"encode_{i}", "encode",
+                    lambda img, audio, text=section["text"], i=i: self.create_section_video(img, audio, text, i),
+                    deps=[f"illustration_{i}", f"tts_section_{i}"],
+                    resource="ffmpeg",
+                )
+                part = {"video": f"encode_{i}"}
+            parts.append(part)
         
-        # 6. Assemblage
+        add_avatar_clip("outro", script["avatar_outro"])
+        
+        logger.info(
+            f"\n--- RENDU PARALLÈLE: {len(graph.tasks)} tâches, montage {self.config.assembly_mode} ---"
+        )
+        results = await graph.run()
+        
+        # 3. Assemblage (ordre du script, parties manquantes ignorées)
         logger.info("\n--- ASSEMBLAGE ---")
         safe_title = "".join(c for c in script["title"] if c.isalnum() or c in " -_")[:50]
         final_path = self.config.output_dir / f"heygen_open_{video_id}_{safe_title}.mp4"
         
-        if await self.assemble_video(parts, final_path):
+        if single_pass:
+            async def assemble():
+                segments = await self._build_segments(parts, results)
+                if not await self.assemble_single_pass(segments, final_path):
+                    return False
+                self._write_captions(segments, final_path.with_suffix(".srt"))
+                return True
+        else:
+            ordered = [results[part["video"]] for part in parts if results[part["video"]]]
+            assemble = lambda: self.assemble_video(ordered, final_path)
+        graph.add("assemble", "assemble", assemble, resource="ffmpeg")
+        await graph.run()
+        
+        self.last_report = graph.report()
+        if self.artifacts is not None:
+            self.last_report["artifact_cache"] = self.artifacts.stats()
+        logger.info("\n" + graph.format_report())
+        
+        if graph.result("assemble"):
             logger.info(f"\n🎉 VIDÉO TERMINÉE: {final_path}")
             return final_path
         
         return None
     
-    async def batch_produce(self, topics: List[Dict], start_id: int = 1) -> List[Path]:
+    async def batch_produce(
+        self,
+        topics: List[Dict],
+        start_id: int = 1,
+        avatar_style: str = "professional_woman",
+        workers: int = 0
+    ) -> List[Path]:
         """
-        Production en batch de plusieurs vidéos.
+        Production en batch de plusieurs vidéos, en parallèle.
+        
+        Chaque vidéo a son propre dossier de travail; la file de jobs est
+        persistante (output_dir/batch_queue.db): relancer le même batch après
+        un crash reprend les vidéos non terminées. Voir batch_scheduler.py.
         
         Args:
             topics: Liste de sujets
             start_id: ID de départ
+            avatar_style: Style d'avatar par défaut (surchargé par topic["avatar_style"])
+            workers: Vidéos simultanées (0 = selon cœurs et mémoire)
             
         Returns:
             Liste des vidéos produites
         """
-        results = []
-        
-        for i, topic_info in enumerate(topics):
-            video_id = start_id + i
-            title = topic_info.get("title", f"Video {video_id}")
-            
-            try:
-                video_path = await self.produce_video(title, video_id)
-                if video_path:
-                    results.append(video_path)
-            except Exception as e:
-                logger.error(f"Erreur production {title}: {e}")
-        
-        logger.info(f"\n📊 Batch terminé: {len(results)}/{len(topics)} vidéos produites")
-        return results
+        jobs = [
+            {
+                "video_id": start_id + i,
+                "title": topic_info.get("title", f"Video {start_id + i}"),
+                "avatar_style": topic_info.get("avatar_style", avatar_style),
+            }
+            for i, topic_info in enumerate(topics)
+        ]
+        scheduler = BatchScheduler(self, workers=workers)
+        try:
+            return await scheduler.run(jobs)
+        finally:
+            scheduler.queue.close()
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+⏱️ MEDIA PROBE - Durée audio lue dans les en-têtes, sans ffprobe
+================================================================
+Edge-TTS produit du MP3 (MPEG-2 Layer III, 24 kHz, CBR): la durée se lit
+en quelques microsecondes dans l'en-tête de la première trame (ou dans
+l'en-tête Xing/Info/VBRI des fichiers VBR). Le WAV est aussi reconnu.
+
+`probe_duration` ne lance ffprobe (en asynchrone) que pour les formats
+inconnus.
+"""
+
+import asyncio
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("MediaProbe")
+
+# Layer III: bitrates (kbit/s) et fréquences par version MPEG
+_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+# Assez pour l'en-tête ID3 usuel, la première trame et son en-tête Xing
+_HEAD_BYTES = 64 * 1024
+
+
+def _mp3_duration(path: Path, head: bytes, file_size: int) -> Optional[float]:
+    start = 0
+    if head[:3] == b"ID3" and len(head) >= 10:
+        size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        start = 10 + size + (10 if head[5] & 0x10 else 0)
+        if start + 4 > len(head):
+            with open(path, "rb") as f:
+                f.seek(start)
+                head = head[:start].ljust(start, b"\0") + f.read(_HEAD_BYTES)
+
+    # Première trame valide (Layer III)
+    i = start
+    while i + 4 <= len(head):
+        if head[i] == 0xFF and head[i + 1] & 0xE0 == 0xE0:
+            version = (head[i + 1] >> 3) & 3
+            layer = (head[i + 1] >> 1) & 3
+            bitrate_index = head[i + 2] >> 4
+            rate_index = (head[i + 2] >> 2) & 3
+            if version != 1 and layer == 1 and 0 < bitrate_index < 15 and rate_index < 3:
+                break
+        i += 1
+    else:
+        return None
+
+    mono = (head[i + 3] >> 6) == 3
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    samples_per_frame = 1152 if version == 3 else 576
+
+    # En-tête VBR Xing/Info (après les infos annexes) ou VBRI (offset fixe)
+    side_info = (17 if mono else 32) if version == 3 else (9 if mono else 17)
+    xing = i + 4 + side_info
+    if head[xing:xing + 4] in (b"Xing", b"Info") and len(head) >= xing + 12:
+        flags = struct.unpack(">I", head[xing + 4:xing + 8])[0]
+        if flags & 1:
+            frames = struct.unpack(">I", head[xing + 8:xing + 12])[0]
+            return frames * samples_per_frame / sample_rate
+    vbri = i + 4 + 32
+    if head[vbri:vbri + 4] == b"VBRI" and len(head) >= vbri + 18:
+        frames = struct.unpack(">I", head[vbri + 14:vbri + 18])[0]
+        return frames * samples_per_frame / sample_rate
+
+    # CBR: taille des données audio / débit
+    bitrate = (_BITRATES_V1 if version == 3 else _BITRATES_V2)[bitrate_index] * 1000
+    audio_bytes = file_size - i
+    with open(path, "rb") as f:
+        f.seek(max(0, file_size - 128))
+        if f.read(3) == b"TAG":  # ID3v1 en fin de fichier
+            audio_bytes -= 128
+    return audio_bytes * 8 / bitrate
+
+
+def _wav_duration(head: bytes) -> Optional[float]:
+    pos, byte_rate = 12, 0
+    while pos + 8 <= len(head):
+        chunk, size = head[pos:pos + 4], struct.unpack("<I", head[pos + 4:pos + 8])[0]
+        if chunk == b"fmt " and pos + 16 <= len(head):
+            byte_rate = struct.unpack("<I", head[pos + 16:pos + 20])[0]
+        elif chunk == b"data":
+            return size / byte_rate if byte_rate else None
+        pos += 8 + size + (size & 1)
+    return None
+
+
+def audio_duration(path: Path) -> Optional[float]:
+    """Durée en secondes d'un MP3 ou WAV, lue dans les en-têtes; None si inconnu."""
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(_HEAD_BYTES)
+    except OSError:
+        return None
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return _wav_duration(head)
+    try:
+        return _mp3_duration(Path(path), head, file_size)
+    except (IndexError, struct.error):
+        return None
+
+
+async def probe_duration(path: Path, default: float = 5.0) -> float:
+    """Durée audio: en-têtes d'abord, ffprobe (asynchrone) en dernier recours."""
+    duration = audio_duration(path)
+    if duration:
+        return duration
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "ffprobe", "-v", "error", "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1", str(path),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, _ = await process.communicate()
+        return float(stdout.decode().strip())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Durée inconnue pour {Path(path).name} ({e}), {default}s par défaut")
+        return default
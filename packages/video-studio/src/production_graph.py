@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+🕸️ PRODUCTION GRAPH - Exécuteur de tâches en graphe (DAG)
+==========================================================
+Exécute les étapes d'une production vidéo dès que leurs dépendances sont
+prêtes, en parallèle, sous des limites par ressource:
+
+- "llm": génération du script
+- "tts": synthèse Edge-TTS
+- "network": autres appels HTTP (illustrations, photo d'avatar)
+- "ffmpeg": encodages CPU-bound (bornés par le nombre de cœurs)
+- "avatar": rendus SadTalker/MuseTalk/Wav2Lip (très lourds)
+
+Les limites vivent dans un `ResourcePool`, partageable entre plusieurs
+graphes (production batch: les limites valent pour toutes les vidéos).
+
+Exemple:
+```python
+graph = ProductionGraph({"tts": 4, "network": 4, "ffmpeg": 2})
+graph.add("tts_0", "tts", lambda: gen_audio(text), resource="tts")
+graph.add("img_0", "illustration", lambda: gen_image(prompt), resource="network")
+graph.add("encode_0", "encode", lambda audio, img: encode(img, audio),
+          deps=["tts_0", "img_0"], resource="ffmpeg")
+results = await graph.run()
+print(graph.format_report())
+```
+
+Une tâche reçoit les résultats de ses dépendances (dans l'ordre de `deps`).
+Si une dépendance a échoué (exception, None ou False), la tâche est sautée.
+`run()` est incrémental: on peut ajouter des tâches puis relancer `run()`,
+seules les nouvelles sont exécutées.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger("ProductionGraph")
+
+# ══════════════════════════════════════════════════════════════════════════════
+# LIMITES PAR RESSOURCE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def cpu_cores() -> int:
+    """Cœurs utilisables par ce processus (affinité CPU si disponible)."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def encode_slots(cores: Optional[int] = None) -> int:
+    """
+    Encodages ffmpeg simultanés.
+
+    libx264 est déjà multi-thread: on lance ~1 encodage pour 2 cœurs
+    (chacun avec cores/slots threads) plutôt qu'un par cœur.
+    """
+    cores = cores or cpu_cores()
+    return max(1, cores // 2)
+
+
+def encode_threads(slots: int, cores: Optional[int] = None) -> int:
+    """Threads libx264 par encodage pour `slots` encodages simultanés."""
+    cores = cores or cpu_cores()
+    return max(1, cores // max(1, slots))
+
+
+class ResourcePool:
+    """Sémaphores nommés (une par ressource) avec occupation courante et pic."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self.limits = {name: max(1, n) for name, n in (limits or {}).items()}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop = None
+        self.in_use = {name: 0 for name in self.limits}
+        self.peak = {name: 0 for name in self.limits}
+
+    async def acquire(self, name: Optional[str]) -> bool:
+        """Réserve un slot; False si la ressource n'est pas limitée."""
+        if name not in self.limits:
+            return False
+        # Une sémaphore asyncio est liée à sa boucle: recréées à chaque asyncio.run()
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores = {n: asyncio.Semaphore(limit) for n, limit in self.limits.items()}
+            self.in_use = {n: 0 for n in self.limits}
+        await self._semaphores[name].acquire()
+        self.in_use[name] += 1
+        self.peak[name] = max(self.peak[name], self.in_use[name])
+        return True
+
+    def release(self, name: str):
+        self.in_use[name] -= 1
+        self._semaphores[name].release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            name: {"limit": limit, "in_use": self.in_use[name], "peak": self.peak[name]}
+            for name, limit in self.limits.items()
+        }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# GRAPHE
+# ══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class GraphTask:
+    """Une étape de production."""
+    name: str
+    stage: str
+    fn: Callable[..., Awaitable[Any]]
+    deps: List[str] = field(default_factory=list)
+    resource: Optional[str] = None
+    status: str = "pending"  # pending, running, done, skipped, failed
+    result: Any = None
+    started: float = 0.0
+    finished: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.finished - self.started) if self.finished else 0.0
+
+
+class ProductionGraph:
+    """Exécuteur asynchrone de tâches avec dépendances et limites par ressource."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, pool: Optional[ResourcePool] = None):
+        self.pool = pool or ResourcePool(limits)
+        self.tasks: Dict[str, GraphTask] = {}
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._wall = 0.0
+        self._cpu = 0.0
+
+    def add(
+        self,
+        name: str,
+        stage: str,
+        fn: Callable[..., Awaitable[Any]],
+        deps: Sequence[str] = (),
+        resource: Optional[str] = None,
+    ) -> str:
+        """Déclare une tâche; `fn(*résultats_des_deps)` doit renvoyer un awaitable."""
+        if name in self.tasks:
+            raise ValueError(f"Tâche déjà déclarée: {name}")
+        missing = [d for d in deps if d not in self.tasks]
+        if missing:
+            raise ValueError(f"Dépendances inconnues pour {name}: {missing}")
+        self.tasks[name] = GraphTask(name, stage, fn, list(deps), resource)
+        return name
+
+    def result(self, name: str) -> Any:
+        return self.tasks[name].result
+
+    async def _execute(self, task: GraphTask):
+        # Attendre les dépendances (déclarées avant: pas de cycle possible)
+        for dep in task.deps:
+            await self._futures[dep]
+        inputs = [self.tasks[d].result for d in task.deps]
+        if not all(inputs):
+            task.status = "skipped"
+            logger.warning(f"⏭️ {task.name} sautée (dépendance manquante)")
+            return
+
+        try:
+            acquired = await self.pool.acquire(task.resource)
+            task.status = "running"
+            task.started = time.perf_counter()
+            try:
+                task.result = await task.fn(*inputs)
+            finally:
+                task.finished = time.perf_counter()
+                if acquired:
+                    self.pool.release(task.resource)
+            task.status = "done" if task.result else "failed"
+        except Exception as e:
+            task.status = "failed"
+            task.result = None
+            logger.error(f"❌ {task.name}: {e}")
+
+    async def run(self) -> Dict[str, Any]:
+        """Exécute les tâches en attente; renvoie {nom: résultat} pour tout le graphe."""
+        pending = [t for t in self.tasks.values() if t.name not in self._futures]
+        if pending:
+            cpu_start = _cpu_seconds()
+            wall_start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            for task in pending:
+                self._futures[task.name] = loop.create_task(self._execute(task))
+            await asyncio.gather(*(self._futures[t.name] for t in pending))
+            self._wall += time.perf_counter() - wall_start
+            self._cpu += _cpu_seconds() - cpu_start
+        return {name: task.result for name, task in self.tasks.items()}
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # RAPPORT
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Temps mur par étape et utilisation des cœurs.
+
+        - wall: du premier démarrage à la dernière fin de l'étape
+        - busy: somme des durées des tâches de l'étape
+        - parallelism: busy / wall (tâches simultanées en moyenne)
+        - cpu_utilization: temps CPU (process + sous-processus ffmpeg/moteurs
+          terminés) / (temps mur × cœurs)
+        """
+        stages: Dict[str, Dict[str, Any]] = {}
+        for task in self.tasks.values():
+            entry = stages.setdefault(task.stage, {
+                "tasks": 0, "done": 0, "failed": 0, "skipped": 0,
+                "busy": 0.0, "_start": None, "_end": None,
+            })
+            entry["tasks"] += 1
+            if task.status in ("done", "failed", "skipped"):
+                entry[task.status] += 1
+            if task.finished:
+                entry["busy"] += task.duration
+                entry["_start"] = task.started if entry["_start"] is None else min(entry["_start"], task.started)
+                entry["_end"] = task.finished if entry["_end"] is None else max(entry["_end"], task.finished)
+
+        for entry in stages.values():
+            start, end = entry.pop("_start"), entry.pop("_end")
+            wall = (end - start) if start is not None else 0.0
+            entry["wall"] = round(wall, 3)
+            entry["parallelism"] = round(entry["busy"] / wall, 2) if wall else 0.0
+            entry["busy"] = round(entry["busy"], 3)
+
+        cores = cpu_cores()
+        serial = sum(t.duration for t in self.tasks.values())
+        return {
+            "wall_time": round(self._wall, 3),
+            "serial_time": round(serial, 3),
+            "speedup": round(serial / self._wall, 2) if self._wall else 0.0,
+            "cpu_time": round(self._cpu, 3),
+            "cores": cores,
+            "cpu_utilization": round(self._cpu / (self._wall * cores), 3) if self._wall else 0.0,
+            "limits": self.pool.limits,
+            "stages": stages,
+        }
+
+    def format_report(self) -> str:
+        """Rapport lisible pour les logs."""
+        report = self.report()
+        lines = [
+            f"⏱️ Total {report['wall_time']:.1f}s (séquentiel {report['serial_time']:.1f}s, "
+            f"x{report['speedup']}) | CPU {report['cpu_time']:.1f}s sur {report['cores']} cœurs "
+            f"({report['cpu_utilization']:.0%})"
+        ]
+        for stage, s in report["stages"].items():
+            lines.append(
+                f"   {stage:<13} {s['done']}/{s['tasks']} ok  mur {s['wall']:.1f}s  "
+                f"cumul {s['busy']:.1f}s  //{s['parallelism']}"
+            )
+        return "\n".join(lines)
+
+
+def _cpu_seconds() -> float:
+    """Temps CPU du processus et de ses enfants terminés (ffmpeg, moteurs)."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🌍 THE BRAIN - Language-ID accuracy / latency benchmark
+# ═══════════════════════════════════════════════════════════════════════════════
+"""
+Évalue services.langid sur les phrases tenues à l'écart de l'entraînement
+(scripts/langid_corpus, une ligne sur 5), sur des requêtes courtes tirées
+de ces phrases (2-3 premiers mots), sur des requêtes web typiques (noms
+propres, marques: detect_language avec default="en", comme /api/fast) et
+sur des échantillons non latins.
+Compare avec l'ancienne détection par listes de mots (/api/fast).
+
+    python scripts/bench_langid.py
+    python scripts/bench_langid.py --budget-us 100   # CI: échoue au-delà
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from build_langid_model import load_corpus
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(ROOT, "packages", "brain-core", "src", "i18n"))
+
+import langid  # noqa: E402
+
+SCRIPT_SAMPLES = [
+    ("ar", "ما هو سعر البيتكوين اليوم؟"),
+    ("he", "מה מזג האוויר בתל אביב היום?"),
+    ("ru", "Какая сегодня погода в Москве?"),
+    ("zh", "今天北京的天气怎么样？"),
+    ("ja", "東京の天気はどうですか？"),
+    ("ko", "오늘 서울 날씨 어때요?"),
+    ("hi", "आज दिल्ली में मौसम कैसा है?"),
+]
+
+# Requêtes courtes où le modèle seul se trompe souvent: les seuils
+# MIN_CONFIDENCE / SHORT_MIN_CONFIDENCE doivent les renvoyer vers `default`
+# plutôt que vers une langue au hasard
+WEB_QUERIES = [
+    ("en", "hello"),
+    ("en", "amazon prime"),
+    ("en", "champions league"),
+    ("en", "netflix series"),
+    ("en", "euro dollar"),
+    ("en", "real madrid"),
+    ("en", "ukraine war"),
+    ("fr", "météo paris"),
+    ("en", "bitcoin price today"),
+    ("en", "iphone 16 review"),
+    ("fr", "quel temps fait-il à Paris"),
+    ("de", "wie spät ist es"),
+    ("es", "qué hora es"),
+]
+
+
+def legacy_detect(query: str) -> str:
+    """Ancienne détection de /api/fast (listes de mots, sous-chaînes)."""
+    q = query.lower()
+    if any(w in q for w in ['what', 'how', 'where', 'when', 'who', 'why', 'the', 'is', 'are', 'do', 'does', 'can', 'will', 'best', 'top']):
+        return "en"
+    if any(w in q for w in ['que', 'quoi', 'comment', 'où', 'quand', 'qui', 'pourquoi', 'le', 'la', 'les', 'est', 'sont', 'faire', 'meilleur']):
+        return "fr"
+    if any(w in q for w in ['qué', 'cómo', 'dónde', 'cuándo', 'quién', 'por qué', 'el', 'la', 'los', 'es', 'son', 'hacer']):
+        return "es"
+    if any(w in q for w in ['was', 'wie', 'wo', 'wann', 'wer', 'warum', 'der', 'die', 'das', 'ist', 'sind', 'machen']):
+        return "de"
+    if any('֐' <= c <= '׿' for c in query):
+        return "he"
+    if any('؀' <= c <= 'ۿ' for c in query):
+        return "ar"
+    if any('一' <= c <= '鿿' for c in query):
+        return "zh"
+    return "en"
+
+
+def accuracy(samples, detect):
+    hits = sum(1 for lang, text in samples if detect(text) == lang)
+    return hits / len(samples) if samples else 0.0
+
+
+def latency_us(samples, detect, repeat: int) -> float:
+    texts = [text for _, text in samples]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            detect(text)
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Language-ID benchmark")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget-us", type=float, default=0, help="Échoue si la latence (non mémoïsée) dépasse ce budget")
+    args = parser.parse_args()
+
+    test = load_corpus("test")
+    sentences = [(lang, line) for lang, lines in test.items() for line in lines]
+    queries = [(lang, " ".join(line.split()[:n])) for lang, line in sentences for n in (2, 3)]
+    long_texts = [(lang, " ".join(lines) * 4) for lang, lines in test.items()]
+
+    uncached = lambda text: langid.identifier.identify(text)[0]
+    langid.identifier.identify("warm-up")
+
+    print(f"🌍 {len(test)} Latin-script languages, {len(sentences)} held-out sentences, {len(queries)} short queries")
+    print()
+    print(f"{'set':<22}{'langid':>9}{'legacy':>9}")
+    for name, samples in (("sentences", sentences), ("short queries (2-3 w)", queries), ("non-Latin scripts", SCRIPT_SAMPLES)):
+        print(f"{name:<22}{accuracy(samples, uncached):>8.1%}{accuracy(samples, legacy_detect):>9.1%}")
+
+    # Chemin réel des appelants: seuil de confiance + langue par défaut
+    web = lambda text: langid.detect_language(text, default="en")
+    print(f"{'web queries (en def.)':<22}{accuracy(WEB_QUERIES, web):>8.1%}{accuracy(WEB_QUERIES, legacy_detect):>9.1%}"
+          f"   (min_confidence={langid.MIN_CONFIDENCE}, {langid.SHORT_MIN_CONFIDENCE} < {langid.SHORT_WORDS} words)")
+
+    print()
+    short_us = latency_us(queries, uncached, args.repeat)
+    sentence_us = latency_us(sentences, uncached, args.repeat)
+    long_us = latency_us(long_texts, uncached, max(1, args.repeat // 4))
+    memo_us = latency_us(queries, langid.detect_language, args.repeat)
+    legacy_us = latency_us(queries, legacy_detect, args.repeat)
+    print(f"⏱️ short query   : {short_us:7.1f} µs  (memoized: {memo_us:.2f} µs, legacy: {legacy_us:.1f} µs)")
+    print(f"   sentence      : {sentence_us:7.1f} µs")
+    print(f"   long text     : {long_us:7.1f} µs  (~{sum(len(t) for _, t in long_texts) // len(long_texts)} chars, capped at {langid.MAX_CHARS})")
+
+    errors = [(lang, text, uncached(text)) for lang, text in queries if uncached(text) != lang]
+    if errors:
+        print()
+        print("❌ Sample short-query errors:")
+        for lang, text, got in errors[:8]:
+            print(f"   {lang} → {got}: {text}")
+
+    web_errors = [(lang, text, web(text), langid.identify(text)) for lang, text in WEB_QUERIES if web(text) != lang]
+    if web_errors:
+        print()
+        print("❌ Web-query errors (default=\"en\"):")
+        for lang, text, got, (guess, confidence) in web_errors:
+            print(f"   {lang} → {got}: {text}  (model: {guess} {confidence:.2f})")
+
+    if args.budget_us and short_us > args.budget_us:
+        print(f"\n❌ Latency budget exceeded: {short_us:.1f}µs > {args.budget_us:.0f}µs")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
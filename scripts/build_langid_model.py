@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🌍 THE BRAIN - Language-ID model builder
+# ═══════════════════════════════════════════════════════════════════════════════
+"""
+Entraîne le modèle naive Bayes de n-grammes de caractères utilisé par
+services.langid à partir de scripts/langid_corpus/<lang>.txt (une phrase
+par ligne) et l'écrit dans packages/brain-core/src/i18n/langid_model.json.
+
+    python scripts/build_langid_model.py
+    python scripts/build_langid_model.py --min-count 1 --alpha 0.5
+
+Une ligne sur HOLDOUT (les lignes 5, 10, ...) est exclue de l'entraînement:
+c'est le jeu de test de scripts/bench_langid.py.
+
+Les langues à écriture propre (arabe, hébreu, cyrillique, CJK, devanagari)
+sont reconnues par leur alphabet et n'ont pas besoin de corpus.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from collections import Counter
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+CORPUS_DIR = os.path.join(ROOT, "scripts", "langid_corpus")
+MODEL_FILE = os.path.join(ROOT, "packages", "brain-core", "src", "i18n", "langid_model.json")
+sys.path.insert(0, os.path.join(ROOT, "packages", "brain-core", "src", "i18n"))
+
+from langid import MAX_ORDER, ngrams  # noqa: E402  (même extraction qu'au runtime)
+
+HOLDOUT = 5
+
+
+def load_corpus(split: str):
+    """{lang: [lignes]} pour split = "train" ou "test"."""
+    corpus = {}
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        if not name.endswith(".txt"):
+            continue
+        with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as f:
+            lines = [l.strip() for l in f if l.strip()]
+        held_out = split == "test"
+        corpus[name[:-4]] = [l for i, l in enumerate(lines, 1) if (i % HOLDOUT == 0) == held_out]
+    return corpus
+
+
+def build(min_count: int, alpha: float):
+    corpus = load_corpus("train")
+    languages = sorted(corpus)
+    counts = {lang: Counter(g for line in corpus[lang] for g in ngrams(line)) for lang in languages}
+
+    totals = Counter()
+    for counter in counts.values():
+        totals.update(counter)
+    vocab = sorted(g for g, c in totals.items() if c >= min_count)
+
+    table = {}
+    for gram in vocab:
+        row = []
+        for lang in languages:
+            n = sum(counts[lang].values())
+            row.append(round(math.log((counts[lang][gram] + alpha) / (n + alpha * len(vocab))), 2))
+        table[gram] = row
+
+    return {
+        "version": 1,
+        "max_order": MAX_ORDER,
+        "alpha": alpha,
+        "languages": languages,
+        "table": table,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the bundled language-ID model")
+    parser.add_argument("--min-count", type=int, default=2, help="Fréquence min d'un n-gramme (tous corpus confondus)")
+    parser.add_argument("--alpha", type=float, default=0.5, help="Lissage additif")
+    parser.add_argument("--output", default=MODEL_FILE)
+    args = parser.parse_args()
+
+    model = build(args.min_count, args.alpha)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(model, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    size_kb = os.path.getsize(args.output) / 1024
+    print(f"✅ {len(model['languages'])} languages, {len(model['table'])} n-grams → {args.output} ({size_kb:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# ═══════════════════════════════════════════════════════════════════════════════
+# ⏱️ THE BRAIN - Import-time Profiling Report
+# ═══════════════════════════════════════════════════════════════════════════════
+"""
+Mesure le coût d'import d'un module (par défaut l'app FastAPI) avec
+`python -X importtime` et affiche les modules les plus lents.
+
+    python scripts/profile_imports.py                       # main depuis packages/api-server/src
+    python scripts/profile_imports.py services.mega_api_brain --top 15
+    python scripts/profile_imports.py --max-ms 1500         # CI: échoue au-delà de 1.5s
+
+Le temps "self" est celui du module seul, "cumulative" inclut ses
+propres imports.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+DEFAULT_CWD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "packages", "api-server", "src")
+
+
+def profile(module: str, cwd: str):
+    """Lance l'import dans un process neuf et parse la sortie -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+    return proc.returncode, rows, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profiling report")
+    parser.add_argument("module", nargs="?", default="main", help="Module à importer (défaut: main)")
+    parser.add_argument("--cwd", default=DEFAULT_CWD, help="Répertoire d'exécution (défaut: packages/api-server/src)")
+    parser.add_argument("--top", type=int, default=25, help="Nombre de modules affichés")
+    parser.add_argument("--max-ms", type=float, default=0, help="Échoue si l'import total dépasse ce budget")
+    args = parser.parse_args()
+
+    code, rows, errors = profile(args.module, os.path.abspath(args.cwd))
+    if code != 0:
+        print(f"❌ import {args.module} failed:")
+        print("\n".join(errors[-15:]))
+        sys.exit(code)
+
+    target = next((r for r in reversed(rows) if r[2].strip() == args.module), None)
+    total_ms = (target[1] if target else sum(r[0] for r in rows)) / 1000
+
+    print(f"⏱️ import {args.module}: {total_ms:.0f}ms ({len(rows)} modules)")
+    print()
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}  {name}")
+
+    print()
+    print("🐢 Slowest modules (self time):")
+    for self_us, _, name in sorted(rows, key=lambda r: r[0], reverse=True)[:10]:
+        print(f"{self_us / 1000:>9.1f}  {name.strip()}")
+
+    if args.max_ms and total_ms > args.max_ms:
+        print(f"\n❌ Import budget exceeded: {total_ms:.0f}ms > {args.max_ms:.0f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()